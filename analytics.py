@@ -0,0 +1,370 @@
+"""Offline analytics report over the swear jar database.
+
+Columns are read a chunk at a time into NumPy arrays, and every statistic is
+computed with vectorized operations, so the report stays fast on databases
+with millions of users. Run it through datatools:
+
+    python datatools.py report --out report.md
+    python datatools.py report --format html --out report.html
+    python datatools.py benchmark --users 1000000
+
+NumPy is only needed for these commands (pip install numpy).
+"""
+import datetime
+import html
+import os
+import sqlite3
+import tempfile
+import time
+
+REPORT_CHUNK_SIZE = 100_000
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+HISTOGRAM_BINS = 10
+FARMING_Z_SCORE = 3.0  # Positive-word earnings this many standard deviations above the mean get flagged
+TOP_FARMERS = 10
+
+# Ledger reasons and moderation actions are loaded as small integer codes
+LEDGER_REASONS = ("swear_fine", "positive_word")
+MODERATION_ACTIONS = ("delete", "warning", "fine", "mute", "unmute", "swear_pass")
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("The analytics report needs the numpy package (pip install numpy)")
+    return numpy
+
+
+def _has_table(conn, table):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+
+def _code_case(column, values):
+    """SQL expression mapping a text column to its index in `values`, or -1."""
+    whens = " ".join(f"WHEN '{value}' THEN {code}" for code, value in enumerate(values))
+    return f"CASE {column} {whens} ELSE -1 END"
+
+
+def load_columns(conn, sql, columns, params=(), chunk_size=REPORT_CHUNK_SIZE):
+    """Run a query of integer columns and return {column: int64 array}, fetching `chunk_size` rows at a time."""
+    np = _numpy()
+    cursor = conn.execute(sql, params)
+    chunks = []
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        chunks.append(np.array(rows, dtype=np.int64).reshape(len(rows), len(columns)))
+    data = np.concatenate(chunks) if chunks else np.empty((0, len(columns)), dtype=np.int64)
+    return {column: np.ascontiguousarray(data[:, i]) for i, column in enumerate(columns)}
+
+
+def gini(values):
+    """Gini coefficient of non-negative values: 0 is perfect equality, 1 is one holder of everything."""
+    np = _numpy()
+    values = np.sort(values.astype(np.float64))
+    n = values.size
+    total = values.sum()
+    if n == 0 or total == 0:
+        return 0.0
+    ranks = np.arange(1, n + 1)
+    return float(2 * np.dot(ranks, values) / (n * total) - (n + 1) / n)
+
+
+def describe(values):
+    """Count, total, mean and percentiles of an array."""
+    np = _numpy()
+    if values.size == 0:
+        return {"count": 0}
+    stats = {
+        "count": int(values.size),
+        "total": int(values.sum()),
+        "mean": float(values.mean()),
+        "max": int(values.max()),
+    }
+    for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        stats[f"p{percentile}"] = float(value)
+    return stats
+
+
+def histogram(values, bins=HISTOGRAM_BINS):
+    """Return [(low, high, count)] over equal-width bins."""
+    np = _numpy()
+    if values.size == 0:
+        return []
+    counts, edges = np.histogram(values, bins=bins)
+    return [(int(edges[i]), int(edges[i + 1]), int(count)) for i, count in enumerate(counts)]
+
+
+# ✅ Report sections
+# Each section is {"title", "summary": [(label, value)], "tables": [(caption, headers, rows, bar_column)]}
+def _summary_rows(stats):
+    rows = [("Users", f"{stats['count']:,}")]
+    if stats["count"]:
+        rows += [("Total", f"{stats['total']:,}"), ("Mean", f"{stats['mean']:,.1f}"), ("Max", f"{stats['max']:,}")]
+    return rows
+
+
+def _percentile_table(stats):
+    if not stats["count"]:
+        return []
+    return [("Percentiles", ["Percentile", "Value"], [(f"p{p}", f"{stats[f'p{p}']:,.0f}") for p in PERCENTILES], None)]
+
+
+def _histogram_table(values):
+    rows = [(f"{low:,} – {high:,}", count) for low, high, count in histogram(values)]
+    return [("Distribution", ["Range", "Users"], rows, 1)] if rows else []
+
+
+def balance_section(users):
+    coins = users["coins"]
+    stats = describe(coins)
+    summary = _summary_rows(stats)
+    if stats["count"]:
+        np = _numpy()
+        top_share = np.sort(coins)[-max(1, coins.size // 100):].sum() / max(1, coins.sum()) * 100
+        summary += [("Gini coefficient", f"{gini(coins):.3f}"), ("Held by the top 1%", f"{top_share:.1f}%"),
+                    ("Users at 0 coins", f"{int((coins == 0).sum()):,}")]
+    return {"title": "💰 Coin Balances", "summary": summary,
+            "tables": _percentile_table(stats) + _histogram_table(coins)}
+
+
+def swear_section(users):
+    counts = users["count"]
+    stats = describe(counts)
+    summary = _summary_rows(stats)
+    if stats["count"]:
+        summary += [("Never swore", f"{int((counts == 0).sum()):,}"),
+                    ("Users with warnings", f"{int((users['warnings'] > 0).sum()):,}")]
+    return {"title": "🤬 Swearing", "summary": summary,
+            "tables": _percentile_table(stats) + _histogram_table(counts)}
+
+
+def flow_section(ledger):
+    """Fines against positive-word rewards, and users whose rewards are far above everyone else's."""
+    np = _numpy()
+    reasons, deltas, user_ids = ledger["reason"], ledger["delta"], ledger["user_id"]
+    fines = int(-deltas[reasons == LEDGER_REASONS.index("swear_fine")].sum())
+    rewarded = reasons == LEDGER_REASONS.index("positive_word")
+    rewards = int(deltas[rewarded].sum())
+    summary = [("Coins fined", f"{fines:,}"), ("Coins rewarded", f"{rewards:,}"),
+               ("Fines per reward coin", f"{fines / rewards:.2f}" if rewards else "n/a")]
+
+    tables = []
+    if rewarded.any():
+        earners, index = np.unique(user_ids[rewarded], return_inverse=True)
+        earned = np.bincount(index, weights=deltas[rewarded])
+        uses = np.bincount(index)
+        mean, std = earned.mean(), earned.std()
+        flagged = np.flatnonzero(earned > mean + FARMING_Z_SCORE * std) if std else np.empty(0, dtype=np.int64)
+        flagged = flagged[np.argsort(earned[flagged])[::-1]][:TOP_FARMERS]
+        summary.append((f"Earners above {FARMING_Z_SCORE:g}σ", f"{flagged.size:,} of {earners.size:,}"))
+        if flagged.size:
+            rows = [(int(earners[i]), int(uses[i]), f"{int(earned[i]):,}", f"{(earned[i] - mean) / std:.1f}") for i in flagged]
+            tables.append(("Possible positive-word farming", ["User", "Rewards", "Coins", "z-score"], rows, None))
+    return {"title": "💱 Fines vs Rewards", "summary": summary, "tables": tables}
+
+
+def item_section(purchases, item_names):
+    np = _numpy()
+    item_ids, prices, user_ids = purchases["item_id"], purchases["price_paid"], purchases["user_id"]
+    summary = [("Purchases", f"{item_ids.size:,}"), ("Coins spent", f"{int(prices.sum()):,}")]
+    if not item_ids.size:
+        return {"title": "🛒 Shop Items", "summary": summary, "tables": []}
+
+    items, index = np.unique(item_ids, return_inverse=True)
+    sold = np.bincount(index)
+    revenue = np.bincount(index, weights=prices)
+    # Unique (item, buyer) pairs counted per item
+    pairs = np.unique(np.stack([index, user_ids], axis=1), axis=0)
+    buyers = np.bincount(pairs[:, 0], minlength=items.size)
+    share = revenue / revenue.sum() * 100
+
+    rows = []
+    for i in np.argsort(revenue)[::-1]:
+        rows.append((item_names.get(int(items[i]), f"Item {items[i]} (removed)"), f"{int(sold[i]):,}", f"{int(revenue[i]):,}",
+                     f"{int(buyers[i]):,}", f"{revenue[i] / sold[i]:,.1f}", f"{sold[i] / buyers[i]:.2f}", f"{share[i]:.1f}%"))
+    summary.append(("Unique buyers", f"{np.unique(user_ids).size:,}"))
+    return {"title": "🛒 Shop Items", "summary": summary, "tables": [
+        ("Per-item economics", ["Item", "Sold", "Revenue", "Buyers", "Avg price", "Per buyer", "Revenue share"], rows, None)]}
+
+
+def moderation_section(events):
+    np = _numpy()
+    actions, user_ids = events["action"], events["user_id"]
+    summary = [("Events", f"{actions.size:,}")]
+    tables = []
+    if actions.size:
+        counts = np.bincount(actions[actions >= 0], minlength=len(MODERATION_ACTIONS))
+        tables.append(("Actions", ["Action", "Events"], [(action, int(counts[i])) for i, action in enumerate(MODERATION_ACTIONS)], 1))
+        _, per_user = np.unique(user_ids, return_counts=True)
+        muted = np.unique(user_ids[actions == MODERATION_ACTIONS.index("mute")]).size
+        summary += [("Users with events", f"{per_user.size:,}"), ("Users muted", f"{muted:,}"),
+                    ("Events per user (p50 / p99)", " / ".join(f"{v:,.0f}" for v in np.percentile(per_user, (50, 99))))]
+    return {"title": "🛡️ Moderation History", "summary": summary, "tables": tables}
+
+
+def build_report(conn, chunk_size=REPORT_CHUNK_SIZE):
+    """Load the database into column arrays and return (sections, timings in seconds per phase)."""
+    timings = {}
+
+    def timed(name, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+        return result
+
+    sections = []
+    users = timed("load", load_columns, conn, "SELECT coins, count, warnings FROM swear_counts",
+                  ["coins", "count", "warnings"], (), chunk_size)
+    sections.append(timed("compute", balance_section, users))
+    sections.append(timed("compute", swear_section, users))
+
+    if _has_table(conn, "ledger"):
+        ledger = timed("load", load_columns, conn,
+                       f"SELECT user_id, delta, {_code_case('reason', LEDGER_REASONS)} FROM ledger "
+                       f"WHERE reason IN ({', '.join('?' * len(LEDGER_REASONS))})",
+                       ["user_id", "delta", "reason"], LEDGER_REASONS, chunk_size)
+        sections.append(timed("compute", flow_section, ledger))
+
+    item_names = {item_id: f"{emoji} {name}" for item_id, name, emoji in conn.execute("SELECT id, name, emoji FROM shop_items")}
+    purchases = timed("load", load_columns, conn, "SELECT user_id, item_id, price_paid FROM shop_purchases",
+                      ["user_id", "item_id", "price_paid"], (), chunk_size)
+    sections.append(timed("compute", item_section, purchases, item_names))
+
+    if _has_table(conn, "moderation_events"):
+        events = timed("load", load_columns, conn,
+                       f"SELECT user_id, {_code_case('action', MODERATION_ACTIONS)} FROM moderation_events",
+                       ["user_id", "action"], (), chunk_size)
+        sections.append(timed("compute", moderation_section, events))
+
+    return sections, timings
+
+
+# ✅ Rendering
+def _bar(value, largest, width=20):
+    return "█" * round(value / largest * width) if largest else ""
+
+
+def render_markdown(sections, generated_at):
+    lines = ["# 📊 Swear Jar Report", "", f"Generated {generated_at}", ""]
+    for section in sections:
+        lines += [f"## {section['title']}", "", "| Metric | Value |", "| --- | --- |"]
+        lines += [f"| {label} | {value} |" for label, value in section["summary"]]
+        lines.append("")
+        for caption, headers, rows, bar_column in section["tables"]:
+            largest = max((row[bar_column] for row in rows), default=0) if bar_column is not None else 0
+            lines += [f"### {caption}", "", "| " + " | ".join(headers + ([""] if bar_column is not None else [])) + " |",
+                      "| " + " | ".join("---" for _ in headers + ([""] if bar_column is not None else [])) + " |"]
+            for row in rows:
+                cells = [str(cell) for cell in row]
+                if bar_column is not None:
+                    cells.append(_bar(row[bar_column], largest))
+                lines.append("| " + " | ".join(cells) + " |")
+            lines.append("")
+    return "\n".join(lines)
+
+
+def render_html(sections, generated_at):
+    def table(headers, rows):
+        head = "".join(f"<th>{html.escape(str(header))}</th>" for header in headers)
+        body = "".join("<tr>" + "".join(f"<td>{html.escape(str(cell))}</td>" for cell in row) + "</tr>" for row in rows)
+        return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Swear Jar Report</title>",
+        "<style>body{font-family:sans-serif;max-width:960px;margin:2em auto}table{border-collapse:collapse;margin:1em 0}"
+        "td,th{border:1px solid #ccc;padding:4px 8px;text-align:left}</style></head><body>",
+        f"<h1>📊 Swear Jar Report</h1><p>Generated {html.escape(generated_at)}</p>",
+    ]
+    for section in sections:
+        parts.append(f"<h2>{html.escape(section['title'])}</h2>")
+        parts.append(table(["Metric", "Value"], section["summary"]))
+        for caption, headers, rows, bar_column in section["tables"]:
+            parts.append(f"<h3>{html.escape(caption)}</h3>")
+            if bar_column is not None:
+                largest = max((row[bar_column] for row in rows), default=0)
+                rows = [row + (_bar(row[bar_column], largest),) for row in rows]
+                headers = headers + [""]
+            parts.append(table(headers, rows))
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def write_report(conn, path, fmt="markdown", chunk_size=REPORT_CHUNK_SIZE):
+    """Build the report and write it to `path`. Returns the phase timings."""
+    sections, timings = build_report(conn, chunk_size)
+    generated_at = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    start = time.perf_counter()
+    text = render_html(sections, generated_at) if fmt == "html" else render_markdown(sections, generated_at)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    timings["render"] = time.perf_counter() - start
+    return timings
+
+
+# ✅ Benchmark
+def make_synthetic_db(path, users, seed=0, chunk_size=REPORT_CHUNK_SIZE):
+    """Fill a new database at `path` with `users` users and proportional purchases, ledger entries and events."""
+    np = _numpy()
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        PRAGMA journal_mode=OFF;
+        PRAGMA synchronous=OFF;
+        CREATE TABLE swear_counts (user_id INTEGER PRIMARY KEY, count INTEGER DEFAULT 0, coins INTEGER DEFAULT 100,
+                                   warnings INTEGER DEFAULT 0, last_daily TIMESTAMP);
+        CREATE TABLE shop_items (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, emoji TEXT NOT NULL,
+                                 price INTEGER NOT NULL, description TEXT, role_id TEXT, effect TEXT);
+        CREATE TABLE shop_purchases (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL, item_id INTEGER NOT NULL,
+                                     price_paid INTEGER NOT NULL, purchase_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE ledger (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL, delta INTEGER NOT NULL,
+                             reason TEXT NOT NULL, ref TEXT, created_at INTEGER NOT NULL);
+        CREATE TABLE moderation_events (id INTEGER PRIMARY KEY AUTOINCREMENT, guild_id INTEGER, user_id INTEGER NOT NULL,
+                                        ts INTEGER NOT NULL, action TEXT NOT NULL, reason TEXT NOT NULL, detail TEXT,
+                                        channel_id INTEGER, message_id INTEGER);
+    """)
+    items = [("Mute Hammer", "🔨", 200), ("Swear Pass", "🎟️", 150), ("Money Bag", "💰", 100), ("VIP Role", "👑", 1000)]
+    conn.executemany("INSERT INTO shop_items (name, emoji, price) VALUES (?, ?, ?)", items)
+    prices = np.array([price for _, _, price in items])
+
+    def insert(sql, columns):
+        for start in range(0, len(columns[0]), chunk_size):
+            conn.executemany(sql, zip(*(column[start:start + chunk_size].tolist() for column in columns)))
+
+    now = int(time.time())
+    insert("INSERT INTO swear_counts (user_id, count, coins, warnings) VALUES (?, ?, ?, ?)", [
+        np.arange(1, users + 1), rng.poisson(4, users), rng.lognormal(4.5, 1.2, users).astype(np.int64), rng.poisson(0.3, users)])
+
+    purchases = users // 2
+    item_ids = rng.integers(1, len(items) + 1, purchases)
+    insert("INSERT INTO shop_purchases (user_id, item_id, price_paid) VALUES (?, ?, ?)", [
+        rng.integers(1, users + 1, purchases), item_ids, prices[item_ids - 1]])
+
+    entries = users * 2
+    is_fine = rng.random(entries) < 0.6
+    insert("INSERT INTO ledger (user_id, delta, reason, created_at) VALUES (?, ?, ?, ?)", [
+        rng.zipf(1.5, entries) % users + 1, np.where(is_fine, -10, rng.integers(5, 30, entries)),
+        np.where(is_fine, "swear_fine", "positive_word"), now - rng.integers(0, 90 * 86400, entries)])
+
+    events = users // 2
+    insert("INSERT INTO moderation_events (guild_id, user_id, ts, action, reason) VALUES (?, ?, ?, ?, ?)", [
+        np.ones(events, dtype=np.int64), rng.integers(1, users + 1, events), now - rng.integers(0, 90 * 86400, events),
+        rng.choice(np.array(MODERATION_ACTIONS), events, p=[0.1, 0.3, 0.5, 0.04, 0.04, 0.02]), np.full(events, "swear")])
+
+    conn.commit()
+    return conn
+
+
+def run_benchmark(users, fmt="markdown", chunk_size=REPORT_CHUNK_SIZE, seed=0):
+    """Build a synthetic database in a temporary directory and time each phase of the report."""
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        conn = make_synthetic_db(os.path.join(directory, "synthetic.db"), users, seed, chunk_size)
+        setup = time.perf_counter() - start
+        try:
+            timings = write_report(conn, os.path.join(directory, "report.html" if fmt == "html" else "report.md"), fmt, chunk_size)
+        finally:
+            conn.close()
+    return {"setup": setup, **timings}
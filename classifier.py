@@ -0,0 +1,123 @@
+"""Local toxicity classifier for the swear jar bot.
+
+A logistic regression over hashed word and character n-grams, trained from
+messages admins have labeled with /label_message. Features are hashed into a
+fixed number of buckets, so the model is a single weight vector whose size
+does not depend on the vocabulary, and scoring a batch of messages is one
+sparse dot product. Everything runs on the CPU with NumPy (pip install numpy).
+"""
+import os
+import re
+import zlib
+
+DIMENSIONS = 2 ** 18  # Hash buckets (1 MB of float32 weights)
+WORD_NGRAMS = (1, 2)
+CHAR_NGRAMS = (3, 4, 5)
+MAX_TEXT_LENGTH = 1000  # Characters of a message that are looked at
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("The toxicity classifier needs the numpy package (pip install numpy)")
+    return numpy
+
+
+def ngram_buckets(text, dimensions=DIMENSIONS):
+    """Hash a message's word and character n-grams into bucket indices."""
+    words = re.findall(r"\w+", text.lower()[:MAX_TEXT_LENGTH])
+    features = []
+    for n in WORD_NGRAMS:
+        features += ["w:" + " ".join(words[i:i + n]) for i in range(len(words) - n + 1)]
+    # Character n-grams catch misspellings and obfuscated words that word features miss
+    joined = f" {' '.join(words)} "
+    for n in CHAR_NGRAMS:
+        features += ["c:" + joined[i:i + n] for i in range(len(joined) - n + 1)]
+    # crc32 rather than hash() so buckets are the same in every process
+    return [zlib.crc32(feature.encode()) % dimensions for feature in features]
+
+
+def vectorize(texts, dimensions=DIMENSIONS):
+    """Sparse rows for `texts` as (rows, columns, values): row index, bucket and L2-normalized weight per feature."""
+    np = _numpy()
+    buckets = [ngram_buckets(text, dimensions) for text in texts]
+    lengths = np.array([len(row) for row in buckets], dtype=np.int64)
+    rows = np.repeat(np.arange(len(texts)), lengths)
+    columns = np.fromiter((bucket for row in buckets for bucket in row), dtype=np.int64, count=int(lengths.sum()))
+    values = np.repeat(1 / np.sqrt(np.maximum(lengths, 1)), lengths).astype(np.float32)
+    return rows, columns, values
+
+
+class HashedNgramModel:
+    """Logistic regression over hashed n-grams. predict_proba scores a whole batch at once."""
+
+    def __init__(self, weights, bias=0.0):
+        self.weights = weights
+        self.bias = float(bias)
+
+    @classmethod
+    def new(cls, dimensions=DIMENSIONS):
+        np = _numpy()
+        return cls(np.zeros(dimensions, dtype=np.float32))
+
+    @classmethod
+    def load(cls, path):
+        np = _numpy()
+        with np.load(path) as data:
+            return cls(data["weights"], float(data["bias"]))
+
+    def save(self, path):
+        np = _numpy()
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, weights=self.weights, bias=np.float32(self.bias))
+        os.replace(temp_path, path)
+
+    def _scores(self, rows, columns, values, count):
+        np = _numpy()
+        logits = np.bincount(rows, weights=self.weights[columns] * values, minlength=count) + self.bias
+        return 1 / (1 + np.exp(-logits))
+
+    def predict_proba(self, texts):
+        """Probability that each text is toxic."""
+        rows, columns, values = vectorize(texts, self.weights.size)
+        return self._scores(rows, columns, values, len(texts))
+
+    def fit(self, texts, labels, epochs=20, learning_rate=1.0, l2=1e-5, batch_size=256, seed=0):
+        """Train with mini-batch gradient descent. The rarer class is up-weighted so both count equally."""
+        np = _numpy()
+        labels = np.asarray(labels, dtype=np.float32)
+        order = np.random.default_rng(seed).permutation(len(texts))
+        texts = [texts[i] for i in order]
+        labels = labels[order]
+
+        positives = labels.sum()
+        negatives = labels.size - positives
+        sample_weights = np.where(labels == 1, labels.size / (2 * max(positives, 1)), labels.size / (2 * max(negatives, 1)))
+
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            rows, columns, values = vectorize(texts[start:start + batch_size], self.weights.size)
+            batches.append((start, rows, columns, values))
+
+        for _ in range(epochs):
+            for start, rows, columns, values in batches:
+                count = min(batch_size, len(texts) - start)
+                errors = (self._scores(rows, columns, values, count) - labels[start:start + count]) * sample_weights[start:start + count]
+                gradient = np.bincount(columns, weights=errors[rows] * values, minlength=self.weights.size) / count
+                self.weights -= (learning_rate * (gradient + l2 * self.weights)).astype(np.float32)
+                self.bias -= learning_rate * float(errors.mean())
+        return self
+
+    def evaluate(self, texts, labels, threshold=0.5):
+        """Accuracy, precision and recall at `threshold`."""
+        np = _numpy()
+        labels = np.asarray(labels, dtype=bool)
+        predicted = self.predict_proba(texts) >= threshold
+        true_positives = int((predicted & labels).sum())
+        return {
+            "accuracy": float((predicted == labels).mean()) if labels.size else 0.0,
+            "precision": true_positives / int(predicted.sum()) if predicted.any() else 0.0,
+            "recall": true_positives / int(labels.sum()) if labels.any() else 0.0,
+        }
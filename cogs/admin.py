@@ -0,0 +1,500 @@
+"""Admin tools: bulk economy operations, caches, backups, import/export, status and help."""
+import datetime
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+import datatools
+import core
+from core import (
+    bot, bot_cache_sizes, bulk_adjust_coins, bulk_reset, cached_response, COGS, command_payloads,
+    ensure_chunked, MEMORY_STATS, MEMORY_TRACE_FRAMES, POSITIVE_REACTION, read_id_attachment,
+    RESPONSE_CACHE, RESPONSE_CACHE_STATS, revert_batch, run_backup, run_export, run_import, run_restore,
+    set_bulk_targets, sync_changed_commands, take_memory_snapshot, USER_CACHE_MAX_MB, USER_STATES,
+    VERY_POSITIVE_REACTION,
+)
+
+# Collect the selectors shared by the bulk commands. Returns (set_bulk_targets arguments, target description).
+# The bulk_targets table itself is filled right before a batch runs (see the commands below).
+async def resolve_bulk_targets(role=None, active_days=None, csv_file=None, everyone=False):
+    user_ids = set()
+    target_parts = []
+
+    if role:
+        await ensure_chunked(role.guild)
+        user_ids.update(member.id for member in role.members)
+        target_parts.append(f"role:{role.id}")
+    if csv_file:
+        user_ids.update(await read_id_attachment(csv_file))
+        target_parts.append(f"csv:{csv_file.filename}")
+
+    active_since = None
+    if active_days:
+        active_since = int(time.time()) - active_days * 86400
+        target_parts.append(f"active:{active_days}d")
+    if everyone:
+        target_parts.append("everyone")
+
+    return {"user_ids": user_ids, "active_since": active_since, "everyone": everyone}, ", ".join(target_parts)
+
+class Admin(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # ✅ Slash Command `/bulk_coins`
+    @app_commands.command(name="bulk_coins", description="Give or fine coins for many users at once (admin only).")
+    @app_commands.describe(
+        amount="Coins per user: positive to give, negative to fine",
+        reason="Short reason recorded with the batch (e.g. event name)",
+        role="Target members of this role",
+        active_days="Target users with coin activity in the last N days",
+        csv_file="Target user IDs listed in a CSV file"
+    )
+    async def bulk_coins(self, interaction: discord.Interaction, amount: int, reason: str, role: discord.Role = None,
+                         active_days: int = None, csv_file: discord.Attachment = None):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to run bulk operations!", ephemeral=True)
+            return
+
+        if amount == 0:
+            await interaction.response.send_message("❌ Amount can't be zero!", ephemeral=True)
+            return
+
+        if not (role or active_days or csv_file):
+            await interaction.response.send_message("❌ Pick at least one target: a role, an activity window or a CSV file.", ephemeral=True)
+            return
+
+        await interaction.response.defer()
+        await interaction.edit_original_response(content="⏳ Resolving targets...")
+
+        selectors, target = await resolve_bulk_targets(role, active_days, csv_file)
+        await interaction.edit_original_response(content=f"⏳ Applying {amount:+d} coins...")
+
+        # bulk_targets is shared, so it is filled and used with no await in between for another command to refill it
+        if set_bulk_targets(**selectors) == 0:
+            await interaction.edit_original_response(content="📭 No users matched those targets.")
+            return
+        batch_id, affected = bulk_adjust_coins(amount, reason, target, interaction.user.id)
+
+        verb = "Gave" if amount > 0 else "Fined"
+        await interaction.edit_original_response(
+            content=f"✅ Batch `{batch_id}`: {verb} {abs(amount)} coins for {affected} users. Use `/revert_batch {batch_id}` to undo."
+        )
+
+    # ✅ Slash Command `/season_reset`
+    @app_commands.command(name="season_reset", description="Reset swear counts, coins and warnings for a new season (admin only).")
+    @app_commands.describe(
+        role="Only reset members of this role",
+        active_days="Only reset users with coin activity in the last N days",
+        csv_file="Only reset user IDs listed in a CSV file"
+    )
+    async def season_reset(self, interaction: discord.Interaction, role: discord.Role = None, active_days: int = None,
+                           csv_file: discord.Attachment = None):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to reset the season!", ephemeral=True)
+            return
+
+        await interaction.response.defer()
+        await interaction.edit_original_response(content="⏳ Resolving targets...")
+
+        everyone = not (role or active_days or csv_file)
+        selectors, target = await resolve_bulk_targets(role, active_days, csv_file, everyone=everyone)
+        await interaction.edit_original_response(content="⏳ Resetting users...")
+
+        # bulk_targets is shared, so it is filled and used with no await in between for another command to refill it
+        if set_bulk_targets(**selectors) == 0:
+            await interaction.edit_original_response(content="📭 No users matched those targets.")
+            return
+        batch_id, affected = bulk_reset("season", target, interaction.user.id)
+
+        await interaction.edit_original_response(
+            content=f"✅ Batch `{batch_id}`: Reset {affected} users. Use `/revert_batch {batch_id}` to undo."
+        )
+
+    # ✅ Slash Command `/reset_user`
+    @app_commands.command(name="reset_user", description="Reset a user's swear count, coins and warnings (admin only).")
+    @app_commands.describe(user="The user to reset")
+    async def reset_user(self, interaction: discord.Interaction, user: discord.Member):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to reset users!", ephemeral=True)
+            return
+
+        set_bulk_targets([user.id])
+        batch_id, affected = bulk_reset("user", f"user:{user.id}", interaction.user.id)
+
+        if not affected:
+            await interaction.response.send_message(f"📭 {user.mention} has no stats to reset.", ephemeral=True)
+            return
+
+        await interaction.response.send_message(f"✅ Reset {user.mention}'s stats. Use `/revert_batch {batch_id}` to undo.")
+
+    # ✅ Slash Command `/revert_batch`
+    @app_commands.command(name="revert_batch", description="Undo a bulk coin operation or reset (admin only).")
+    @app_commands.describe(batch_id="The batch ID reported when the operation ran")
+    async def revert_batch_command(self, interaction: discord.Interaction, batch_id: str):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to revert batches!", ephemeral=True)
+            return
+
+        restored = revert_batch(batch_id.strip())
+        if restored is None:
+            await interaction.response.send_message("❌ Batch not found or already reverted!", ephemeral=True)
+            return
+
+        await interaction.response.send_message(f"↩️ Reverted batch `{batch_id}` for {restored} users.")
+
+    # ✅ Slash Command `/cache_stats`
+    @app_commands.command(name="cache_stats", description="View hit rates and evictions for the bot's caches (admin only).")
+    async def cache_stats(self, interaction: discord.Interaction):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to view cache stats!", ephemeral=True)
+            return
+
+        stats = USER_STATES.stats
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / lookups * 100 if lookups else 0.0
+        size = len(USER_STATES.entries)
+
+        embed = discord.Embed(title="🧠 User State Cache", color=0x00FFFF)
+        embed.add_field(name="Cached Users", value=f"{size:,} / {USER_STATES.max_entries:,}", inline=True)
+        embed.add_field(name="Memory", value=f"~{size * USER_STATES.entry_bytes / 1024 / 1024:.1f} / {USER_CACHE_MAX_MB:g} MB", inline=True)
+        embed.add_field(name="Hit Rate", value=f"{hit_rate:.1f}% of {lookups:,} lookups", inline=True)
+        embed.add_field(name="Evictions", value=f"{stats['evictions']:,}", inline=True)
+        embed.add_field(name="Expirations", value=f"{stats['expirations']:,}", inline=True)
+        embed.add_field(name="Invalidations", value=f"{stats['invalidations']:,}", inline=True)
+
+        response_lines = []
+        for command, command_stats in sorted(RESPONSE_CACHE_STATS.items()):
+            lookups = command_stats["hits"] + command_stats["misses"]
+            response_lines.append(f"`/{command}`: {command_stats['hits'] / lookups * 100 if lookups else 0.0:.0f}% hits "
+                                  f"({lookups:,} calls, {command_stats['invalidations']:,} invalidations)")
+        embed.add_field(name="Response Cache", value="\n".join(response_lines) or "No cached responses yet", inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ✅ Slash Command `/memory`
+    @app_commands.command(name="memory", description="View the bot's memory use and top allocation sites (admin only).")
+    @app_commands.describe(tracing="Start or stop tracemalloc tracing (it slows the bot down while on)")
+    @app_commands.choices(tracing=[
+        app_commands.Choice(name="Start", value="start"),
+        app_commands.Choice(name="Stop", value="stop")
+    ])
+    async def memory(self, interaction: discord.Interaction, tracing: str = None):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to view memory use!", ephemeral=True)
+            return
+
+        if tracing == "start" and not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_TRACE_FRAMES or 1)
+        elif tracing == "stop" and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            MEMORY_STATS["top"] = []
+
+        embed = discord.Embed(title="🧮 Memory Use", color=0x00FFFF)
+
+        cache_lines = []
+        for name, entries, size in bot_cache_sizes():
+            cache_lines.append(f"**{name}**: {entries:,}" + (f" (~{size / 1024:,.0f} KB)" if size is not None else ""))
+        embed.add_field(name="Caches", value="\n".join(cache_lines), inline=False)
+
+        if take_memory_snapshot():
+            current, peak = tracemalloc.get_traced_memory()
+            embed.add_field(name="Traced Memory", value=f"{current / 1024 / 1024:.1f} MB (peak {peak / 1024 / 1024:.1f} MB)", inline=False)
+            site_lines = [f"`{site}` - {size / 1024:,.0f} KB in {blocks:,} blocks" for site, size, blocks in MEMORY_STATS["top"]]
+            embed.add_field(name="Top Allocation Sites", value="\n".join(site_lines) or "Nothing traced yet", inline=False)
+        else:
+            embed.set_footer(text="Tracing is off. Use /memory tracing:Start to see allocation sites.")
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ✅ Slash Command `/export_data`
+    @app_commands.command(name="export_data", description="Export bot data as a file (admin only).")
+    @app_commands.rename(file_format="format")
+    @app_commands.describe(
+        file_format="The file format to export",
+        table="Only export this table (required for CSV)"
+    )
+    @app_commands.choices(file_format=[
+        app_commands.Choice(name="JSON Lines (all tables)", value="jsonl"),
+        app_commands.Choice(name="CSV (single table)", value="csv")
+    ])
+    async def export_data(self, interaction: discord.Interaction, file_format: str = "jsonl", table: str = None):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to export data!", ephemeral=True)
+            return
+
+        if table is not None and table not in datatools.EXPORT_TABLES:
+            await interaction.response.send_message(f"❌ Unknown table! Available: `{'`, `'.join(datatools.EXPORT_TABLES)}`", ephemeral=True)
+            return
+
+        if file_format == "csv" and not table:
+            await interaction.response.send_message("❌ CSV exports need a table!", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        # Stream to a temporary file so memory use doesn't grow with the tables
+        fd, path = tempfile.mkstemp(suffix=f".{file_format}")
+        os.close(fd)
+        try:
+            await run_export(path, file_format, table)
+            filename = f"{table or 'swearjar'}.{file_format}"
+            await interaction.followup.send("📦 Here's your export!", file=discord.File(path, filename=filename), ephemeral=True)
+        except discord.HTTPException as e:
+            await interaction.followup.send(f"❌ Couldn't upload the export ({e}). Run `python datatools.py export` on the host instead.", ephemeral=True)
+        finally:
+            os.remove(path)
+
+    # ✅ Slash Command `/backup`
+    @app_commands.command(name="backup", description="Take a database backup now and view backup status (admin only).")
+    async def backup(self, interaction: discord.Interaction):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to back up the database!", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            stats = await run_backup()
+        except Exception as e:
+            await interaction.followup.send(f"❌ Backup failed: {e}", ephemeral=True)
+            return
+
+        embed = discord.Embed(title="💾 Backup Complete", color=0x2ECC71)
+        embed.add_field(name="File", value=f"`{os.path.basename(stats['path'])}`", inline=False)
+        embed.add_field(name="Size", value=f"{stats['size'] / 1024:.1f} KiB ({stats['db_size'] / 1024:.1f} KiB uncompressed)", inline=True)
+        embed.add_field(name="Duration", value=f"{stats['duration']:.2f}s", inline=True)
+
+        backups = datatools.list_backups()
+        embed.add_field(
+            name=f"Stored Backups ({len(backups)}/{datatools.BACKUP_RETENTION})",
+            value="\n".join(f"`{name}`" for name in backups[:10]) or "None",
+            inline=False
+        )
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    # ✅ Slash Command `/restore_backup`
+    @app_commands.command(name="restore_backup", description="Restore the database from a backup file (admin only).")
+    @app_commands.describe(name="The backup file name shown by /backup")
+    async def restore_backup(self, interaction: discord.Interaction, name: str):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to restore backups!", ephemeral=True)
+            return
+
+        if name not in datatools.list_backups():
+            await interaction.response.send_message("❌ Backup not found! Use `/backup` to list stored backups.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        # Keep a copy of the current state in case the restore was a mistake
+        try:
+            safety = await run_backup()
+            await run_restore(os.path.join(datatools.BACKUP_DIR, name))
+        except Exception as e:
+            await interaction.followup.send(f"❌ Restore failed: {e}", ephemeral=True)
+            return
+
+        await interaction.followup.send(
+            f"✅ Restored `{name}`. The previous state was saved as `{os.path.basename(safety['path'])}`.",
+            ephemeral=True
+        )
+
+    # ✅ Slash Command `/import_data`
+    @app_commands.command(name="import_data", description="Import bot data from an export file (admin only).")
+    @app_commands.describe(
+        file="A .jsonl export, or a .csv export of a single table",
+        table="The table a CSV file belongs to"
+    )
+    async def import_data(self, interaction: discord.Interaction, file: discord.Attachment, table: str = None):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to import data!", ephemeral=True)
+            return
+
+        file_format = "csv" if file.filename.lower().endswith(".csv") else "jsonl"
+        if file_format == "csv" and table not in datatools.EXPORT_TABLES:
+            await interaction.response.send_message(f"❌ CSV imports need a table! Available: `{'`, `'.join(datatools.EXPORT_TABLES)}`", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        fd, path = tempfile.mkstemp(suffix=f".{file_format}")
+        os.close(fd)
+        try:
+            await file.save(path)
+            counts = await run_import(path, file_format, table)
+        # Malformed rows (e.g. a JSON list where an object belongs) surface as AttributeError or TypeError
+        except (ValueError, KeyError, AttributeError, TypeError, sqlite3.Error) as e:
+            await interaction.followup.send(f"❌ Import failed, nothing was changed: {e}", ephemeral=True)
+            return
+        finally:
+            os.remove(path)
+
+        summary = "\n".join(f"`{name}`: {count} rows" for name, count in counts.items()) or "No rows found."
+        await interaction.followup.send(f"✅ Import complete!\n{summary}", ephemeral=True)
+
+    # ✅ Slash Command `/ping`
+    @app_commands.command(name="ping", description="Check if the bot is online and responding")
+    async def ping(self, interaction: discord.Interaction):
+        # Calculate bot latency
+        latency = round(bot.latency * 1000)  # Convert to ms
+
+        # Get bot uptime
+        current_time = datetime.datetime.now()
+        uptime = current_time - bot.start_time if hasattr(bot, 'start_time') else datetime.timedelta(seconds=0)
+
+        # Format uptime nicely
+        days, remainder = divmod(int(uptime.total_seconds()), 86400)
+        hours, remainder = divmod(remainder, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        uptime_str = f"{days}d {hours}h {minutes}m {seconds}s"
+
+        embed = discord.Embed(
+            title="🔔 Bot Status", 
+            description="The bot is online and operational!", 
+            color=0x00FF00
+        )
+
+        embed.add_field(name="Ping", value=f"{latency}ms", inline=True)
+        embed.add_field(name="Uptime", value=uptime_str, inline=True)
+        embed.add_field(name="Commands", value=f"{len(bot.tree.get_commands())} loaded", inline=True)
+
+        await interaction.response.send_message(embed=embed)
+
+    # ✅ Slash Command `/help`
+    @app_commands.command(name="help", description="Display information about the bot's commands and features.")
+    @cached_response(ttl=3600, events=("reactions_changed",), per_guild=False)
+    async def help_command(self, interaction: discord.Interaction):
+        embed = discord.Embed(
+            title="🤖 Swear Jar Bot Help", 
+            description="This bot monitors chat for swear words and maintains an economy system with reactions that indicate moderation levels.", 
+            color=0x5865F2
+        )
+
+        # User commands
+        user_commands = """
+    `/balance` - Check your current coin balance
+    `/daily` - Claim your daily reward coins
+    `/weekly` - Claim your weekly reward coins
+    `/shop` - View items available for purchase
+    `/buy` - Purchase items from the shop
+    `/inventory` - View your purchased items
+    `/use_item` - Use an item from your inventory
+    `/leaderboard` - View top swearers
+    `/stats` - View swear trends for the server or a user
+    `/richest` - View users with most coins
+    `/moderation_levels` - View info about reaction system
+    `/policy` - View this server's moderation policy
+    `/ping` - Check if bot is online and get status
+    """
+        embed.add_field(name="📝 User Commands", value=user_commands, inline=False)
+
+        # Admin commands
+        admin_commands = """
+    `/addswear` - Add a word to the swear list
+    `/removeswear` - Remove a word from the swear list
+    `/banned_words` - View all banned words
+    `/addpositive` - Add a positive word with reward
+    `/removepositive` - Remove a positive word
+    `/positive_words_list` - View all positive words
+    `/set_currency` - Set currency name
+    `/set_currency_emoji` - Set currency emoji
+    `/give_coins` - Give coins to a user
+    `/ledger` - View a user's coin transactions
+    `/bulk_coins` - Give or fine coins for many users
+    `/season_reset` - Reset stats for a new season
+    `/reset_user` - Reset a user's stats
+    `/revert_batch` - Undo a bulk operation
+    `/shop_stats` - View shop revenue and coin flow
+    """
+        embed.add_field(name="⚙️ Admin Commands", value=admin_commands, inline=False)
+
+        # Moderation and maintenance commands (a field holds at most 1024 characters)
+        moderation_commands = """
+    `/history` - View a user's moderation history
+    `/scan_history` - Scan past messages for filtered terms
+    `/channel_mode` - Set a channel to full, tally or sampled moderation
+    `/set_policy` - Change a moderation policy setting
+    `/reset_policy` - Restore the default moderation policy
+    `/label_message` - Label a message for the toxicity classifier
+    `/train_classifier` - Train the toxicity classifier
+    `/cache_stats` - View cache hit rates
+    `/memory` - View memory use and allocation sites
+    `/export_data` - Export bot data as a file
+    `/import_data` - Import bot data from a file
+    `/backup` - Back up the database now
+    `/restore_backup` - Restore a database backup
+    `/reload` - Reload a cog without restarting
+    """
+        embed.add_field(name="🛡️ Moderation & Maintenance", value=moderation_commands, inline=False)
+
+        # Shop commands
+        shop_commands = """
+    `/add_shop_item` - Add an item to the shop
+    `/remove_shop_item` - Remove an item from the shop 
+    `/update_shop_item` - Update an existing shop item
+    `/shop_manager` - View and manage shop items
+    """
+        embed.add_field(name="🛒 Shop Management", value=shop_commands, inline=False)
+
+        # Reaction system
+        reaction_info = f"""
+    This bot now features an animated emoji reaction system that visually indicates moderation levels:
+
+    {core.MILD_REACTION} **Level 1:** First offense
+    {core.MODERATE_REACTION} **Level 2:** Second offense or frequent offender
+    {core.SEVERE_REACTION} **Level 3:** Near mute threshold
+    {core.MUTED_REACTION} **Level 4:** Muted user
+    {POSITIVE_REACTION} **Positive:** Reward for positive words
+    {VERY_POSITIVE_REACTION} **Very Positive:** Consistent good behavior
+
+    Use `/moderation_levels` for more details
+    """
+        embed.add_field(name="⚠️ Reaction System", value=reaction_info, inline=False)
+
+        return {"embed": embed}
+
+    # ✅ Slash Command `/reload`
+    @app_commands.command(name="reload", description="Reload a cog's code without restarting the bot (admin only).")
+    @app_commands.describe(cog="The cog to reload")
+    @app_commands.choices(cog=[app_commands.Choice(name=name, value=name) for name in COGS])
+    async def reload(self, interaction: discord.Interaction, cog: str):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to reload cogs!", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        # The database, caches and scheduled unmutes live in core, so only the cog's code is replaced
+        before = command_payloads()
+        try:
+            await bot.reload_extension(f"cogs.{cog}")
+        except commands.ExtensionError as e:
+            await interaction.followup.send(f"❌ Failed to reload `{cog}`: {e}", ephemeral=True)
+            return
+        RESPONSE_CACHE.clear()
+
+        try:
+            changed, removed = await sync_changed_commands(before)
+        except discord.HTTPException as e:
+            await interaction.followup.send(f"⚠️ Reloaded `{cog}`, but syncing commands failed: {e}", ephemeral=True)
+            return
+
+        synced = ", ".join(f"`/{name}`" for name in changed + removed) or "none"
+        await interaction.followup.send(f"♻️ Reloaded `{cog}`. Commands resynced: {synced}", ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
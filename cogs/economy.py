@@ -0,0 +1,223 @@
+"""Economy commands: balances, timed rewards, leaderboards and the coin ledger."""
+import random
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core import (
+    auto_defer, c, claim_cooldown, conn, cooldown_remaining, display_name, fetch_page, format_duration,
+    get_ledger_balance, PAGE_SIZE, PagedView, record_transaction, respond, STARTING_COINS, store,
+    streak_multiplier, USER_STATES,
+)
+
+# Shared flow for timed rewards: check the cooldown, apply the streak bonus, pay out
+async def claim_reward(interaction, action, base_reward):
+    user_id = interaction.user.id
+
+    remaining = cooldown_remaining(user_id, action)
+    if remaining:
+        await interaction.response.send_message(
+            f"⏰ You already claimed your {action} reward! Try again in {format_duration(remaining)}.",
+            ephemeral=True
+        )
+        return
+
+    # Check if user exists, if not create entry
+    c.execute("SELECT coins FROM swear_counts WHERE user_id = ?", (user_id,))
+    result = c.fetchone()
+    streak = claim_cooldown(user_id, action)
+
+    if not result and action == "daily":
+        # New user, give them coins
+        c.execute("INSERT INTO swear_counts (user_id, coins) VALUES (?, ?)", (user_id, STARTING_COINS))
+        conn.commit()
+        USER_STATES.invalidate(user_id)
+        await interaction.response.send_message(f"🎉 Welcome! You received your first {STARTING_COINS} coins!")
+        return
+
+    current_coins = result[0] if result else STARTING_COINS
+    reward = int(base_reward * streak_multiplier(streak))
+    new_coins = current_coins + reward
+
+    c.execute("INSERT OR IGNORE INTO swear_counts (user_id, coins) VALUES (?, ?)", (user_id, STARTING_COINS))
+    c.execute("UPDATE swear_counts SET coins = ? WHERE user_id = ?", (new_coins, user_id))
+    record_transaction(user_id, reward, action)
+    conn.commit()
+    USER_STATES.invalidate(user_id)
+
+    # Get the currency emoji from settings, default to 💰
+    currency_emoji = await store.get_setting("currency_emoji", "💰")
+
+    streak_text = f" 🔥 {streak}x streak (+{int((streak_multiplier(streak) - 1) * 100)}%)!" if streak > 1 else ""
+    await interaction.response.send_message(f"🎁 You claimed your {action} reward of {reward} coins!{streak_text} You now have {new_coins} {currency_emoji}.")
+
+class Economy(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # ✅ Slash Command `/balance`
+    @app_commands.command(name="balance", description="Check your remaining coins.")
+    async def balance(self, interaction: discord.Interaction):
+        c.execute("SELECT coins FROM swear_counts WHERE user_id = ?", (interaction.user.id,))
+        result = c.fetchone()
+        coins = result[0] if result else 100
+
+        # Get the currency emoji from settings, default to 💰
+        currency_emoji = await store.get_setting("currency_emoji", "💰")
+
+        await interaction.response.send_message(f"{currency_emoji} You have `{coins}` coins left!")
+
+    # ✅ Slash Command `/daily`
+    @app_commands.command(name="daily", description="Collect your daily coins reward.")
+    async def daily(self, interaction: discord.Interaction):
+        await claim_reward(interaction, "daily", random.randint(50, 150))
+
+    # ✅ Slash Command `/weekly`
+    @app_commands.command(name="weekly", description="Collect your weekly coins reward.")
+    async def weekly(self, interaction: discord.Interaction):
+        await claim_reward(interaction, "weekly", random.randint(300, 600))
+
+    # ✅ Slash Command `/set_currency <n>`
+    @app_commands.command(name="set_currency", description="Set the currency name (e.g. gold, tokens).")
+    async def set_currency(self, interaction: discord.Interaction, name: str):
+        await store.set_setting("currency", name)
+        await interaction.response.send_message(f"💰 Currency name set to `{name}`!")
+
+    # ✅ Slash Command `/set_currency_emoji`
+    @app_commands.command(name="set_currency_emoji", description="Set the emoji used for currency.")
+    @app_commands.describe(emoji="The emoji to use as currency symbol")
+    async def set_currency_emoji(self, interaction: discord.Interaction, emoji: str):
+        # Basic check to ensure it's likely an emoji
+        if len(emoji.strip()) != 1 and not emoji.startswith('<:'):
+            await interaction.response.send_message("⚠️ Please provide a valid emoji!", ephemeral=True)
+            return
+
+        await store.set_setting("currency_emoji", emoji)
+        await interaction.response.send_message(f"✅ Currency emoji set to {emoji}!")
+
+    # ✅ Slash Command `/give_coins`
+    @app_commands.command(name="give_coins", description="Give coins to a user (admin only).")
+    @app_commands.describe(
+        user="The user to give coins to",
+        amount="The amount of coins to give"
+    )
+    async def give_coins(self, interaction: discord.Interaction, user: discord.Member, amount: int):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to give coins!", ephemeral=True)
+            return
+
+        if amount <= 0:
+            await interaction.response.send_message("❌ Amount must be positive!", ephemeral=True)
+            return
+
+        # Check if user exists in the database
+        c.execute("SELECT coins FROM swear_counts WHERE user_id = ?", (user.id,))
+        result = c.fetchone()
+
+        if result:
+            current_coins = result[0]
+            new_amount = current_coins + amount
+            c.execute("UPDATE swear_counts SET coins = ? WHERE user_id = ?", (new_amount, user.id))
+        else:
+            new_amount = 100 + amount
+            c.execute("INSERT INTO swear_counts (user_id, coins) VALUES (?, ?)", (user.id, new_amount))
+
+        record_transaction(user.id, amount, "admin_grant", f"admin:{interaction.user.id}")
+        conn.commit()
+        USER_STATES.invalidate(user.id)
+
+        await interaction.response.send_message(f"✅ Gave {amount} coins to {user.mention}! They now have {new_amount} coins.")
+
+    # ✅ Slash Command `/ledger`
+    @app_commands.command(name="ledger", description="View a user's recent coin transactions (admin only).")
+    @app_commands.describe(user="The user whose transactions to view")
+    async def ledger(self, interaction: discord.Interaction, user: discord.Member):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to view the ledger!", ephemeral=True)
+            return
+
+        derived_balance = get_ledger_balance(user.id)
+
+        c.execute("""
+            SELECT id, delta, reason, ref, created_at
+            FROM ledger
+            WHERE user_id = ?
+            ORDER BY id DESC
+            LIMIT 10
+        """, (user.id,))
+        entries = c.fetchall()
+
+        c.execute("SELECT coins FROM swear_counts WHERE user_id = ?", (user.id,))
+        result = c.fetchone()
+        coins = result[0] if result else STARTING_COINS
+
+        embed = discord.Embed(title=f"📒 Ledger for {user.display_name}", color=0x3498DB)
+        embed.add_field(name="Balance", value=f"{coins} coins", inline=True)
+        embed.add_field(name="Ledger Balance", value=f"{derived_balance} coins", inline=True)
+
+        if not entries:
+            embed.description = "No transactions recorded yet."
+
+        for entry_id, delta, reason, ref, created_at in entries:
+            ref_text = f" | `{ref}`" if ref else ""
+            embed.add_field(
+                name=f"#{entry_id}: {delta:+d} ({reason})",
+                value=f"<t:{created_at}:R>{ref_text}",
+                inline=False
+            )
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ✅ Slash Command `/leaderboard`
+    @app_commands.command(name="leaderboard", description="View the swear jar leaderboard.")
+    @auto_defer()
+    async def leaderboard(self, interaction: discord.Interaction):
+        c.execute("SELECT 1 FROM swear_counts LIMIT 1")
+        if not c.fetchone():
+            await respond(interaction, "📊 No swear counts recorded yet!")
+            return
+
+        async def render_page(page):
+            swearers, has_next = fetch_page("SELECT user_id, count FROM swear_counts ORDER BY count DESC, user_id", (), page)
+            embed = discord.Embed(title="🤬 Swear Jar Leaderboard", description="Top swearers:", color=0xFF0000)
+            for i, (user_id, count) in enumerate(swearers, page * PAGE_SIZE + 1):
+                embed.add_field(name=f"{i}. {await display_name(user_id)}", value=f"{count} swears", inline=False)
+            embed.set_footer(text=f"Page {page + 1}")
+            return embed, has_next
+
+        await PagedView(render_page, interaction.user.id).start(interaction)
+
+    # ✅ Slash Command `/richest`
+    @app_commands.command(name="richest", description="View the users with the most coins.")
+    @auto_defer()
+    async def richest(self, interaction: discord.Interaction):
+        c.execute("SELECT 1 FROM swear_counts LIMIT 1")
+        if not c.fetchone():
+            await respond(interaction, "📊 No users have any coins yet!")
+            return
+
+        # Get the currency name from settings, default to "coins"
+        currency_name = await store.get_setting("currency", "coins")
+
+        # Get the emoji from settings
+        currency_emoji = await store.get_setting("currency_emoji", "💰")
+
+        async def render_page(page):
+            rich_users, has_next = fetch_page("SELECT user_id, coins FROM swear_counts ORDER BY coins DESC, user_id", (), page)
+            embed = discord.Embed(
+                title=f"{currency_emoji} Richest Users", 
+                description=f"Users with the most {currency_name}:", 
+                color=0xFFD700
+            )
+            for i, (user_id, coins) in enumerate(rich_users, page * PAGE_SIZE + 1):
+                embed.add_field(name=f"{i}. {await display_name(user_id)}", value=f"{coins} {currency_name}", inline=False)
+            embed.set_footer(text=f"Page {page + 1}")
+            return embed, has_next
+
+        await PagedView(render_page, interaction.user.id).start(interaction)
+
+async def setup(bot):
+    await bot.add_cog(Economy(bot))
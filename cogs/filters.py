@@ -0,0 +1,266 @@
+"""Commands that manage the swear, positive, NSFW, GIF and warning message lists."""
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core import (
+    auto_defer, c, cached_response, fetch_page, PAGE_SIZE, PagedView, POSITIVE_WORDS, publish, respond,
+    store, SWEAR_WORDS,
+)
+
+class Filters(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # ✅ Slash Command `/addswear`
+    @app_commands.command(name="addswear", description="Add a new swear word to the list.")
+    @app_commands.describe(word="The word you want to add to the swear list")
+    async def addswear(self, interaction: discord.Interaction, word: str):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to add swear words!", ephemeral=True)
+            return
+
+        await store.add_term("swear", word.lower())
+        SWEAR_WORDS.add(word.lower())
+        publish("terms_changed", kind="swear")
+        await interaction.response.send_message(f"✅ Added `{word}` to the swear list!")
+
+    # ✅ Slash Command `/removeswear`
+    @app_commands.command(name="removeswear", description="Remove a word from the swear list.")
+    @app_commands.describe(word="The word you want to remove")
+    async def removeswear(self, interaction: discord.Interaction, word: str):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to remove swear words!", ephemeral=True)
+            return
+
+        await store.remove_term("swear", word.lower())
+        SWEAR_WORDS.discard(word.lower())
+        publish("terms_changed", kind="swear")
+        await interaction.response.send_message(f"✅ Removed `{word}` from the swear list!")
+
+    # ✅ Slash Command `/addpositive`
+    @app_commands.command(name="addpositive", description="Add a new positive word to reward users.")
+    @app_commands.describe(
+        word="The positive word or phrase to add",
+        reward="Coins to reward when used (default: 5)"
+    )
+    async def addpositive(self, interaction: discord.Interaction, word: str, reward: int = 5):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to add positive words!", ephemeral=True)
+            return
+
+        if reward <= 0:
+            await interaction.response.send_message("❌ Reward must be positive!", ephemeral=True)
+            return
+
+        await store.add_term("positive", word.lower(), reward)
+        POSITIVE_WORDS[word.lower()] = reward
+        publish("terms_changed", kind="positive")
+        await interaction.response.send_message(f"✅ Added `{word}` as a positive word with {reward} coins reward!")
+
+    # ✅ Slash Command `/removepositive`
+    @app_commands.command(name="removepositive", description="Remove a word from the positive words list.")
+    @app_commands.describe(word="The word you want to remove")
+    async def removepositive(self, interaction: discord.Interaction, word: str):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to remove positive words!", ephemeral=True)
+            return
+
+        await store.remove_term("positive", word.lower())
+        POSITIVE_WORDS.pop(word.lower(), None)
+        publish("terms_changed", kind="positive")
+        await interaction.response.send_message(f"✅ Removed `{word}` from the positive words list!")
+
+    # ✅ Slash Command `/positive_words_list`
+    @app_commands.command(name="positive_words_list", description="View all positive words and their rewards.")
+    @cached_response(ttl=600, events=("terms_changed",), per_guild=False)
+    async def positive_words_list(self, interaction: discord.Interaction):
+        c.execute("SELECT word, reward FROM positive_words")
+        words = c.fetchall()
+
+        if not words:
+            return {"content": "📋 No positive words have been added yet!"}
+
+        embed = discord.Embed(title="✨ Positive Words List", description="Words that earn coins when used:", color=0x00FFFF)
+
+        for word, reward in words:
+            embed.add_field(name=word, value=f"Reward: {reward} coins", inline=True)
+
+        return {"embed": embed}
+
+    # ✅ Slash Command `/banned_words`
+    @app_commands.command(name="banned_words", description="View all banned words.")
+    @cached_response(ttl=600, events=("terms_changed",), per_guild=False)
+    @auto_defer(ephemeral=True)
+    async def banned_words(self, interaction: discord.Interaction):
+        c.execute("SELECT word FROM swear_words")
+        db_words = c.fetchall()
+        all_words = [row[0] for row in db_words]
+        all_words.extend(["sorry", "fuck", "damn"])  # Add default words
+        all_words = list(set(all_words))  # Remove duplicates
+
+        if not all_words:
+            return {"content": "📋 No words are banned yet!", "ephemeral": True}
+
+        embed = discord.Embed(title="🚫 Banned Words", description="Words that trigger the swear jar:", color=0xFF0000)
+
+        # Split words into chunks to avoid hitting field limits
+        chunk_size = 10
+        word_chunks = [all_words[i:i + chunk_size] for i in range(0, len(all_words), chunk_size)]
+
+        for i, chunk in enumerate(word_chunks, 1):
+            embed.add_field(name=f"Words {i}", value="`" + "`, `".join(chunk) + "`", inline=False)
+
+        return {"embed": embed, "ephemeral": True}
+
+    # ✅ Slash Command `/add_nsfw_word`
+    @app_commands.command(name="add_nsfw_word", description="Add a new NSFW word to the filter list.")
+    @app_commands.describe(word="The NSFW word you want to filter")
+    async def add_nsfw_word(self, interaction: discord.Interaction, word: str):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to add NSFW words!", ephemeral=True)
+            return
+
+        await store.add_term("nsfw", word.lower())
+        publish("terms_changed", kind="nsfw")
+        await interaction.response.send_message(f"✅ Added `{word}` to the NSFW filter list!", ephemeral=True)
+
+    # ✅ Slash Command `/remove_nsfw_word`
+    @app_commands.command(name="remove_nsfw_word", description="Remove a word from the NSFW filter list.")
+    @app_commands.describe(word="The NSFW word you want to remove from filtering")
+    async def remove_nsfw_word(self, interaction: discord.Interaction, word: str):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to remove NSFW words!", ephemeral=True)
+            return
+
+        await store.remove_term("nsfw", word.lower())
+        publish("terms_changed", kind="nsfw")
+        await interaction.response.send_message(f"✅ Removed `{word}` from the NSFW filter list!", ephemeral=True)
+
+    # ✅ Slash Command `/nsfw_words_list`
+    @app_commands.command(name="nsfw_words_list", description="View all filtered NSFW words.")
+    @auto_defer(ephemeral=True)
+    async def nsfw_words_list(self, interaction: discord.Interaction):
+        # Check if admin to view the list
+        if not interaction.user.guild_permissions.administrator:
+            await respond(interaction, "❌ You need administrator permissions to view NSFW words!", ephemeral=True)
+            return
+
+        c.execute("SELECT 1 FROM nsfw_words LIMIT 1")
+        if not c.fetchone():
+            await respond(interaction, "📋 No NSFW words have been added to the filter yet!", ephemeral=True)
+            return
+
+        async def render_page(page):
+            words, has_next = fetch_page("SELECT word FROM nsfw_words ORDER BY word", (), page, page_size=50)
+            embed = discord.Embed(title="🔞 NSFW Filter List", description="Words that trigger content removal:", color=0xFF0000)
+
+            # Split words into chunks to avoid hitting field limits
+            for i in range(0, len(words), 10):
+                words_text = "`, `".join([row[0] for row in words[i:i + 10]])
+                embed.add_field(name=f"Words {page * 50 + i + 1}-{page * 50 + min(i + 10, len(words))}", value=f"`{words_text}`", inline=False)
+            embed.set_footer(text=f"Page {page + 1}")
+            return embed, has_next
+
+        await PagedView(render_page, interaction.user.id).start(interaction, ephemeral=True)
+
+    # ✅ Slash Command `/add_gif_filter`
+    @app_commands.command(name="add_gif_filter", description="Add a new term to the GIF filter list.")
+    @app_commands.describe(filter_term="The term to filter in GIFs (e.g., 'nsfw', 'violence')")
+    async def add_gif_filter(self, interaction: discord.Interaction, filter_term: str):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to add GIF filters!", ephemeral=True)
+            return
+
+        await store.add_term("gif", filter_term.lower())
+        publish("terms_changed", kind="gif")
+        await interaction.response.send_message(f"✅ Added `{filter_term}` to the GIF filter list!", ephemeral=True)
+
+    # ✅ Slash Command `/remove_gif_filter`
+    @app_commands.command(name="remove_gif_filter", description="Remove a term from the GIF filter list.")
+    @app_commands.describe(filter_term="The term to remove from GIF filtering")
+    async def remove_gif_filter(self, interaction: discord.Interaction, filter_term: str):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to remove GIF filters!", ephemeral=True)
+            return
+
+        await store.remove_term("gif", filter_term.lower())
+        publish("terms_changed", kind="gif")
+        await interaction.response.send_message(f"✅ Removed `{filter_term}` from the GIF filter list!", ephemeral=True)
+
+    # ✅ Slash Command `/gif_filters_list`
+    @app_commands.command(name="gif_filters_list", description="View all filtered GIF terms.")
+    async def gif_filters_list(self, interaction: discord.Interaction):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to view GIF filters!", ephemeral=True)
+            return
+
+        c.execute("SELECT filter FROM gif_filters")
+        filters = c.fetchall()
+
+        if not filters:
+            await interaction.response.send_message("📋 No GIF filter terms have been added yet!", ephemeral=True)
+            return
+
+        embed = discord.Embed(title="🎬 GIF Filter List", description="Terms that trigger GIF removal:", color=0xFF5733)
+
+        # List all filter terms
+        filters_text = "`, `".join([row[0] for row in filters])
+        embed.add_field(name="Filtered Terms", value=f"`{filters_text}`", inline=False)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ✅ Slash Command `/add_warning_message`
+    @app_commands.command(name="add_warning_message", description="Add a custom warning message for rule violations.")
+    @app_commands.describe(message="The warning message to display to users")
+    async def add_warning_message(self, interaction: discord.Interaction, message: str):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to add warning messages!", ephemeral=True)
+            return
+
+        await store.add_term("warning", message)
+        await interaction.response.send_message(f"✅ Added warning message: `{message}`", ephemeral=True)
+
+    # ✅ Slash Command `/remove_warning_message`
+    @app_commands.command(name="remove_warning_message", description="Remove a custom warning message.")
+    @app_commands.describe(message="The exact warning message to remove")
+    async def remove_warning_message(self, interaction: discord.Interaction, message: str):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to remove warning messages!", ephemeral=True)
+            return
+
+        await store.remove_term("warning", message)
+        await interaction.response.send_message(f"✅ Removed warning message: `{message}`", ephemeral=True)
+
+    # ✅ Slash Command `/warning_messages_list`
+    @app_commands.command(name="warning_messages_list", description="View all custom warning messages.")
+    @auto_defer()
+    async def warning_messages_list(self, interaction: discord.Interaction):
+        c.execute("SELECT 1 FROM warning_messages LIMIT 1")
+        if not c.fetchone():
+            await respond(interaction, "📋 No custom warning messages have been added yet!")
+            return
+
+        async def render_page(page):
+            messages, has_next = fetch_page("SELECT message FROM warning_messages ORDER BY rowid", (), page)
+            embed = discord.Embed(title="⚠️ Warning Messages", description="Custom messages used for rule violations:", color=0xFFA500)
+            for i, (message,) in enumerate(messages, page * PAGE_SIZE + 1):
+                embed.add_field(name=f"Message {i}", value=message[:1024], inline=False)
+            embed.set_footer(text=f"Page {page + 1}")
+            return embed, has_next
+
+        await PagedView(render_page, interaction.user.id).start(interaction)
+
+async def setup(bot):
+    await bot.add_cog(Filters(bot))
@@ -0,0 +1,625 @@
+"""Message moderation: the message listeners, history scans, channel modes and policies."""
+import asyncio
+import json
+import random
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from termindex import TermMatch
+import core
+from core import (
+    auto_defer, bot, c, cached_response, CHANNEL_MODE_NAMES, CHANNEL_MODES, CLASSIFIER_EXECUTOR,
+    CLASSIFIER_MIN_LABELS, classify_message, conn, current_matcher, DEFAULT_POLICY, fetch_moderation_events,
+    first_delivery, fit_classifier, format_duration, get_muted_role, get_policy, get_user_moderation_level,
+    load_user_state, log_message_event, NO_GUILD, over_rate_limit, PAGE_SIZE, PagedView, parse_policy_value,
+    POSITIVE_REACTION, publish, record_activity, record_transaction, respond, run_history_scan, save_policy,
+    save_user_state, SCAN_JOB, schedule_unmute, store, tally_message, TALLY_SUMMARY_MINUTES,
+    VERY_POSITIVE_REACTION,
+)
+
+async def moderate_message(message, matches):
+    """Apply penalties and rewards for a message's matches. Returns False if a swear pass consumed the message."""
+    policy = get_policy(message.guild.id if message.guild else None)
+    swear_detected = bool(matches.swears)
+    nsfw_detected = bool(matches.nsfw)
+    gif_detected = bool(matches.gif)
+    positive_rewards = [reward for _, reward in matches.positive]
+    if positive_rewards and policy.positive_rewards_per_hour and \
+            await over_rate_limit(f"positive:{message.author.id}", policy.positive_rewards_per_hour, 3600):
+        positive_rewards = []
+
+    # Only load the user's state when something applies
+    if not (gif_detected or nsfw_detected or swear_detected or positive_rewards or matches.toxicity is not None):
+        return True
+
+    state = await load_user_state(message.author.id, policy)
+    now = int(time.time())
+
+    # Handle GIF filter violations
+    if gif_detected:
+        await message.delete()
+        log_message_event(message, "delete", "gif_filter", matches.gif)
+        await message.channel.send(f"⚠️ {message.author.mention} posted a GIF with filtered content and it was removed.")
+        
+        # Apply warning
+        warnings = state.add_warning(now)
+        log_message_event(message, "warning", "gif_filter", f"warning {policy.warning_progress(warnings)}")
+        await message.channel.send(f"⚠️ {message.author.mention} received a warning ({policy.warning_progress(warnings)}) for posting a filtered GIF.")
+    
+    # Handle NSFW content
+    if nsfw_detected:
+        await message.delete()
+        log_message_event(message, "delete", "nsfw", ", ".join(sorted(matches.nsfw)))
+        await message.channel.send(f"🔞 {message.author.mention} posted NSFW content and it was removed.")
+        
+        # Apply warning
+        warnings = state.add_warning(now)
+        log_message_event(message, "warning", "nsfw", f"warning {policy.warning_progress(warnings)}")
+        await message.channel.send(f"⚠️ {message.author.mention} received a warning ({policy.warning_progress(warnings)}) for posting NSFW content.")
+
+    # Handle messages the classifier flagged as toxic
+    if matches.toxicity is not None:
+        warnings = state.add_warning(now)
+        log_message_event(message, "warning", "toxicity", f"score {matches.toxicity:.2f}, warning {policy.warning_progress(warnings)}")
+        await message.add_reaction("☣️")
+        await message.channel.send(f"☣️ {message.author.mention} received a warning ({policy.warning_progress(warnings)}) for a message flagged as toxic.")
+
+    if swear_detected:
+        user_id = message.author.id
+
+        # Check if user has a swear pass
+        if state.swear_pass:
+            # Use up the swear pass
+            await store.delete_setting(f"swear_pass_{user_id}")
+            state.swear_pass = False
+            log_message_event(message, "swear_pass", "swear", ", ".join(sorted(matches.swears)))
+
+            await message.add_reaction("🎟️")
+            await message.channel.send(f"🎟️ {message.author.mention} used a Swear Pass! No penalty this time.")
+            save_user_state(state)
+            conn.commit()
+            return False
+
+        # Determine moderation level for appropriate reaction
+        moderation_level = get_user_moderation_level(state, policy)
+        
+        # Add reaction based on moderation level
+        if moderation_level == 1:
+            await message.add_reaction(core.MILD_REACTION)
+        elif moderation_level == 2:
+            await message.add_reaction(core.MODERATE_REACTION)
+        elif moderation_level == 3:
+            await message.add_reaction(core.SEVERE_REACTION)
+        # Level 4 is applied when user is actually muted
+
+        first_offense = not (state.exists or state.dirty)
+        old_coins = state.coins
+        state.count += 1
+        state.coins = max(0, state.coins - policy.fine)  # Deduct the fine, but don't go below 0
+        state.dirty = True
+        record_transaction(user_id, state.coins - old_coins, "swear_fine")
+        log_message_event(message, "fine", "swear", f"-{old_coins - state.coins} coins for {', '.join(sorted(matches.swears))}")
+
+        if first_offense:
+            # First time swearing
+            await message.channel.send(f"{core.MILD_REACTION} {message.author.mention} swore for the first time and lost {policy.fine} coins! 💰 {state.coins} remaining.")
+        elif state.coins <= policy.warn_at_coins:
+            # Check if out of coins
+            warnings = state.add_warning(now)
+            log_message_event(message, "warning", "low_coins", f"warning {policy.warning_progress(warnings)} at {state.coins} coins")
+            coin_state = "out of coins" if state.coins == 0 else "low on coins"
+            await message.channel.send(f"⚠️ {message.author.mention} is {coin_state} and received a warning! ({policy.warning_progress(warnings)})")
+
+            # Check the escalation ladder for a mute
+            mute_seconds = policy.mute_seconds(warnings)
+            if mute_seconds and message.guild:
+                try:
+                    muted_role = await get_muted_role(message.guild)
+                    await message.author.add_roles(muted_role)
+                    log_message_event(message, "mute", "warnings", f"{format_duration(mute_seconds)} after {warnings} warnings")
+                    # Add muted reaction
+                    await message.add_reaction(core.MUTED_REACTION)
+                    await message.channel.send(f"🔇 {message.author.mention} reached {warnings} warnings and has been muted for {format_duration(mute_seconds)}!")
+
+                    # Reset warnings
+                    if policy.reset_on_mute:
+                        state.warnings = 0
+
+                    schedule_unmute(message.author, muted_role, mute_seconds)
+                except Exception as e:
+                    print(f"Error muting user: {e}")
+        else:
+            # Get the currency emoji from settings, default to 💰
+            currency_emoji = await store.get_setting("currency_emoji", "💰")
+
+            # Choose emoji based on warning level for the message
+            warning_emoji = (core.MILD_REACTION, core.MODERATE_REACTION, core.SEVERE_REACTION)[policy.level(state.warnings, 0) - 1]
+                
+            await message.channel.send(f"{warning_emoji} {message.author.mention} swore and lost {policy.fine} coins! {currency_emoji} {state.coins} remaining.")
+
+    # Reward positive words
+    if positive_rewards:
+        # Get the currency emoji from settings, default to 💰
+        currency_emoji = await store.get_setting("currency_emoji", "💰")
+
+        # Determine which positive reaction to use
+        # Users on record with few offenses get the regular reaction
+        if (state.exists or state.dirty) and state.count <= 2:
+            positive_emoji = POSITIVE_REACTION
+        else:
+            # Very positive user with minimal offenses
+            positive_emoji = VERY_POSITIVE_REACTION
+
+        for reward in positive_rewards:
+            await message.add_reaction(positive_emoji)
+            state.coins += reward
+            state.dirty = True
+            record_transaction(message.author.id, reward, "positive_word")
+            await message.channel.send(f"{positive_emoji} {message.author.mention} used a positive word and earned {reward} coins! {currency_emoji} {state.coins} remaining.")
+
+    save_user_state(state)
+    conn.commit()
+    return True
+
+MODERATION_ACTION_EMOJIS = {"delete": "🗑️", "warning": "⚠️", "fine": "💸", "mute": "🔇", "unmute": "🔊", "swear_pass": "🎟️"}
+
+def describe_policy(policy):
+    config = policy.config
+    ladder = ", ".join(f"{warnings} warnings → {format_duration(seconds)}" for warnings, seconds in sorted(config["ladder"])) or "No mutes"
+    decay = f"1 warning every {config['warning_decay_hours']:g}h" if config["warning_decay_hours"] else "Never"
+    return "\n".join([
+        f"**fine:** {config['fine']} coins per swear",
+        f"**warn_at_coins:** warn when a swear leaves {config['warn_at_coins']} coins or less",
+        f"**ladder:** {ladder}",
+        f"**reset_warnings_on_mute:** {config['reset_warnings_on_mute']}",
+        f"**warning_decay_hours:** {decay}",
+        f"**level2_swears:** {config['level2_swears']}",
+        f"**level2_warnings:** {config['level2_warnings']}",
+        f"**level3_warnings:** {config['level3_warnings']}",
+        f"**toxicity_threshold:** {config['toxicity_threshold']:g}" + ("" if config["toxicity_threshold"] else " (classifier off)"),
+        f"**positive_rewards_per_hour:** {config['positive_rewards_per_hour'] or 'Unlimited'}"
+    ])
+
+class Moderation(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # ✅ Message Event Handler
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        # Ignore messages from the bot itself
+        if message.author == bot.user:
+            return
+        # A resumed gateway session can deliver the same message again
+        if not await first_delivery(message.id):
+            return
+
+        mode = CHANNEL_MODES.get(message.channel.id)
+        matches = current_matcher().match(message.content)
+        sampled_out = mode and mode[0] == "sample" and random.random() >= mode[1]
+        if sampled_out:
+            # Messages outside the sample still go through the NSFW and GIF filters
+            matches = matches._replace(swears=set(), positive=[])
+        record_activity(message, matches)
+        policy = get_policy(message.guild.id if message.guild else None)
+        # The classifier only looks at messages the term lists didn't already catch
+        if not (sampled_out or matches.swears or matches.nsfw or matches.gif):
+            matches = await classify_message(message, matches, policy)
+        if mode and mode[0] == "tally":
+            # A swear pass is used up by the swear right away, as in full mode, instead of the swear being tallied
+            if not (matches.swears and (await load_user_state(message.author.id, policy)).swear_pass):
+                matches = tally_message(message, matches)
+
+        # Prefix commands are still processed by the bot's default on_message
+        await moderate_message(message, matches)
+
+    # ✅ Message Edit Handler
+    @commands.Cog.listener()
+    async def on_message_edit(self, before, after):
+        # Ignore the bot and edits that don't change the text (e.g. embeds loading)
+        if after.author == bot.user or before.content == after.content:
+            return
+        if not await first_delivery(after.id, after.edited_at):
+            return
+
+        # Only terms the edit introduced count, and edits never earn positive-word rewards
+        old = current_matcher().match(before.content)
+        new = current_matcher().match(after.content)
+        added = TermMatch(
+            swears=new.swears - old.swears,
+            nsfw=new.nsfw - old.nsfw,
+            gif=new.gif if not old.gif else None,
+            positive=[]
+        )
+        record_activity(after, added)
+        await moderate_message(after, added)
+
+    # ✅ Slash Command `/scan_history`
+    @app_commands.command(name="scan_history", description="Scan past messages for filtered terms (admin only).")
+    @app_commands.describe(
+        channel="Channel to scan (default: every channel the bot can read)",
+        penalize="Fine and warn for matches instead of only reporting them",
+        max_messages="Most messages to scan per channel in this run (default: 5000)",
+        restart="Ignore saved progress and scan from the beginning"
+    )
+    async def scan_history(self, interaction: discord.Interaction, channel: discord.TextChannel = None, penalize: bool = False,
+                           max_messages: int = 5000, restart: bool = False):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to scan message history!", ephemeral=True)
+            return
+
+        running = SCAN_JOB.get("task")
+        if running and not running.done():
+            await interaction.response.send_message("❌ A history scan is already running!", ephemeral=True)
+            return
+
+        if max_messages <= 0:
+            await interaction.response.send_message("❌ max_messages must be positive!", ephemeral=True)
+            return
+
+        me = interaction.guild.me
+        channels = [channel] if channel else [ch for ch in interaction.guild.text_channels if ch.permissions_for(me).read_message_history]
+        mode = "penalize" if penalize else "report"
+
+        if restart:
+            c.executemany("DELETE FROM scan_checkpoints WHERE channel_id = ? AND mode = ?", [(ch.id, mode) for ch in channels])
+            conn.commit()
+
+        SCAN_JOB["task"] = asyncio.create_task(run_history_scan(interaction, channels, mode, max_messages))
+        action = "penalizing" if penalize else "reporting"
+        await interaction.response.send_message(f"🔎 Scanning {len(channels)} channels ({action}, up to {max_messages:,} messages each). The report will be posted here when done.", ephemeral=True)
+
+    # ✅ Slash Command `/channel_mode`
+    @app_commands.command(name="channel_mode", description="Set how strictly a channel is moderated (admin only).")
+    @app_commands.describe(
+        mode="full: enforce every message, tally: count silently and post summaries, sample: check a fraction of messages",
+        channel="Channel to configure (default: this channel)",
+        sample_rate="Fraction of messages checked in sample mode, e.g. 0.1 (default: 0.1)"
+    )
+    @app_commands.choices(mode=[app_commands.Choice(name=name, value=name) for name in CHANNEL_MODE_NAMES])
+    async def channel_mode(self, interaction: discord.Interaction, mode: str, channel: discord.TextChannel = None, sample_rate: float = 0.1):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to change channel modes!", ephemeral=True)
+            return
+
+        if mode == "sample" and not 0 < sample_rate <= 1:
+            await interaction.response.send_message("❌ Sample rate must be between 0 and 1!", ephemeral=True)
+            return
+
+        channel = channel or interaction.channel
+        if mode == "full":
+            c.execute("DELETE FROM channel_modes WHERE channel_id = ?", (channel.id,))
+            CHANNEL_MODES.pop(channel.id, None)
+            description = "every message is moderated"
+        else:
+            rate = sample_rate if mode == "sample" else 1.0
+            c.execute("REPLACE INTO channel_modes (channel_id, guild_id, mode, sample_rate) VALUES (?, ?, ?, ?)",
+                     (channel.id, interaction.guild_id, mode, rate))
+            CHANNEL_MODES[channel.id] = (mode, rate)
+            if mode == "tally":
+                description = f"swears are counted silently with a summary every {TALLY_SUMMARY_MINUTES:g} minutes"
+            else:
+                description = f"{rate:.0%} of messages are checked"
+        conn.commit()
+        publish("channel_modes_changed")
+
+        await interaction.response.send_message(f"✅ {channel.mention} is now in **{mode}** mode: {description}.")
+
+    # ✅ Slash Command `/moderation_levels`
+    @app_commands.command(name="moderation_levels", description="View information about moderation levels and their reactions.")
+    @cached_response(ttl=600, events=("reactions_changed", "policy_changed"))
+    async def moderation_levels(self, interaction: discord.Interaction):
+        policy = get_policy(interaction.guild_id)
+        config = policy.config
+        embed = discord.Embed(
+            title="📊 Moderation Levels", 
+            description="The bot uses different reactions based on user behavior:", 
+            color=0x00FFFF
+        )
+
+        embed.add_field(
+            name=f"Level 1: Mild {core.MILD_REACTION}", 
+            value="First offenses or infrequent rule violations", 
+            inline=False
+        )
+
+        embed.add_field(
+            name=f"Level 2: Moderate {core.MODERATE_REACTION}", 
+            value=f"{config['level2_warnings']}+ warnings or frequent offender ({policy.level2_swears}+ swears)", 
+            inline=False
+        )
+
+        embed.add_field(
+            name=f"Level 3: Severe {core.SEVERE_REACTION}", 
+            value=f"User with {config['level3_warnings']}+ warnings, on the verge of being muted", 
+            inline=False
+        )
+
+        embed.add_field(
+            name=f"Level 4: Muted {core.MUTED_REACTION}", 
+            value=f"User who has reached {policy.mute_at} warnings and is muted" if policy.mute_at else "Muting is disabled on this server", 
+            inline=False
+        )
+
+        embed.add_field(
+            name=f"Positive: {POSITIVE_REACTION}", 
+            value="Using positive words earns coins and this reaction", 
+            inline=False
+        )
+
+        embed.add_field(
+            name=f"Very Positive: {VERY_POSITIVE_REACTION}", 
+            value="Consistent positive behavior with minimal offenses", 
+            inline=False
+        )
+
+        return {"embed": embed}
+
+    # ✅ Slash Command `/policy`
+    @app_commands.command(name="policy", description="View this server's moderation policy.")
+    async def policy_command(self, interaction: discord.Interaction):
+        embed = discord.Embed(title="⚖️ Moderation Policy", description=describe_policy(get_policy(interaction.guild_id)), color=0x00FFFF)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ✅ Slash Command `/set_policy`
+    @app_commands.command(name="set_policy", description="Change a moderation policy setting for this server.")
+    @app_commands.describe(
+        key="Policy setting to change",
+        value="New value (ladder format: warnings:seconds, e.g. 3:600,5:3600)"
+    )
+    @app_commands.choices(key=[app_commands.Choice(name=key, value=key) for key in DEFAULT_POLICY])
+    async def set_policy(self, interaction: discord.Interaction, key: str, value: str):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to change the moderation policy!", ephemeral=True)
+            return
+
+        c.execute("SELECT config FROM moderation_policies WHERE guild_id = ?", (interaction.guild_id,))
+        result = c.fetchone()
+        overrides = json.loads(result[0]) if result else {}
+
+        try:
+            overrides[key] = parse_policy_value(key, value)
+            policy = save_policy(interaction.guild_id, overrides)
+        except (ValueError, TypeError) as e:
+            await interaction.response.send_message(f"❌ Invalid value for `{key}`: {e}", ephemeral=True)
+            return
+
+        embed = discord.Embed(title="⚖️ Moderation Policy Updated", description=describe_policy(policy), color=0x00FF00)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ✅ Slash Command `/reset_policy`
+    @app_commands.command(name="reset_policy", description="Restore the default moderation policy for this server.")
+    async def reset_policy(self, interaction: discord.Interaction):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to reset the moderation policy!", ephemeral=True)
+            return
+
+        save_policy(interaction.guild_id, {})
+        await interaction.response.send_message("✅ The moderation policy has been reset to the defaults.", ephemeral=True)
+
+    # ✅ Slash Command `/history`
+    @app_commands.command(name="history", description="View a user's moderation history (admin only).")
+    @app_commands.describe(user="The user whose moderation events to view")
+    @auto_defer(ephemeral=True)
+    async def history(self, interaction: discord.Interaction, user: discord.Member):
+        if not interaction.user.guild_permissions.administrator:
+            await respond(interaction, "❌ You need administrator permissions to view moderation history!", ephemeral=True)
+            return
+
+        # cursors[page] is the (ts, id) of the row before that page, so each page seeks instead of scanning an OFFSET
+        cursors = [None]
+
+        async def render_page(page):
+            events = fetch_moderation_events(interaction.guild_id, user.id, PAGE_SIZE + 1, cursors[page])
+            has_next = len(events) > PAGE_SIZE
+            events = events[:PAGE_SIZE]
+            if has_next and len(cursors) == page + 1:
+                cursors.append((events[-1][1], events[-1][0]))
+
+            embed = discord.Embed(title=f"📜 Moderation History for {user.display_name}", color=0xE67E22)
+            if not events:
+                embed.description = "No moderation events recorded."
+            for event_id, ts, action, reason, detail, channel_id in events:
+                where = f" in <#{channel_id}>" if channel_id else ""
+                embed.add_field(
+                    name=f"{MODERATION_ACTION_EMOJIS.get(action, '•')} {action.replace('_', ' ').title()} ({reason.replace('_', ' ')})",
+                    value=f"<t:{ts}:f>{where}" + (f"\n{detail}" if detail else ""),
+                    inline=False
+                )
+            embed.set_footer(text=f"Page {page + 1}")
+            return embed, has_next
+
+        await PagedView(render_page, interaction.user.id).start(interaction, ephemeral=True)
+
+    # ✅ Slash Command `/stats`
+    @app_commands.command(name="stats", description="View swear jar trends for this server or a user.")
+    @app_commands.describe(period="How far back to look", user="Only count this user's messages")
+    @app_commands.choices(period=[
+        app_commands.Choice(name="Last 24 hours", value="24h"),
+        app_commands.Choice(name="Last 7 days", value="7d"),
+        app_commands.Choice(name="Last 30 days", value="30d")
+    ])
+    @cached_response(ttl=300)
+    @auto_defer()
+    async def stats(self, interaction: discord.Interaction, period: str = "7d", user: discord.Member = None):
+        window = {"24h": 86400, "7d": 7 * 86400, "30d": 30 * 86400}[period]
+        now = int(time.time())
+        since = now - now % 3600 - window + 3600
+
+        # Hourly and daily rows never overlap, so both can be summed together
+        scope = "guild_id = ? AND bucket >= ?"
+        params = [interaction.guild_id or NO_GUILD, since]
+        if user:
+            scope += " AND user_id = ?"
+            params.append(user.id)
+
+        def top(column, kind, limit, extra=""):
+            c.execute(f"""
+                SELECT {column}, SUM(hits) FROM activity_rollups
+                WHERE {scope} AND kind = ? {extra}
+                GROUP BY 1 ORDER BY 2 DESC LIMIT ?
+            """, (*params, kind, limit))
+            return c.fetchall()
+
+        c.execute(f"SELECT kind, SUM(hits) FROM activity_rollups WHERE {scope} GROUP BY kind", params)
+        totals = dict(c.fetchall())
+        previous_params = [params[0], since - window, *params[2:]]
+        c.execute(f"""
+            SELECT COALESCE(SUM(hits), 0) FROM activity_rollups
+            WHERE {scope} AND bucket < ? AND kind = 'swear'
+        """, (*previous_params, since))
+        previous_swears = c.fetchone()[0]
+
+        title = f"📊 Swear Jar Stats for {user.display_name}" if user else "📊 Swear Jar Stats"
+        embed = discord.Embed(title=f"{title} ({period})", color=0x9B59B6)
+        swears = totals.get("swear", 0)
+        if not totals:
+            embed.description = "No activity recorded in this period."
+            return {"embed": embed}
+
+        if previous_swears:
+            change = (swears - previous_swears) / previous_swears * 100
+            trend = f"{'📈' if change > 0 else '📉'} {change:+.0f}% vs the previous {period}"
+        else:
+            trend = "No swears in the previous period"
+        embed.description = f"**{swears}** swears, **{totals.get('positive', 0)}** positive words, " \
+                            f"**{totals.get('nsfw', 0) + totals.get('gif', 0)}** filtered posts\n{trend}"
+
+        top_swears = top("term", "swear", 3)
+        if top_swears:
+            embed.add_field(name="🤬 Most Used Swears", value="\n".join(f"`{term}` × {hits}" for term, hits in top_swears), inline=True)
+        top_positive = top("term", "positive", 3)
+        if top_positive:
+            embed.add_field(name="✨ Most Used Positive Words", value="\n".join(f"`{term}` × {hits}" for term, hits in top_positive), inline=True)
+        if not user:
+            top_users = top("user_id", "swear", 3)
+            if top_users:
+                embed.add_field(name="🏆 Top Swearers", value="\n".join(f"<@{user_id}> × {hits}" for user_id, hits in top_users), inline=False)
+        top_channels = top("channel_id", "swear", 1)
+        if top_channels:
+            embed.add_field(name="📢 Saltiest Channel", value=f"<#{top_channels[0][0]}> ({top_channels[0][1]} swears)", inline=True)
+        worst_hours = top("bucket % 86400 / 3600", "swear", 1, "AND period = 'hour'")
+        if worst_hours:
+            embed.add_field(name="🕐 Worst Hour", value=f"{worst_hours[0][0]:02d}:00 UTC ({worst_hours[0][1]} swears)", inline=True)
+
+        embed.set_footer(text="Updated every few minutes")
+        return {"embed": embed}
+
+    # ✅ Slash Command `/label_message`
+    @app_commands.command(name="label_message", description="Label a message as toxic or fine to train the classifier (admin only).")
+    @app_commands.describe(
+        message="Link or ID of the message (IDs are looked up in this channel)",
+        toxic="Whether the message is toxic"
+    )
+    async def label_message(self, interaction: discord.Interaction, message: str, toxic: bool):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to label messages!", ephemeral=True)
+            return
+
+        # Accept https://discord.com/channels/<guild>/<channel>/<message> or a bare ID
+        parts = message.strip().rstrip("/").split("/")
+        try:
+            message_id = int(parts[-1])
+            channel = interaction.guild.get_channel_or_thread(int(parts[-2])) if len(parts) > 1 else interaction.channel
+            if channel is None:
+                raise ValueError
+            target = await channel.fetch_message(message_id)
+        except (ValueError, discord.HTTPException):
+            await interaction.response.send_message("❌ Couldn't find that message. Use a message link or an ID from this channel.", ephemeral=True)
+            return
+
+        if not target.content:
+            await interaction.response.send_message("❌ That message has no text to learn from.", ephemeral=True)
+            return
+
+        c.execute("""
+            REPLACE INTO labeled_messages (message_id, guild_id, content, label, labeled_by, labeled_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (target.id, interaction.guild_id, target.content, int(toxic), interaction.user.id, int(time.time())))
+        conn.commit()
+
+        c.execute("SELECT label, COUNT(*) FROM labeled_messages GROUP BY label")
+        counts = dict(c.fetchall())
+        await interaction.response.send_message(
+            f"🏷️ Labeled the message as {'toxic' if toxic else 'fine'}. "
+            f"{counts.get(1, 0)} toxic and {counts.get(0, 0)} fine messages labeled so far.", ephemeral=True)
+
+    # ✅ Slash Command `/train_classifier`
+    @app_commands.command(name="train_classifier", description="Train the toxicity classifier on labeled messages (admin only).")
+    async def train_classifier(self, interaction: discord.Interaction):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to train the classifier!", ephemeral=True)
+            return
+
+        c.execute("SELECT label, COUNT(*) FROM labeled_messages GROUP BY label")
+        counts = dict(c.fetchall())
+        if counts.get(0, 0) < CLASSIFIER_MIN_LABELS or counts.get(1, 0) < CLASSIFIER_MIN_LABELS:
+            await interaction.response.send_message(
+                f"❌ Label at least {CLASSIFIER_MIN_LABELS} toxic and {CLASSIFIER_MIN_LABELS} fine messages first "
+                f"(have {counts.get(1, 0)} toxic, {counts.get(0, 0)} fine).", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            model, metrics, trained_on = await asyncio.get_running_loop().run_in_executor(CLASSIFIER_EXECUTOR, fit_classifier)
+        except RuntimeError as e:
+            await interaction.followup.send(f"❌ {e}", ephemeral=True)
+            return
+        core.CLASSIFIER_MODEL = model
+
+        threshold = get_policy(interaction.guild_id).toxicity_threshold
+        embed = discord.Embed(title="🧠 Classifier Trained", description=f"Trained on {trained_on} labeled messages.", color=0x00FF00)
+        if metrics:
+            embed.add_field(name="Accuracy", value=f"{metrics['accuracy'] * 100:.0f}%", inline=True)
+            embed.add_field(name="Precision", value=f"{metrics['precision'] * 100:.0f}%", inline=True)
+            embed.add_field(name="Recall", value=f"{metrics['recall'] * 100:.0f}%", inline=True)
+        if not threshold:
+            embed.set_footer(text="The classifier is off here. Turn it on with /set_policy toxicity_threshold 0.8")
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    # ✅ Slash Command `/set_moderation_reaction`
+    @app_commands.command(name="set_moderation_reaction", description="Set custom reaction emoji for a moderation level.")
+    @app_commands.describe(
+        level="The moderation level (1-4)",
+        emoji="The emoji to use for this level"
+    )
+    async def set_moderation_reaction(self, interaction: discord.Interaction, level: int, emoji: str):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to set moderation reactions!", ephemeral=True)
+            return
+
+        # Validate level
+        if level < 1 or level > 4:
+            await interaction.response.send_message("❌ Level must be between 1 and 4!", ephemeral=True)
+            return
+
+        # Map level to settings key
+        key_map = {
+            1: "mild_reaction",
+            2: "moderate_reaction",
+            3: "severe_reaction",
+            4: "muted_reaction"
+        }
+
+        c.execute("REPLACE INTO moderation_settings (key, value) VALUES (?, ?)", (key_map[level], emoji))
+        conn.commit()
+
+        # Update the shared reactions to take effect immediately
+        if level == 1:
+            core.MILD_REACTION = emoji
+        elif level == 2:
+            core.MODERATE_REACTION = emoji
+        elif level == 3:
+            core.SEVERE_REACTION = emoji
+        elif level == 4:
+            core.MUTED_REACTION = emoji
+        publish("reactions_changed")
+
+        await interaction.response.send_message(f"✅ Set level {level} moderation reaction to {emoji}")
+
+async def setup(bot):
+    await bot.add_cog(Moderation(bot))
@@ -0,0 +1,458 @@
+"""Shop commands and the effects of shop items."""
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from storage import ALL_ITEMS, ROLLUP_PERIODS
+from core import (
+    auto_defer, c, claim_cooldown, conn, consume_inventory_item, cooldown_remaining, format_duration,
+    get_muted_role, get_policy, get_shop_catalog, get_shop_embed, get_shop_manager_page, item_effect,
+    ITEM_EFFECTS, log_moderation_event, PagedView, publish, record_purchase, record_transaction, respond,
+    schedule_unmute, store, USER_STATES,
+)
+
+@item_effect("money_bag", on="buy")
+async def money_bag_effect(interaction, item, user_coins):
+    # Give 50 bonus coins
+    bonus = 50
+    new_coins = user_coins - item.price + bonus
+    c.execute("UPDATE swear_counts SET coins = ? WHERE user_id = ?", (new_coins, interaction.user.id))
+    record_transaction(interaction.user.id, -item.price, "purchase", f"item:{item.id}")
+    record_transaction(interaction.user.id, bonus, "money_bag", f"item:{item.id}")
+    record_purchase(interaction.user.id, item.id, item.price)
+    conn.commit()
+    USER_STATES.invalidate(interaction.user.id)
+    await interaction.response.send_message(f"🎉 You bought a {item.emoji} {item.name} and received {bonus} bonus coins! You now have {new_coins} coins.")
+
+@item_effect("remove_warning", on="buy")
+async def remove_warning_effect(interaction, item, user_coins):
+    # Remove a warning, counting only the ones that haven't decayed yet
+    policy = get_policy(interaction.guild_id)
+    c.execute("SELECT warnings, last_warning_at FROM swear_counts WHERE user_id = ?", (interaction.user.id,))
+    result = c.fetchone()
+    current_warnings, last_warning_at = policy.decay(result[0], result[1], int(time.time())) if result else (0, None)
+
+    if current_warnings <= 0:
+        await interaction.response.send_message("❌ You don't have any warnings to remove!", ephemeral=True)
+        return
+
+    new_warnings = current_warnings - 1
+    new_coins = user_coins - item.price
+
+    c.execute("UPDATE swear_counts SET warnings = ?, last_warning_at = ?, coins = ? WHERE user_id = ?", 
+             (new_warnings, last_warning_at, new_coins, interaction.user.id))
+    record_transaction(interaction.user.id, -item.price, "purchase", f"item:{item.id}")
+    record_purchase(interaction.user.id, item.id, item.price)
+    conn.commit()
+    USER_STATES.invalidate(interaction.user.id)
+
+    await interaction.response.send_message(f"🎉 You bought {item.emoji} {item.name} and removed 1 warning! You now have {new_warnings} warnings and {new_coins} coins.")
+
+@item_effect("mute", on="use")
+async def mute_effect(interaction, item, quantity, target):
+    if not target:
+        await interaction.response.send_message("❌ You need to specify a user to mute!", ephemeral=True)
+        return
+
+    try:
+        muted_role = await get_muted_role(interaction.guild)
+    except Exception as e:
+        await interaction.response.send_message(f"❌ Error creating muted role: {e}", ephemeral=True)
+        return
+
+    # Apply mute
+    try:
+        await target.add_roles(muted_role)
+        log_moderation_event(interaction.guild.id, target.id, "mute", "shop_item", f"5m from {interaction.user} using {item.name}", interaction.channel_id)
+        await interaction.response.send_message(f"🔇 {interaction.user.mention} used a {item.name} on {target.mention}! They have been muted for 5 minutes.")
+
+        consume_inventory_item(interaction.user.id, item.id, quantity)
+
+        # Unmute after 5 minutes
+        schedule_unmute(target, muted_role, 300)
+        return True
+    except Exception as e:
+        await interaction.response.send_message(f"❌ Error muting user: {e}", ephemeral=True)
+
+@item_effect("swear_pass", on="use")
+async def swear_pass_effect(interaction, item, quantity, target):
+    # Add a swear pass to the user
+    await store.set_setting(f"swear_pass_{interaction.user.id}", "true")
+    USER_STATES.invalidate(interaction.user.id)
+
+    consume_inventory_item(interaction.user.id, item.id, quantity)
+
+    await interaction.response.send_message(f"{item.emoji} You used a {item.name}! Your next swear word will not be penalized.")
+    return True
+
+# Confirmation view for item removal
+class ConfirmRemovalView(discord.ui.View):
+    def __init__(self, item_id, name, emoji):
+        super().__init__(timeout=60)
+        self.item_id = item_id
+        self.name = name
+        self.emoji = emoji
+
+    @discord.ui.button(label="Confirm", style=discord.ButtonStyle.danger)
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # Delete the item
+        c.execute("DELETE FROM shop_items WHERE id = ?", (self.item_id,))
+        conn.commit()
+        publish("shop_changed")
+
+        await interaction.response.edit_message(
+            content=f"✅ **{self.emoji} {self.name}** has been removed from the shop.",
+            view=None
+        )
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.edit_message(
+            content=f"❌ Removal of **{self.emoji} {self.name}** cancelled.",
+            view=None
+        )
+
+class Shop(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # ✅ Slash Command `/shop`
+    @app_commands.command(name="shop", description="View available items in the shop.")
+    async def shop(self, interaction: discord.Interaction):
+        if not get_shop_catalog():
+            await interaction.response.send_message("🏪 The shop is currently empty!", ephemeral=True)
+            return
+
+        # Get user's coins
+        c.execute("SELECT coins FROM swear_counts WHERE user_id = ?", (interaction.user.id,))
+        result = c.fetchone()
+        user_coins = result[0] if result else 100
+
+        # Copy the pre-rendered catalog so the per-user footer doesn't leak into the cache
+        embed = get_shop_embed().copy()
+        embed.set_footer(text=f"You have {user_coins} coins")
+
+        await interaction.response.send_message(embed=embed)
+
+    # ✅ Slash Command `/buy`
+    @app_commands.command(name="buy", description="Buy an item from the shop.")
+    @app_commands.describe(item_id="The ID of the item you want to buy")
+    async def buy(self, interaction: discord.Interaction, item_id: int):
+        # Get the item details
+        item = get_shop_catalog().get(item_id)
+
+        if not item:
+            await interaction.response.send_message("❌ Item not found!", ephemeral=True)
+            return
+
+        name, emoji, price, role_id = item.name, item.emoji, item.price, item.role_id
+
+        # Check if user has enough coins
+        c.execute("SELECT coins FROM swear_counts WHERE user_id = ?", (interaction.user.id,))
+        result = c.fetchone()
+        user_coins = result[0] if result else 100
+
+        if user_coins < price:
+            await interaction.response.send_message(f"❌ You don't have enough coins! You need {price - user_coins} more.", ephemeral=True)
+            return
+
+        # Process instant items
+        effect = ITEM_EFFECTS.get(item.effect)
+        if effect and effect[0] == "buy":
+            await effect[1](interaction, item, user_coins)
+            return
+
+        # For all other items, add to inventory
+        new_coins = user_coins - price
+        c.execute("UPDATE swear_counts SET coins = ? WHERE user_id = ?", (new_coins, interaction.user.id))
+        USER_STATES.invalidate(interaction.user.id)
+
+        # Add to user's inventory
+        c.execute("SELECT quantity FROM user_inventory WHERE user_id = ? AND item_id = ?", 
+                 (interaction.user.id, item_id))
+        inventory_item = c.fetchone()
+
+        if inventory_item:
+            new_quantity = inventory_item[0] + 1
+            c.execute("UPDATE user_inventory SET quantity = ? WHERE user_id = ? AND item_id = ?",
+                     (new_quantity, interaction.user.id, item_id))
+        else:
+            c.execute("INSERT INTO user_inventory (user_id, item_id, quantity) VALUES (?, ?, 1)", 
+                     (interaction.user.id, item_id))
+
+        # Track the purchase for statistics
+        record_purchase(interaction.user.id, item_id, price)
+        record_transaction(interaction.user.id, -price, "purchase", f"item:{item_id}")
+
+        conn.commit()
+
+        # If item gives a role
+        if role_id:
+            try:
+                role = interaction.guild.get_role(int(role_id))
+                if role:
+                    await interaction.user.add_roles(role)
+                    role_msg = f" and received the {role.name} role!"
+                else:
+                    role_msg = " but the role couldn't be found."
+            except Exception as e:
+                print(f"Error adding role: {e}")
+                role_msg = " but there was an error giving you the role."
+        else:
+            role_msg = "!"
+
+        await interaction.response.send_message(f"🎉 You bought {emoji} {name}{role_msg} You now have {new_coins} coins.")
+
+    # ✅ Slash Command `/inventory`
+    @app_commands.command(name="inventory", description="View your inventory.")
+    async def inventory(self, interaction: discord.Interaction):
+        items = await store.get_inventory(interaction.user.id)
+
+        if not items:
+            await interaction.response.send_message("📦 Your inventory is empty!", ephemeral=True)
+            return
+
+        embed = discord.Embed(title="📦 Your Inventory", color=0x9B59B6)
+
+        for item_id, name, emoji, description, quantity in items:
+            embed.add_field(
+                name=f"{emoji} {name} (x{quantity})",
+                value=f"ID: `{item_id}` | {description}",
+                inline=False
+            )
+
+        await interaction.response.send_message(embed=embed)
+
+    # ✅ Slash Command `/use`
+    @app_commands.command(name="use", description="Use an item from your inventory.")
+    @app_commands.describe(
+        item_id="The ID of the item you want to use",
+        target="The user to target with this item (if applicable)"
+    )
+    async def use_item(self, interaction: discord.Interaction, item_id: int, target: discord.Member = None):
+        # Check if user has the item
+        c.execute("SELECT quantity FROM user_inventory WHERE user_id = ? AND item_id = ?",
+                 (interaction.user.id, item_id))
+        result = c.fetchone()
+        item = get_shop_catalog().get(item_id)
+
+        if not result or result[0] <= 0 or not item:
+            await interaction.response.send_message("❌ You don't have this item in your inventory!", ephemeral=True)
+            return
+
+        quantity = result[0]
+
+        # Process specific items
+        effect = ITEM_EFFECTS.get(item.effect)
+        if effect and effect[0] == "use":
+            remaining = cooldown_remaining(interaction.user.id, "use")
+            if remaining:
+                await interaction.response.send_message(f"⏰ Slow down! You can use another item in {format_duration(remaining)}.", ephemeral=True)
+                return
+
+            # An effect that bails out (no target, missing permissions) leaves the cooldown unspent
+            if await effect[1](interaction, item, quantity, target):
+                claim_cooldown(interaction.user.id, "use")
+                conn.commit()
+        else:
+            # Generic response for other items
+            await interaction.response.send_message(f"⚠️ Item '{item.name}' doesn't have a specific action implemented yet.")
+
+    # ✅ Slash Command `/add_shop_item`
+    @app_commands.command(name="add_shop_item", description="Add a new item to the shop.")
+    @app_commands.describe(
+        name="The name of the item",
+        emoji="An emoji to represent the item",
+        price="The price in coins",
+        description="A description of what the item does",
+        role_id="Optional: The role ID to give when item is purchased",
+        effect="Optional: The built-in effect this item triggers (e.g. money_bag, mute)"
+    )
+    async def add_shop_item(self, interaction: discord.Interaction, name: str, emoji: str, price: int, description: str, role_id: str = None,
+                            effect: str = None):
+        # Check if admin (simple check - can be expanded)
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to add shop items!", ephemeral=True)
+            return
+
+        # Basic validation
+        if price <= 0:
+            await interaction.response.send_message("❌ Price must be positive!", ephemeral=True)
+            return
+
+        if effect is not None and effect not in ITEM_EFFECTS:
+            await interaction.response.send_message(f"❌ Unknown effect! Available: `{'`, `'.join(ITEM_EFFECTS)}`", ephemeral=True)
+            return
+
+        # Add the item to the shop
+        c.execute("""
+            INSERT INTO shop_items (name, emoji, price, description, role_id, effect) 
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (name, emoji, price, description, role_id, effect))
+
+        conn.commit()
+        item_id = c.lastrowid  # Get the ID of the newly inserted item
+        publish("shop_changed")
+
+        await interaction.response.send_message(f"✅ Added **{emoji} {name}** to the shop with ID `{item_id}`!")
+
+    # ✅ Slash Command `/remove_shop_item`
+    @app_commands.command(name="remove_shop_item", description="Remove an item from the shop.")
+    @app_commands.describe(item_id="The ID of the item to remove")
+    async def remove_shop_item(self, interaction: discord.Interaction, item_id: int):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to remove shop items!", ephemeral=True)
+            return
+
+        # Get the item details
+        c.execute("SELECT name, emoji FROM shop_items WHERE id = ?", (item_id,))
+        item = c.fetchone()
+
+        if not item:
+            await interaction.response.send_message("❌ Item not found!", ephemeral=True)
+            return
+
+        name, emoji = item
+
+        # Show confirmation UI
+        view = ConfirmRemovalView(item_id, name, emoji)
+        await interaction.response.send_message(
+            f"⚠️ Are you sure you want to remove **{emoji} {name}** from the shop?",
+            view=view
+        )
+
+    # ✅ Slash Command `/update_shop_item`
+    @app_commands.command(name="update_shop_item", description="Update an existing shop item.")
+    @app_commands.describe(
+        item_id="The ID of the item to update",
+        name="New name (leave blank to keep current)",
+        emoji="New emoji (leave blank to keep current)",
+        price="New price (set to 0 to keep current)",
+        description="New description (leave blank to keep current)",
+        role_id="New role ID (leave blank to keep current)",
+        effect="New effect, or 'none' to clear it (leave blank to keep current)"
+    )
+    async def update_shop_item(self, interaction: discord.Interaction, item_id: int, name: str = None, emoji: str = None, 
+                              price: int = 0, description: str = None, role_id: str = None, effect: str = None):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to update shop items!", ephemeral=True)
+            return
+
+        if effect is not None and effect != "none" and effect not in ITEM_EFFECTS:
+            await interaction.response.send_message(f"❌ Unknown effect! Available: `{'`, `'.join(ITEM_EFFECTS)}`", ephemeral=True)
+            return
+
+        # Get current item data
+        c.execute("SELECT name, emoji, price, description, role_id, effect FROM shop_items WHERE id = ?", (item_id,))
+        item = c.fetchone()
+
+        if not item:
+            await interaction.response.send_message("❌ Item not found!", ephemeral=True)
+            return
+
+        current_name, current_emoji, current_price, current_description, current_role_id, current_effect = item
+
+        # Use provided values or fall back to current values
+        new_name = name if name is not None else current_name
+        new_emoji = emoji if emoji is not None else current_emoji
+        new_price = price if price > 0 else current_price
+        new_description = description if description is not None else current_description
+        new_role_id = role_id if role_id is not None else current_role_id
+        new_effect = current_effect if effect is None else (None if effect == "none" else effect)
+
+        # Update the item
+        c.execute("""
+            UPDATE shop_items 
+            SET name = ?, emoji = ?, price = ?, description = ?, role_id = ?, effect = ?
+            WHERE id = ?
+        """, (new_name, new_emoji, new_price, new_description, new_role_id, new_effect, item_id))
+
+        conn.commit()
+        publish("shop_changed")
+
+        await interaction.response.send_message(f"✅ Updated shop item **{new_emoji} {new_name}**!")
+
+    # ✅ Slash Command `/shop_manager`
+    @app_commands.command(name="shop_manager", description="Manage shop items in a more detailed view.")
+    @auto_defer()
+    async def shop_manager(self, interaction: discord.Interaction):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await respond(interaction, "❌ You need administrator permissions to access the shop manager!", ephemeral=True)
+            return
+
+        if not get_shop_catalog():
+            await respond(interaction, "🏪 The shop is currently empty! Add items with `/add_shop_item`.")
+            return
+
+        await PagedView(get_shop_manager_page, interaction.user.id).start(interaction)
+
+    # ✅ Slash Command `/shop_stats`
+    @app_commands.command(name="shop_stats", description="View shop revenue and coin flow statistics (admin only).")
+    @app_commands.describe(period="The time window to summarize")
+    @app_commands.choices(period=[
+        app_commands.Choice(name="Last 24 hours", value="24h"),
+        app_commands.Choice(name="Last 7 days", value="7d"),
+        app_commands.Choice(name="Last 30 days", value="30d")
+    ])
+    async def shop_stats(self, interaction: discord.Interaction, period: str = "7d"):
+        # Check if admin
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ You need administrator permissions to view shop stats!", ephemeral=True)
+            return
+
+        # The last 24 hours read hourly buckets, longer windows read daily buckets
+        rollup_period, window = {"24h": ("hour", 86400), "7d": ("day", 7 * 86400), "30d": ("day", 30 * 86400)}[period]
+        size = ROLLUP_PERIODS[rollup_period]
+        now = int(time.time())
+        since = now - now % size - window + size
+
+        c.execute("""
+            SELECT item_id, SUM(purchases), SUM(revenue), SUM(unique_buyers)
+            FROM purchase_rollups
+            WHERE period = ? AND bucket >= ?
+            GROUP BY item_id
+            ORDER BY SUM(revenue) DESC
+        """, (rollup_period, since))
+        item_stats = c.fetchall()
+
+        c.execute("""
+            SELECT reason, SUM(sources), SUM(sinks)
+            FROM economy_rollups
+            WHERE period = ? AND bucket >= ?
+            GROUP BY reason
+            ORDER BY SUM(sources) + SUM(sinks) DESC
+        """, (rollup_period, since))
+        flow_stats = c.fetchall()
+
+        embed = discord.Embed(title=f"📈 Shop Stats ({period})", color=0x2ECC71)
+
+        catalog = get_shop_catalog()
+        totals = next((row for row in item_stats if row[0] == ALL_ITEMS), None)
+        if totals:
+            embed.description = f"**{totals[1]}** purchases, **{totals[2]}** coins spent, **{totals[3]}** buyers"
+        else:
+            embed.description = "No purchases in this period."
+
+        for item_id, purchases, revenue, buyers in item_stats:
+            if item_id == ALL_ITEMS:
+                continue
+            item = catalog.get(item_id)
+            label = f"{item.emoji} {item.name}" if item else f"Item {item_id} (removed)"
+            embed.add_field(name=label, value=f"{purchases} sold | {revenue} coins | {buyers} buyers", inline=False)
+
+        if flow_stats:
+            flow_text = "\n".join(f"`{reason}`: +{sources} / -{sinks}" for reason, sources, sinks in flow_stats)
+            total_sources = sum(row[1] for row in flow_stats)
+            total_sinks = sum(row[2] for row in flow_stats)
+            embed.add_field(name=f"💱 Coin Flow (+{total_sources} / -{total_sinks})", value=flow_text[:1024], inline=False)
+
+        embed.set_footer(text=f"Buyers are counted once per {rollup_period} and summed across the period.")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Shop(bot))
@@ -0,0 +1,2326 @@
+"""Shared state for the swear jar bot.
+
+The database connection, caches, background jobs and helpers live here so they
+survive when a cog is reloaded with /reload. Cogs in cogs/ hold the commands and
+message listeners and import the names they use from this module.
+"""
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+import sqlite3
+import asyncio
+import os
+import datetime
+import time
+import uuid
+import collections
+import csv
+import io
+import functools
+import concurrent.futures
+import sys
+import tracemalloc
+from aiohttp import web
+from dotenv import load_dotenv
+import json
+import re
+import datatools
+from storage import SQLiteStorage, ROLLUP_PERIODS, ALL_ITEMS, insert_purchase
+import classifier
+import termindex
+from termindex import TermMatch
+import sharedstate
+
+# ✅ Load environment variables
+load_dotenv()
+BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN")
+
+# ✅ Enable Bot Intents
+intents = discord.Intents.default()
+intents.message_content = True  # Required to process messages
+intents.members = os.getenv("MEMBERS_INTENT", "0") == "1"  # Privileged; lets role-targeted bulk commands see every member
+
+# ✅ Gateway Caches
+# Edits are only moderated for messages still in the message cache; 0 disables it
+MESSAGE_CACHE_SIZE = int(os.getenv("MESSAGE_CACHE_SIZE", "1000"))
+MEMBER_CACHE = os.getenv("MEMBER_CACHE", "default")  # default, voice or none
+
+def member_cache_flags():
+    if MEMBER_CACHE == "none":
+        return discord.MemberCacheFlags.none()
+    if MEMBER_CACHE == "voice":
+        return discord.MemberCacheFlags(voice=True, joined=False)
+    return discord.MemberCacheFlags.from_intents(intents)
+
+class DedupingCommandTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction):
+        # A redelivered interaction is dropped before its command runs, so it can't charge anyone twice
+        return await first_delivery(interaction.id)
+
+# Guilds are chunked on demand (see ensure_chunked) instead of all at startup
+bot = commands.Bot(
+    command_prefix="!",
+    intents=intents,
+    max_messages=MESSAGE_CACHE_SIZE or None,
+    member_cache_flags=member_cache_flags(),
+    chunk_guilds_at_startup=False,
+    tree_cls=DedupingCommandTree,
+)
+
+async def ensure_chunked(guild):
+    """Fetch a guild's full member list the first time a command needs it."""
+    if intents.members and not guild.chunked:
+        await guild.chunk()
+
+# ✅ Database Setup
+DB_PATH = datatools.DB_PATH
+conn = sqlite3.connect(DB_PATH)
+# WAL lets background backups read the database without blocking the bot's writes
+conn.execute("PRAGMA journal_mode=WAL")
+c = conn.cursor()
+
+# Repository used by handlers that have moved off raw SQL; shares the bot's connection
+store = SQLiteStorage(conn)
+c.execute("""
+    CREATE TABLE IF NOT EXISTS swear_counts (
+        user_id INTEGER PRIMARY KEY,
+        count INTEGER DEFAULT 0,
+        coins INTEGER DEFAULT 100,
+        warnings INTEGER DEFAULT 0,
+        last_daily TIMESTAMP
+    )
+""")
+
+# ✅ Additional table for tracking shop item purchases
+c.execute("""
+    CREATE TABLE IF NOT EXISTS shop_purchases (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        item_id INTEGER NOT NULL,
+        price_paid INTEGER NOT NULL,
+        purchase_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+""")
+
+# Create table for positive words
+c.execute("""
+    CREATE TABLE IF NOT EXISTS positive_words (
+        word TEXT PRIMARY KEY,
+        reward INTEGER NOT NULL
+    )
+""")
+
+conn.commit()
+
+c.execute("CREATE TABLE IF NOT EXISTS swear_words (word TEXT PRIMARY KEY)")
+c.execute("CREATE TABLE IF NOT EXISTS warning_messages (message TEXT PRIMARY KEY)")
+c.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
+
+# Create tables for new features
+c.execute("""
+    CREATE TABLE IF NOT EXISTS moderation_settings (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    )
+""")
+
+c.execute("""
+    CREATE TABLE IF NOT EXISTS nsfw_words (
+        word TEXT PRIMARY KEY
+    )
+""")
+
+c.execute("""
+    CREATE TABLE IF NOT EXISTS gif_filters (
+        filter TEXT PRIMARY KEY
+    )
+""")
+
+# ✅ Create shop items table and inventory table
+c.execute("""
+    CREATE TABLE IF NOT EXISTS shop_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        emoji TEXT NOT NULL,
+        price INTEGER NOT NULL,
+        description TEXT,
+        role_id TEXT,
+        effect TEXT
+    )
+""")
+
+c.execute("""
+    CREATE TABLE IF NOT EXISTS user_inventory (
+        user_id INTEGER,
+        item_id INTEGER,
+        quantity INTEGER DEFAULT 1,
+        PRIMARY KEY (user_id, item_id)
+    )
+""")
+
+# Older databases predate the effect column; built-in items used to be matched by name
+c.execute("PRAGMA table_info(shop_items)")
+if "effect" not in {row[1] for row in c.fetchall()}:
+    c.execute("ALTER TABLE shop_items ADD COLUMN effect TEXT")
+    c.executemany("UPDATE shop_items SET effect = ? WHERE name = ?", [
+        ("mute", "Mute Token"),
+        ("remove_warning", "Get Out of Jail"),
+        ("swear_pass", "Swear Pass"),
+        ("money_bag", "Money Bag")
+    ])
+
+# ✅ Add default shop items if none exist
+c.execute("SELECT COUNT(*) FROM shop_items")
+if c.fetchone()[0] == 0:
+    default_items = [
+        ("VIP Status", "👑", 500, "Special VIP role with unique color", None, None),
+        ("Mute Token", "🔇", 300, "Mute someone for 5 minutes", None, "mute"),
+        ("Get Out of Jail", "🔑", 200, "Remove a warning from your record", None, "remove_warning"),
+        ("Swear Pass", "🎟️", 150, "One-time pass to swear without penalty", None, "swear_pass"),
+        ("Money Bag", "💰", 100, "Get 50 bonus coins", None, "money_bag")
+    ]
+    c.executemany("INSERT INTO shop_items (name, emoji, price, description, role_id, effect) VALUES (?, ?, ?, ?, ?, ?)", default_items)
+
+conn.commit()
+
+# ✅ Append-only coin ledger and per-user balance snapshots
+c.execute("""
+    CREATE TABLE IF NOT EXISTS ledger (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        delta INTEGER NOT NULL,
+        reason TEXT NOT NULL,
+        ref TEXT,
+        created_at INTEGER NOT NULL
+    )
+""")
+c.execute("CREATE INDEX IF NOT EXISTS idx_ledger_user ON ledger (user_id, id)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_ledger_created ON ledger (created_at)")
+
+c.execute("""
+    CREATE TABLE IF NOT EXISTS balance_snapshots (
+        user_id INTEGER PRIMARY KEY,
+        balance INTEGER NOT NULL,
+        last_entry_id INTEGER NOT NULL,
+        taken_at INTEGER NOT NULL
+    )
+""")
+
+# Users that existed before the ledger get an opening snapshot of their current coins
+c.execute("""
+    INSERT OR IGNORE INTO balance_snapshots (user_id, balance, last_entry_id, taken_at)
+    SELECT user_id, coins, 0, ? FROM swear_counts
+    WHERE user_id NOT IN (SELECT user_id FROM ledger)
+""", (int(time.time()),))
+
+conn.commit()
+
+# ✅ Coin Ledger
+STARTING_COINS = 100
+LEDGER_BATCH_SIZE = 50  # Flush buffered entries once this many are pending
+LEDGER_COMPACT_AFTER = 86400  # Fold entries older than 1 day into snapshots
+LEDGER_RETENTION = 90 * 86400  # Keep folded entries 90 days for auditing
+
+LEDGER_BUFFER = []
+
+def record_transaction(user_id, delta, reason, ref=None):
+    """Queue a coin movement for the ledger. Entries are written in batches."""
+    if delta == 0:
+        return
+    LEDGER_BUFFER.append((user_id, delta, reason, ref, int(time.time())))
+    if len(LEDGER_BUFFER) >= LEDGER_BATCH_SIZE:
+        flush_ledger()
+
+def flush_ledger():
+    if not LEDGER_BUFFER:
+        return 0
+    pending = len(LEDGER_BUFFER)
+    c.executemany("INSERT INTO ledger (user_id, delta, reason, ref, created_at) VALUES (?, ?, ?, ?, ?)", LEDGER_BUFFER)
+    update_economy_rollups(LEDGER_BUFFER)
+    conn.commit()
+    LEDGER_BUFFER.clear()
+    return pending
+
+def get_ledger_balance(user_id):
+    """Balance derived from the user's latest snapshot plus the ledger tail after it."""
+    flush_ledger()
+    c.execute("SELECT balance, last_entry_id FROM balance_snapshots WHERE user_id = ?", (user_id,))
+    snapshot = c.fetchone()
+    balance, last_entry_id = snapshot if snapshot else (STARTING_COINS, 0)
+
+    c.execute("SELECT COALESCE(SUM(delta), 0) FROM ledger WHERE user_id = ? AND id > ?", (user_id, last_entry_id))
+    return balance + c.fetchone()[0]
+
+def compact_ledger():
+    """Fold old ledger entries into snapshots and prune folded entries past retention."""
+    flush_ledger()
+    now = int(time.time())
+
+    c.execute("SELECT MAX(id) FROM ledger WHERE created_at <= ?", (now - LEDGER_COMPACT_AFTER,))
+    fold_upto = c.fetchone()[0]
+    if fold_upto is None:
+        return 0
+
+    c.execute("""
+        INSERT INTO balance_snapshots (user_id, balance, last_entry_id, taken_at)
+        SELECT l.user_id, COALESCE(s.balance, ?) + SUM(l.delta), MAX(l.id), ?
+        FROM ledger l
+        LEFT JOIN balance_snapshots s ON s.user_id = l.user_id
+        WHERE l.id > COALESCE(s.last_entry_id, 0) AND l.id <= ?
+        GROUP BY l.user_id
+        ON CONFLICT(user_id) DO UPDATE SET
+            balance = excluded.balance,
+            last_entry_id = excluded.last_entry_id,
+            taken_at = excluded.taken_at
+    """, (STARTING_COINS, now, fold_upto))
+    folded = c.rowcount
+
+    # Entries already covered by a snapshot are only kept for the audit window
+    c.execute("""
+        DELETE FROM ledger
+        WHERE created_at <= ?
+        AND id <= (SELECT last_entry_id FROM balance_snapshots s WHERE s.user_id = ledger.user_id)
+    """, (now - LEDGER_RETENTION,))
+
+    conn.commit()
+    return folded
+
+@tasks.loop(seconds=10)
+async def flush_ledger_task():
+    flush_ledger()
+
+@tasks.loop(hours=1)
+async def compact_ledger_task():
+    folded = compact_ledger()
+    if folded:
+        print(f"✅ Compacted ledger into {folded} balance snapshots.")
+
+# ✅ Moderation Event Log
+# Every delete, warning, fine and mute, so admins can see why a user was punished
+c.execute("""
+    CREATE TABLE IF NOT EXISTS moderation_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id INTEGER,
+        user_id INTEGER NOT NULL,
+        ts INTEGER NOT NULL,
+        action TEXT NOT NULL,
+        reason TEXT NOT NULL,
+        detail TEXT,
+        channel_id INTEGER,
+        message_id INTEGER
+    )
+""")
+c.execute("CREATE INDEX IF NOT EXISTS idx_moderation_events_user ON moderation_events (guild_id, user_id, ts)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_moderation_events_ts ON moderation_events (ts)")
+# History scans look up which messages were already moderated
+c.execute("CREATE INDEX IF NOT EXISTS idx_moderation_events_message ON moderation_events (message_id) WHERE message_id IS NOT NULL")
+conn.commit()
+
+MODERATION_LOG_DAYS = float(os.getenv("MODERATION_LOG_DAYS", "90"))  # 0 keeps events forever
+MODERATION_EVENT_BATCH_SIZE = 50  # Flush buffered events once this many are pending
+MODERATION_PRUNE_BATCH = 500  # Rows deleted per prune transaction
+MODERATION_PRUNE_PAUSE = 0.05  # Seconds between prune batches so other writers get the database
+
+MODERATION_EVENT_BUFFER = []
+
+def log_moderation_event(guild_id, user_id, action, reason, detail=None, channel_id=None, message_id=None):
+    """Queue an enforcement action for the moderation log. Events are written in batches."""
+    MODERATION_EVENT_BUFFER.append((guild_id, user_id, int(time.time()), action, reason, detail, channel_id, message_id))
+    if len(MODERATION_EVENT_BUFFER) >= MODERATION_EVENT_BATCH_SIZE:
+        flush_moderation_events()
+
+def log_message_event(message, action, reason, detail=None):
+    log_moderation_event(message.guild.id if message.guild else None, message.author.id, action, reason,
+                         detail, message.channel.id, message.id)
+
+def flush_moderation_events():
+    if not MODERATION_EVENT_BUFFER:
+        return 0
+    pending = len(MODERATION_EVENT_BUFFER)
+    c.executemany("""
+        INSERT INTO moderation_events (guild_id, user_id, ts, action, reason, detail, channel_id, message_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, MODERATION_EVENT_BUFFER)
+    conn.commit()
+    MODERATION_EVENT_BUFFER.clear()
+    return pending
+
+def moderated_message_ids(message_ids):
+    """The IDs among `message_ids` that already have an event, from live moderation or an earlier scan."""
+    flush_moderation_events()
+    c.execute(f"SELECT DISTINCT message_id FROM moderation_events WHERE message_id IN ({','.join('?' * len(message_ids))})",
+              message_ids)
+    return {row[0] for row in c.fetchall()}
+
+def fetch_moderation_events(guild_id, user_id, limit, before=None):
+    """Newest-first events for a user. `before` is the (ts, id) of the last row already shown."""
+    flush_moderation_events()
+    if before:
+        c.execute("""
+            SELECT id, ts, action, reason, detail, channel_id FROM moderation_events
+            WHERE guild_id = ? AND user_id = ? AND (ts, id) < (?, ?)
+            ORDER BY ts DESC, id DESC LIMIT ?
+        """, (guild_id, user_id, *before, limit))
+    else:
+        c.execute("""
+            SELECT id, ts, action, reason, detail, channel_id FROM moderation_events
+            WHERE guild_id = ? AND user_id = ?
+            ORDER BY ts DESC, id DESC LIMIT ?
+        """, (guild_id, user_id, limit))
+    return c.fetchall()
+
+async def prune_moderation_events():
+    """Delete events past retention a small batch at a time. Returns the number of rows removed."""
+    if MODERATION_LOG_DAYS <= 0:
+        return 0
+    cutoff = int(time.time() - MODERATION_LOG_DAYS * 86400)
+    removed = 0
+    while True:
+        c.execute("""
+            DELETE FROM moderation_events WHERE id IN (
+                SELECT id FROM moderation_events WHERE ts < ? ORDER BY ts LIMIT ?
+            )
+        """, (cutoff, MODERATION_PRUNE_BATCH))
+        deleted = c.rowcount
+        conn.commit()
+        removed += deleted
+        if deleted < MODERATION_PRUNE_BATCH:
+            return removed
+        await asyncio.sleep(MODERATION_PRUNE_PAUSE)
+
+@tasks.loop(seconds=10)
+async def flush_moderation_events_task():
+    flush_moderation_events()
+
+@tasks.loop(hours=1)
+async def prune_moderation_events_task():
+    removed = await prune_moderation_events()
+    if removed:
+        print(f"✅ Pruned {removed} moderation events past retention.")
+
+# ✅ Bulk Economy Operations
+c.execute("""
+    CREATE TABLE IF NOT EXISTS economy_batches (
+        batch_id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        amount INTEGER,
+        reason TEXT,
+        target TEXT,
+        created_by INTEGER,
+        created_at INTEGER NOT NULL,
+        affected INTEGER DEFAULT 0,
+        reverted_at INTEGER
+    )
+""")
+
+# Previous stats of users touched by a reset, so the batch can be reverted
+c.execute("""
+    CREATE TABLE IF NOT EXISTS economy_batch_rows (
+        batch_id TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        count INTEGER,
+        warnings INTEGER,
+        PRIMARY KEY (batch_id, user_id)
+    )
+""")
+c.execute("CREATE INDEX IF NOT EXISTS idx_ledger_ref ON ledger (ref) WHERE ref IS NOT NULL")
+c.execute("CREATE TEMP TABLE IF NOT EXISTS bulk_targets (user_id INTEGER PRIMARY KEY)")
+conn.commit()
+
+def set_bulk_targets(user_ids=(), active_since=None, everyone=False):
+    """Fill the bulk_targets temp table with the union of the given selectors."""
+    c.execute("DELETE FROM bulk_targets")
+    c.executemany("INSERT OR IGNORE INTO bulk_targets (user_id) VALUES (?)", ((user_id,) for user_id in user_ids))
+    if active_since is not None:
+        c.execute("INSERT OR IGNORE INTO bulk_targets (user_id) SELECT DISTINCT user_id FROM ledger WHERE created_at >= ?",
+                 (active_since,))
+    if everyone:
+        c.execute("INSERT OR IGNORE INTO bulk_targets (user_id) SELECT user_id FROM swear_counts")
+    c.execute("SELECT COUNT(*) FROM bulk_targets")
+    return c.fetchone()[0]
+
+def _start_batch(kind, amount, reason, target, created_by):
+    batch_id = uuid.uuid4().hex[:8]
+    c.execute("""
+        INSERT INTO economy_batches (batch_id, kind, amount, reason, target, created_by, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (batch_id, kind, amount, reason, target, created_by, int(time.time())))
+    return batch_id
+
+def bulk_adjust_coins(amount, reason, target, created_by):
+    """Grant (amount > 0) or fine (amount < 0) every user in bulk_targets in one transaction."""
+    flush_ledger()
+    now = int(time.time())
+    try:
+        batch_id = _start_batch("grant" if amount > 0 else "fine", amount, reason, target, created_by)
+        c.execute("INSERT OR IGNORE INTO swear_counts (user_id) SELECT user_id FROM bulk_targets")
+
+        # Ledger entries carry the actual delta, since fines never take a balance below 0
+        c.execute("""
+            INSERT INTO ledger (user_id, delta, reason, ref, created_at)
+            SELECT s.user_id, MAX(0, s.coins + ?) - s.coins, ?, ?, ?
+            FROM swear_counts s JOIN bulk_targets t ON t.user_id = s.user_id
+            WHERE MAX(0, s.coins + ?) != s.coins
+        """, (amount, f"bulk_{reason}", f"batch:{batch_id}", now, amount))
+
+        rollup_ledger_ref(f"batch:{batch_id}")
+
+        c.execute("UPDATE swear_counts SET coins = MAX(0, coins + ?) WHERE user_id IN (SELECT user_id FROM bulk_targets)",
+                 (amount,))
+        affected = c.rowcount
+
+        c.execute("UPDATE economy_batches SET affected = ? WHERE batch_id = ?", (affected, batch_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        USER_STATES.clear()
+
+    return batch_id, affected
+
+def bulk_reset(reason, target, created_by):
+    """Reset count, coins and warnings for every user in bulk_targets in one transaction."""
+    flush_ledger()
+    now = int(time.time())
+    try:
+        batch_id = _start_batch("reset", None, reason, target, created_by)
+
+        c.execute("""
+            INSERT INTO economy_batch_rows (batch_id, user_id, count, warnings)
+            SELECT ?, s.user_id, s.count, s.warnings
+            FROM swear_counts s JOIN bulk_targets t ON t.user_id = s.user_id
+        """, (batch_id,))
+        c.execute("""
+            INSERT INTO ledger (user_id, delta, reason, ref, created_at)
+            SELECT s.user_id, ? - s.coins, 'season_reset', ?, ?
+            FROM swear_counts s JOIN bulk_targets t ON t.user_id = s.user_id
+            WHERE s.coins != ?
+        """, (STARTING_COINS, f"batch:{batch_id}", now, STARTING_COINS))
+        rollup_ledger_ref(f"batch:{batch_id}")
+
+        c.execute("""
+            UPDATE swear_counts SET count = 0, coins = ?, warnings = 0
+            WHERE user_id IN (SELECT user_id FROM bulk_targets)
+        """, (STARTING_COINS,))
+        affected = c.rowcount
+
+        c.execute("UPDATE economy_batches SET affected = ? WHERE batch_id = ?", (affected, batch_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        USER_STATES.clear()
+
+    return batch_id, affected
+
+def revert_batch(batch_id):
+    """Undo a bulk batch with compensating ledger entries. Returns the number of users restored, or None."""
+    c.execute("SELECT kind, reverted_at FROM economy_batches WHERE batch_id = ?", (batch_id,))
+    batch = c.fetchone()
+    if not batch or batch[1] is not None:
+        return None
+
+    kind = batch[0]
+    flush_ledger()
+    now = int(time.time())
+    try:
+        c.execute("""
+            INSERT INTO ledger (user_id, delta, reason, ref, created_at)
+            SELECT s.user_id, MAX(0, s.coins - b.total) - s.coins, 'batch_revert', ?, ?
+            FROM swear_counts s
+            JOIN (SELECT user_id, SUM(delta) AS total FROM ledger WHERE ref = ? GROUP BY user_id) b
+                ON b.user_id = s.user_id
+            WHERE MAX(0, s.coins - b.total) != s.coins
+        """, (f"revert:{batch_id}", now, f"batch:{batch_id}"))
+        rollup_ledger_ref(f"revert:{batch_id}")
+
+        c.execute("""
+            UPDATE swear_counts
+            SET coins = coins + (SELECT delta FROM ledger WHERE ref = ? AND ledger.user_id = swear_counts.user_id)
+            WHERE user_id IN (SELECT user_id FROM ledger WHERE ref = ?)
+        """, (f"revert:{batch_id}", f"revert:{batch_id}"))
+        restored = c.rowcount
+
+        if kind == "reset":
+            c.execute("""
+                UPDATE swear_counts
+                SET count = count + (SELECT r.count FROM economy_batch_rows r WHERE r.batch_id = ? AND r.user_id = swear_counts.user_id),
+                    warnings = warnings + (SELECT r.warnings FROM economy_batch_rows r WHERE r.batch_id = ? AND r.user_id = swear_counts.user_id)
+                WHERE user_id IN (SELECT user_id FROM economy_batch_rows WHERE batch_id = ?)
+            """, (batch_id, batch_id, batch_id))
+            restored = max(restored, c.rowcount)
+
+        c.execute("UPDATE economy_batches SET reverted_at = ? WHERE batch_id = ?", (now, batch_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        USER_STATES.clear()
+
+    return restored
+
+async def read_id_attachment(attachment):
+    """Parse user IDs from an uploaded CSV (or any comma/newline separated list)."""
+    data = (await attachment.read()).decode("utf-8", errors="ignore")
+    user_ids = set()
+    for row in csv.reader(io.StringIO(data)):
+        for cell in row:
+            cell = cell.strip().strip("<@!>")
+            if cell.isdigit():
+                user_ids.add(int(cell))
+    return user_ids
+
+# ✅ Purchase Analytics
+# Hourly and daily rollups are updated as purchases and ledger entries are written,
+# so /shop_stats never has to scan shop_purchases or the ledger.
+# ROLLUP_PERIODS and ALL_ITEMS come from storage, which writes purchases for every backend.
+HOURLY_ROLLUP_RETENTION = 7 * 86400
+
+c.execute("""
+    CREATE TABLE IF NOT EXISTS purchase_rollups (
+        period TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        item_id INTEGER NOT NULL,
+        purchases INTEGER NOT NULL DEFAULT 0,
+        revenue INTEGER NOT NULL DEFAULT 0,
+        unique_buyers INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (period, bucket, item_id)
+    )
+""")
+
+# Buyers seen in the still-open buckets, used to count unique buyers incrementally
+c.execute("""
+    CREATE TABLE IF NOT EXISTS purchase_rollup_buyers (
+        period TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        item_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        PRIMARY KEY (period, bucket, item_id, user_id)
+    )
+""")
+
+c.execute("""
+    CREATE TABLE IF NOT EXISTS economy_rollups (
+        period TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        reason TEXT NOT NULL,
+        sources INTEGER NOT NULL DEFAULT 0,
+        sinks INTEGER NOT NULL DEFAULT 0,
+        entries INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (period, bucket, reason)
+    )
+""")
+
+# Seed the rollups from any purchase history recorded before they existed
+c.execute("SELECT COUNT(*) FROM purchase_rollups")
+if c.fetchone()[0] == 0:
+    for period, size in ROLLUP_PERIODS.items():
+        for group_by in ("bucket, item_id", "bucket"):
+            c.execute(f"""
+                INSERT INTO purchase_rollups (period, bucket, item_id, purchases, revenue, unique_buyers)
+                SELECT ?, CAST(strftime('%s', purchase_date) AS INTEGER) / ? * ? AS bucket,
+                       {"item_id" if group_by.endswith("item_id") else ALL_ITEMS},
+                       COUNT(*), SUM(price_paid), COUNT(DISTINCT user_id)
+                FROM shop_purchases
+                WHERE purchase_date IS NOT NULL
+                GROUP BY {group_by}
+            """, (period, size, size))
+
+conn.commit()
+
+def record_purchase(user_id, item_id, price):
+    """Log a purchase and fold it into the hourly/daily rollups. The caller commits."""
+    insert_purchase(conn, user_id, item_id, price)
+
+def update_economy_rollups(entries):
+    """Aggregate ledger entries (user_id, delta, reason, ref, created_at) into source/sink rollups."""
+    totals = collections.defaultdict(lambda: [0, 0, 0])
+    for _, delta, reason, _, created_at in entries:
+        for period, size in ROLLUP_PERIODS.items():
+            total = totals[(period, created_at - created_at % size, reason)]
+            if delta > 0:
+                total[0] += delta
+            else:
+                total[1] -= delta
+            total[2] += 1
+
+    c.executemany("""
+        INSERT INTO economy_rollups (period, bucket, reason, sources, sinks, entries)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(period, bucket, reason) DO UPDATE SET
+            sources = sources + excluded.sources,
+            sinks = sinks + excluded.sinks,
+            entries = entries + excluded.entries
+    """, [key + tuple(total) for key, total in totals.items()])
+
+def prune_rollups():
+    now = int(time.time())
+    # Buyer sets are only needed while their bucket can still receive purchases
+    for period, size in ROLLUP_PERIODS.items():
+        c.execute("DELETE FROM purchase_rollup_buyers WHERE period = ? AND bucket < ?", (period, now - now % size))
+    c.execute("DELETE FROM purchase_rollups WHERE period = 'hour' AND bucket < ?", (now - HOURLY_ROLLUP_RETENTION,))
+    c.execute("DELETE FROM economy_rollups WHERE period = 'hour' AND bucket < ?", (now - HOURLY_ROLLUP_RETENTION,))
+    downsample_activity()
+    conn.commit()
+
+def rollup_ledger_ref(ref):
+    """Set-based counterpart of update_economy_rollups for ledger rows written by bulk SQL."""
+    for period, size in ROLLUP_PERIODS.items():
+        c.execute("""
+            INSERT INTO economy_rollups (period, bucket, reason, sources, sinks, entries)
+            SELECT ?, created_at - created_at % ? AS bucket, reason,
+                   SUM(MAX(delta, 0)), SUM(MAX(-delta, 0)), COUNT(*)
+            FROM ledger
+            WHERE ref = ?
+            GROUP BY bucket, reason
+            ON CONFLICT(period, bucket, reason) DO UPDATE SET
+                sources = sources + excluded.sources,
+                sinks = sinks + excluded.sinks,
+                entries = entries + excluded.entries
+        """, (period, size, ref))
+
+@tasks.loop(hours=1)
+async def prune_rollups_task():
+    prune_rollups()
+
+# ✅ Activity Rollups
+# Term hits per (guild, user, channel, term) and hour, written in batches from the message handlers.
+# Hourly rows older than ACTIVITY_HOURLY_DAYS are folded into daily rows, so /stats reads a bounded
+# number of rows however many messages were sent.
+ACTIVITY_HOURLY_DAYS = int(os.getenv("ACTIVITY_HOURLY_DAYS", "14"))
+ACTIVITY_BATCH_SIZE = 200  # Flush buffered hits once this many keys are pending
+NO_GUILD = 0  # guild_id used for direct messages
+
+c.execute("""
+    CREATE TABLE IF NOT EXISTS activity_rollups (
+        period TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        channel_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        term TEXT NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (period, bucket, guild_id, user_id, channel_id, kind, term)
+    )
+""")
+c.execute("CREATE INDEX IF NOT EXISTS idx_activity_rollups_guild ON activity_rollups (guild_id, bucket)")
+conn.commit()
+
+# (bucket, guild_id, user_id, channel_id, kind, term) -> hits not yet written
+ACTIVITY_BUFFER = collections.Counter()
+
+def record_activity(message, matches):
+    """Count a message's matched terms into the current hour's rollup."""
+    now = int(time.time())
+    key = (now - now % 3600, message.guild.id if message.guild else NO_GUILD, message.author.id, message.channel.id)
+    for term in matches.swears:
+        ACTIVITY_BUFFER[key + ("swear", term)] += 1
+    for term in matches.nsfw:
+        ACTIVITY_BUFFER[key + ("nsfw", term)] += 1
+    if matches.gif:
+        ACTIVITY_BUFFER[key + ("gif", matches.gif)] += 1
+    for term, _ in matches.positive:
+        ACTIVITY_BUFFER[key + ("positive", term)] += 1
+    if len(ACTIVITY_BUFFER) >= ACTIVITY_BATCH_SIZE:
+        flush_activity()
+
+def flush_activity():
+    if not ACTIVITY_BUFFER:
+        return 0
+    pending = len(ACTIVITY_BUFFER)
+    c.executemany("""
+        INSERT INTO activity_rollups (period, bucket, guild_id, user_id, channel_id, kind, term, hits)
+        VALUES ('hour', ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(period, bucket, guild_id, user_id, channel_id, kind, term) DO UPDATE SET
+            hits = hits + excluded.hits
+    """, [key + (hits,) for key, hits in ACTIVITY_BUFFER.items()])
+    conn.commit()
+    ACTIVITY_BUFFER.clear()
+    return pending
+
+def downsample_activity():
+    """Fold hourly activity from whole days older than ACTIVITY_HOURLY_DAYS into daily buckets."""
+    now = int(time.time())
+    cutoff = now - now % 86400 - ACTIVITY_HOURLY_DAYS * 86400
+    c.execute("""
+        INSERT INTO activity_rollups (period, bucket, guild_id, user_id, channel_id, kind, term, hits)
+        SELECT 'day', bucket - bucket % 86400 AS day, guild_id, user_id, channel_id, kind, term, SUM(hits)
+        FROM activity_rollups
+        WHERE period = 'hour' AND bucket < ?
+        GROUP BY day, guild_id, user_id, channel_id, kind, term
+        ON CONFLICT(period, bucket, guild_id, user_id, channel_id, kind, term) DO UPDATE SET
+            hits = hits + excluded.hits
+    """, (cutoff,))
+    c.execute("DELETE FROM activity_rollups WHERE period = 'hour' AND bucket < ?", (cutoff,))
+    return c.rowcount
+
+@tasks.loop(seconds=10)
+async def flush_activity_task():
+    flush_activity()
+
+# ✅ Database Backups
+BACKUP_INTERVAL_HOURS = float(os.getenv("BACKUP_INTERVAL_HOURS", "6"))
+BACKUP_INCREMENTAL_MINUTES = float(os.getenv("BACKUP_INCREMENTAL_MINUTES", "30"))  # 0 disables incrementals
+
+LAST_BACKUP = {}
+
+async def run_backup():
+    """Take a full backup in a worker thread so the event loop keeps running."""
+    flush_ledger()
+    loop = asyncio.get_running_loop()
+    stats = await loop.run_in_executor(None, functools.partial(datatools.create_backup, DB_PATH, datatools.BACKUP_DIR))
+    await loop.run_in_executor(None, datatools.prune_backups, datatools.BACKUP_DIR, datatools.BACKUP_RETENTION)
+
+    stats["finished_at"] = int(time.time())
+    LAST_BACKUP.clear()
+    LAST_BACKUP.update(stats)
+    print(f"✅ Backup {os.path.basename(stats['path'])}: {stats['size']} bytes "
+          f"({stats['db_size']} uncompressed) in {stats['duration']:.2f}s")
+    return stats
+
+async def run_on_own_connection(func, *args):
+    """Run func(connection, *args) in a worker thread over a connection of its own and return its result.
+
+    Commits first, so the worker sees everything this process has written.
+    """
+    conn.commit()
+
+    def run():
+        own_conn = sqlite3.connect(DB_PATH)
+        try:
+            return func(own_conn, *args)
+        finally:
+            own_conn.close()
+
+    return await asyncio.get_running_loop().run_in_executor(None, run)
+
+async def run_restore(backup_path):
+    """Restore a full backup in a worker thread, then reload cached state."""
+    await run_on_own_connection(datatools.restore_backup, backup_path)
+    reload_state()
+
+async def run_export(path, file_format="jsonl", table=None):
+    """Export to a file in a worker thread so large databases don't stall the event loop."""
+    flush_ledger()
+    await run_on_own_connection(datatools.export_to_file, path, file_format, table)
+
+async def run_import(path, file_format="jsonl", table=None):
+    """Import a file in a worker thread, then reload cached state. Returns the row counts per table."""
+    flush_ledger()
+    counts = await run_on_own_connection(datatools.import_from_file, path, file_format, table)
+    reload_state()
+    return counts
+
+@tasks.loop(hours=BACKUP_INTERVAL_HOURS)
+async def backup_task():
+    try:
+        await run_backup()
+    except Exception as e:
+        print(f"Error backing up database: {e}")
+
+@tasks.loop(minutes=BACKUP_INCREMENTAL_MINUTES or 30)
+async def incremental_backup_task():
+    flush_ledger()
+    try:
+        loop = asyncio.get_running_loop()
+        stats = await loop.run_in_executor(None, datatools.export_incremental, DB_PATH, datatools.BACKUP_DIR)
+    except Exception as e:
+        print(f"Error writing incremental backup: {e}")
+        return
+    if stats:
+        print(f"✅ Incremental backup {os.path.basename(stats['path'])}: {stats['rows']} rows, "
+              f"{stats['size']} bytes in {stats['duration']:.2f}s")
+
+# ✅ Cooldowns & Streaks
+# action: (cooldown in seconds, streak window in seconds or None for no streaks)
+COOLDOWNS = {
+    "daily": (86400, 2 * 86400),
+    "weekly": (7 * 86400, 14 * 86400),
+    "use": (30, None)
+}
+STREAK_BONUS = 0.1  # Extra reward per consecutive claim
+MAX_STREAK_BONUS = 1.0  # Rewards are at most doubled
+
+c.execute("""
+    CREATE TABLE IF NOT EXISTS cooldowns (
+        user_id INTEGER NOT NULL,
+        action TEXT NOT NULL,
+        last_at INTEGER NOT NULL,
+        next_at INTEGER NOT NULL,
+        streak INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, action)
+    )
+""")
+c.execute("CREATE INDEX IF NOT EXISTS idx_cooldowns_next ON cooldowns (next_at)")
+
+# Carry over daily claims stored as ISO strings in swear_counts.last_daily
+c.execute("""
+    INSERT OR IGNORE INTO cooldowns (user_id, action, last_at, next_at, streak)
+    SELECT user_id, 'daily', CAST(strftime('%s', last_daily) AS INTEGER), CAST(strftime('%s', last_daily) AS INTEGER) + ?, 1
+    FROM swear_counts
+    WHERE last_daily IS NOT NULL AND strftime('%s', last_daily) IS NOT NULL
+""", (COOLDOWNS["daily"][0],))
+conn.commit()
+
+# (user_id, action) -> (last_at, next_at, streak), or None when the user never claimed
+COOLDOWN_CACHE = {}
+
+def warm_cooldown_cache():
+    """Load every cooldown that hasn't expired yet, using the next_at index."""
+    c.execute("SELECT user_id, action, last_at, next_at, streak FROM cooldowns WHERE next_at > ?", (int(time.time()),))
+    for user_id, action, last_at, next_at, streak in c.fetchall():
+        COOLDOWN_CACHE[(user_id, action)] = (last_at, next_at, streak)
+
+def _cooldown_state(user_id, action):
+    key = (user_id, action)
+    if key not in COOLDOWN_CACHE:
+        c.execute("SELECT last_at, next_at, streak FROM cooldowns WHERE user_id = ? AND action = ?", key)
+        COOLDOWN_CACHE[key] = c.fetchone()
+    return COOLDOWN_CACHE[key]
+
+def cooldown_remaining(user_id, action):
+    """Seconds until the user can do `action` again (0 when ready)."""
+    state = _cooldown_state(user_id, action)
+    if not state:
+        return 0
+    return max(0, state[1] - int(time.time()))
+
+def claim_cooldown(user_id, action):
+    """Start the action's cooldown and return the user's new streak. The caller commits."""
+    now = int(time.time())
+    cooldown, streak_window = COOLDOWNS[action]
+    state = _cooldown_state(user_id, action)
+
+    if state and streak_window and now - state[0] <= streak_window:
+        streak = state[2] + 1
+    else:
+        streak = 1
+
+    c.execute("""
+        INSERT INTO cooldowns (user_id, action, last_at, next_at, streak) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(user_id, action) DO UPDATE SET
+            last_at = excluded.last_at,
+            next_at = excluded.next_at,
+            streak = excluded.streak
+    """, (user_id, action, now, now + cooldown, streak))
+    COOLDOWN_CACHE[(user_id, action)] = (now, now + cooldown, streak)
+    broadcast("cooldown_claimed", user_id=user_id, action=action)
+    return streak
+
+def streak_multiplier(streak):
+    return 1 + min((streak - 1) * STREAK_BONUS, MAX_STREAK_BONUS)
+
+def format_duration(seconds):
+    days, remainder = divmod(int(seconds), 86400)
+    hours, remainder = divmod(remainder, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m {seconds}s"
+    return f"{seconds}s"
+
+def prune_cooldowns():
+    """Forget cooldowns whose wait and streak window have both run out."""
+    now = int(time.time())
+    for action, (cooldown, streak_window) in COOLDOWNS.items():
+        c.execute("DELETE FROM cooldowns WHERE action = ? AND next_at < ?", (action, now - (streak_window or 0)))
+    conn.commit()
+
+    for key, state in list(COOLDOWN_CACHE.items()):
+        streak_window = COOLDOWNS.get(key[1], (0, None))[1] or 0
+        if not state or state[1] < now - streak_window:
+            del COOLDOWN_CACHE[key]
+
+@tasks.loop(hours=1)
+async def prune_cooldowns_task():
+    prune_cooldowns()
+
+# ✅ Shared State
+# Set SHARED_STATE_URL (e.g. redis://localhost:6379/0) when several processes serve the bot: rate limits
+# are then counted once for all of them and every published event reaches the others. Leave it empty
+# for a single process.
+SHARED_STATE_URL = os.getenv("SHARED_STATE_URL", "")
+SHARED_STATE = sharedstate.open_shared_state(SHARED_STATE_URL)
+EVENTS_CHANNEL = "swearjar:events"
+PROCESS_ID = uuid.uuid4().hex  # Lets a process skip its own events when they come back from the channel
+
+async def start_shared_state():
+    await SHARED_STATE.connect()
+    SHARED_STATE.listen(EVENTS_CHANNEL, receive_event)
+
+LOCAL_RATE_LIMITS = sharedstate.LocalState()  # Counts rate limits while shared state is unreachable
+RATE_LIMIT_STATUS = {"shared_state_failing": False}  # Logged once when shared state fails, again when it recovers
+
+async def over_rate_limit(key, limit, window):
+    """Count one use of `key` and report whether it went over `limit` uses per `window` seconds in any process."""
+    key = f"swearjar:ratelimit:{key}"
+    try:
+        count = await SHARED_STATE.hit(key, window)
+    except (OSError, asyncio.IncompleteReadError, sharedstate.RedisError) as e:
+        # Fail open: keep limiting, counted by this process alone, rather than failing the message
+        if not RATE_LIMIT_STATUS["shared_state_failing"]:
+            RATE_LIMIT_STATUS["shared_state_failing"] = True
+            print(f"Error counting rate limits in shared state, counting locally until it recovers: {e}")
+        return await LOCAL_RATE_LIMITS.hit(key, window) > limit
+    if RATE_LIMIT_STATUS["shared_state_failing"]:
+        RATE_LIMIT_STATUS["shared_state_failing"] = False
+        print("✅ Shared state is reachable again for rate limits.")
+    return count > limit
+
+# ✅ Duplicate Deliveries
+# After a gateway resume or a retried interaction the same event can arrive twice. Handlers call
+# first_delivery() before any side effect. IDs are remembered for one to two DEDUPE_WINDOW_SECONDS
+# windows in two rotating sets, and also claimed in shared state when SHARED_STATE_URL is set, so a
+# redelivery to another process or after a restart is caught as well.
+DEDUPE_WINDOW = int(os.getenv("DEDUPE_WINDOW_SECONDS", "600"))
+
+class RecentIds:
+    """IDs seen in the last one to two windows. Memory is bounded by the traffic of two windows."""
+
+    def __init__(self, window):
+        self.window = window
+        self.current = set()
+        self.previous = set()
+        self.rotate_at = time.monotonic() + window
+        self.duplicates = 0
+
+    def __len__(self):
+        return len(self.current) + len(self.previous)
+
+    def add(self, key):
+        """Remember `key`. Returns False if it was already seen."""
+        now = time.monotonic()
+        if now >= self.rotate_at:
+            # After a whole idle window the current set is too old to keep as well
+            self.previous = self.current if now < self.rotate_at + self.window else set()
+            self.current = set()
+            self.rotate_at = now + self.window
+        if key in self.current or key in self.previous:
+            self.duplicates += 1
+            return False
+        self.current.add(key)
+        return True
+
+RECENT_DELIVERIES = RecentIds(DEDUPE_WINDOW)
+DEDUPE_STATUS = {"shared_state_failing": False}  # Logged once when shared state fails, again when it recovers
+
+async def first_delivery(*key):
+    """True the first time a message or interaction (by snowflake ID) or an edit (ID and time) is seen, else False."""
+    if not RECENT_DELIVERIES.add(key if len(key) > 1 else key[0]):
+        return False
+    if SHARED_STATE_URL:
+        try:
+            claimed = await SHARED_STATE.claim(f"swearjar:seen:{':'.join(map(str, key))}", DEDUPE_WINDOW)
+        except (OSError, asyncio.IncompleteReadError, sharedstate.RedisError) as e:
+            # Fail open: messages and commands keep working, deduplicated by this process alone
+            if not DEDUPE_STATUS["shared_state_failing"]:
+                DEDUPE_STATUS["shared_state_failing"] = True
+                print(f"Error checking deliveries in shared state, deduplicating locally until it recovers: {e}")
+            return True
+        if DEDUPE_STATUS["shared_state_failing"]:
+            DEDUPE_STATUS["shared_state_failing"] = False
+            print("✅ Shared state is reachable again.")
+        if not claimed:
+            RECENT_DELIVERIES.duplicates += 1
+            return False
+    return True
+
+# ✅ Event Bus
+# Mutations publish an event; caches subscribe instead of every command knowing what to clear.
+# Events: terms_changed(kind), shop_changed, reactions_changed, policy_changed(guild_id), state_reloaded,
+# channel_modes_changed, user_changed(user_id), users_changed, cooldown_claimed(user_id, action)
+EVENT_HANDLERS = collections.defaultdict(dict)
+# Handlers that first bring this process's copies up to date when the event came from another process
+REMOTE_HANDLERS = collections.defaultdict(dict)
+
+def subscribe(event, handler, key=None, remote=False):
+    # Handlers registered from a cog pass a stable key so reloading the cog replaces them
+    (REMOTE_HANDLERS if remote else EVENT_HANDLERS)[event][key or handler] = handler
+    return handler
+
+def publish(event, **data):
+    for handler in list(EVENT_HANDLERS[event].values()):
+        handler(**data)
+    broadcast(event, **data)
+
+def broadcast(event, **data):
+    """Send an event to the other processes only. It goes out once the caller yields, normally after its commit."""
+    if SHARED_STATE_URL:
+        SHARED_STATE.publish_nowait(EVENTS_CHANNEL, json.dumps({"origin": PROCESS_ID, "event": event, "data": data}))
+
+def receive_event(payload):
+    message = json.loads(payload)
+    if message["origin"] == PROCESS_ID:
+        return
+    for handler in [*REMOTE_HANDLERS[message["event"]].values(), *EVENT_HANDLERS[message["event"]].values()]:
+        handler(**message["data"])
+
+def forget_cooldown(user_id, action):
+    COOLDOWN_CACHE.pop((user_id, action), None)
+
+subscribe("cooldown_claimed", forget_cooldown, remote=True)
+
+# ✅ Deferred & Paginated Responses
+DEFER_BUDGET = 1.5  # Seconds of work a command may take before it defers (Discord's deadline is 3)
+LATENCY_ALPHA = 0.2  # Weight of the newest sample in each command's latency average
+COMMAND_LATENCY = {}  # command name -> moving average of seconds to finish
+PAGE_SIZE = 10
+
+def auto_defer(ephemeral=False):
+    """Defer a command's response whenever it is likely to miss the 3-second deadline.
+
+    Commands that have been slow on average defer right away; any other command is
+    deferred by a timer once DEFER_BUDGET passes without a response. Decorated
+    commands reply with respond(), which uses the followup once deferred.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(cog, interaction: discord.Interaction, *args, **kwargs):
+            lock = asyncio.Lock()
+            interaction.extras["defer_lock"] = lock
+
+            async def defer_when_late():
+                await asyncio.sleep(DEFER_BUDGET)
+                async with lock:
+                    if not interaction.response.is_done():
+                        await interaction.response.defer(ephemeral=ephemeral, thinking=True)
+
+            guard = None
+            if COMMAND_LATENCY.get(func.__name__, 0.0) > DEFER_BUDGET:
+                await interaction.response.defer(ephemeral=ephemeral, thinking=True)
+            else:
+                guard = asyncio.create_task(defer_when_late())
+
+            started = time.perf_counter()
+            try:
+                return await func(cog, interaction, *args, **kwargs)
+            finally:
+                if guard:
+                    guard.cancel()
+                elapsed = time.perf_counter() - started
+                average = COMMAND_LATENCY.get(func.__name__)
+                COMMAND_LATENCY[func.__name__] = elapsed if average is None else average + LATENCY_ALPHA * (elapsed - average)
+        return wrapper
+    return decorator
+
+async def respond(interaction, content=None, **kwargs):
+    """Send a command's reply, through the followup if the command was deferred."""
+    lock = interaction.extras.get("defer_lock") or asyncio.Lock()
+    async with lock:
+        if interaction.response.is_done():
+            return await interaction.followup.send(content, **kwargs)
+        return await interaction.response.send_message(content, **kwargs)
+
+class PagedView(discord.ui.View):
+    """Previous/Next buttons over a result set that is rendered one page at a time.
+
+    render_page(page) returns (embed, has_next) and should fetch only that page's rows.
+    """
+
+    def __init__(self, render_page, owner_id, timeout=180):
+        super().__init__(timeout=timeout)
+        self.render_page = render_page
+        self.owner_id = owner_id
+        self.page = 0
+        self.message = None
+
+    async def start(self, interaction, ephemeral=False):
+        embed, has_next = await self.render_page(0)
+        self.update_buttons(has_next)
+        if has_next:
+            await respond(interaction, embed=embed, view=self, ephemeral=ephemeral)
+            self.message = await interaction.original_response()
+        else:
+            await respond(interaction, embed=embed, ephemeral=ephemeral)
+
+    def update_buttons(self, has_next):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = not has_next
+
+    async def show(self, interaction, page):
+        self.page = page
+        embed, has_next = await self.render_page(page)
+        self.update_buttons(has_next)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    async def interaction_check(self, interaction):
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("❌ Only the person who ran this command can change pages.", ephemeral=True)
+            return False
+        return True
+
+    async def on_timeout(self):
+        for child in self.children:
+            child.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, max(0, self.page - 1))
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page + 1)
+
+def fetch_page(sql, params, page, page_size=PAGE_SIZE):
+    """Run a query for one page. Returns (rows, has_next)."""
+    c.execute(f"{sql} LIMIT ? OFFSET ?", (*params, page_size + 1, page * page_size))
+    rows = c.fetchall()
+    return rows[:page_size], len(rows) > page_size
+
+async def display_name(user_id):
+    # Prefer the user cache; only ask the API for users we haven't seen
+    user = bot.get_user(user_id)
+    if user is None:
+        try:
+            user = await bot.fetch_user(user_id)
+        except discord.HTTPException:
+            return f"User {user_id}"
+    return user.display_name
+
+# ✅ Response Cache
+RESPONSE_CACHE = {}  # (command, guild_id, args) -> (expires_at, payload)
+RESPONSE_CACHE_STATS = collections.defaultdict(collections.Counter)  # command -> hits/misses/invalidations
+
+def cached_response(ttl, events=(), per_guild=True):
+    """Cache the reply a command renders, keyed by guild and the command's arguments.
+
+    The command returns the keyword arguments for its reply instead of sending it, or
+    None if it already replied itself (e.g. a permission error), which is never cached.
+    Entries expire after `ttl` seconds or as soon as one of `events` is published;
+    a policy_changed event only clears the guild it names.
+    """
+    def decorator(func):
+        name = func.__name__
+
+        def invalidate(guild_id=None, **_):
+            for key in [key for key in RESPONSE_CACHE if key[0] == name and (guild_id is None or key[1] == guild_id)]:
+                del RESPONSE_CACHE[key]
+                RESPONSE_CACHE_STATS[name]["invalidations"] += 1
+
+        for event in (*events, "state_reloaded"):
+            subscribe(event, invalidate, key=("response_cache", name))
+
+        @functools.wraps(func)
+        async def wrapper(cog, interaction: discord.Interaction, *args, **kwargs):
+            key = (name, interaction.guild_id if per_guild else None, args, tuple(sorted(kwargs.items())))
+            cached = RESPONSE_CACHE.get(key)
+            if cached and cached[0] > time.monotonic():
+                RESPONSE_CACHE_STATS[name]["hits"] += 1
+                await respond(interaction, **cached[1])
+                return
+
+            RESPONSE_CACHE_STATS[name]["misses"] += 1
+            payload = await func(cog, interaction, *args, **kwargs)
+            if payload is None:
+                return
+            RESPONSE_CACHE[key] = (time.monotonic() + ttl, payload)
+            await respond(interaction, **payload)
+        return wrapper
+    return decorator
+
+# ✅ Shop Catalog Cache
+ShopItem = collections.namedtuple("ShopItem", "id name emoji price description role_id effect")
+
+SHOP_CATALOG = None
+SHOP_EMBED = None
+SHOP_MANAGER_PAGES = {}  # page -> (embed, has_next)
+
+def get_shop_catalog():
+    """All shop items keyed by ID, loaded once and kept until the shop changes."""
+    global SHOP_CATALOG
+    if SHOP_CATALOG is None:
+        c.execute("SELECT id, name, emoji, price, description, role_id, effect FROM shop_items")
+        SHOP_CATALOG = {row[0]: ShopItem(*row) for row in c.fetchall()}
+    return SHOP_CATALOG
+
+def invalidate_shop_catalog():
+    global SHOP_CATALOG, SHOP_EMBED
+    SHOP_CATALOG = None
+    SHOP_EMBED = None
+    SHOP_MANAGER_PAGES.clear()
+
+subscribe("shop_changed", invalidate_shop_catalog)
+
+def get_shop_embed():
+    global SHOP_EMBED
+    if SHOP_EMBED is None:
+        embed = discord.Embed(title="🏪 Shop", description="Buy items with your coins!", color=0x00FF00)
+        for item in sorted(get_shop_catalog().values(), key=lambda item: item.price):
+            embed.add_field(
+                name=f"{item.emoji} {item.name} - {item.price} coins",
+                value=f"ID: `{item.id}` | {item.description}",
+                inline=False
+            )
+        SHOP_EMBED = embed
+    return SHOP_EMBED
+
+async def get_shop_manager_page(page):
+    if page not in SHOP_MANAGER_PAGES:
+        items = sorted(get_shop_catalog().values(), key=lambda item: item.price, reverse=True)
+        embed = discord.Embed(
+            title="🏪 Shop Manager",
+            description="View and manage shop items. Use `/add_shop_item`, `/update_shop_item`, or `/remove_shop_item` to make changes.",
+            color=0xFF5500
+        )
+        for item in items[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]:
+            role_text = f"Gives role ID: `{item.role_id}`" if item.role_id else "No role reward"
+            effect_text = f"Effect: `{item.effect}`" if item.effect else "No effect"
+            embed.add_field(
+                name=f"ID {item.id}: {item.emoji} {item.name} - {item.price} coins",
+                value=f"{item.description}\n{role_text} | {effect_text}",
+                inline=False
+            )
+        embed.set_footer(text=f"Page {page + 1} • Use the commands mentioned in the description to manage items.")
+        SHOP_MANAGER_PAGES[page] = (embed, len(items) > (page + 1) * PAGE_SIZE)
+    return SHOP_MANAGER_PAGES[page]
+
+# ✅ Mutes
+# (guild_id, user_id) -> pending unmute task
+SCHEDULED_UNMUTES = {}
+
+async def get_muted_role(guild):
+    # Create or get muted role
+    muted_role = discord.utils.get(guild.roles, name="Muted")
+    if not muted_role:
+        muted_role = await guild.create_role(name="Muted")
+        for channel in guild.channels:
+            await channel.set_permissions(muted_role, send_messages=False)
+    return muted_role
+
+def schedule_unmute(member, muted_role, seconds):
+    """Lift a mute later without holding up the handler that applied it."""
+    key = (member.guild.id, member.id)
+    previous = SCHEDULED_UNMUTES.get(key)
+    if previous:
+        previous.cancel()
+
+    async def unmute():
+        try:
+            await asyncio.sleep(seconds)
+            await member.remove_roles(muted_role)
+            log_moderation_event(member.guild.id, member.id, "unmute", "mute_expired")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error unmuting user: {e}")
+        finally:
+            if SCHEDULED_UNMUTES.get(key) is task:
+                del SCHEDULED_UNMUTES[key]
+
+    task = asyncio.create_task(unmute())
+    SCHEDULED_UNMUTES[key] = task
+    return task
+
+# ✅ Item Effects
+# Behaviors are keyed by the shop_items.effect column, so items can be renamed freely.
+# "buy" effects run instantly when purchased, "use" effects run from the inventory.
+# "use" effects return True once the item was used up, which starts the use cooldown.
+ITEM_EFFECTS = {}
+
+def item_effect(effect_type, on):
+    def decorator(func):
+        ITEM_EFFECTS[effect_type] = (on, func)
+        return func
+    return decorator
+
+def consume_inventory_item(user_id, item_id, quantity):
+    # Remove one item from inventory
+    new_quantity = quantity - 1
+    if new_quantity > 0:
+        c.execute("UPDATE user_inventory SET quantity = ? WHERE user_id = ? AND item_id = ?",
+                 (new_quantity, user_id, item_id))
+    else:
+        c.execute("DELETE FROM user_inventory WHERE user_id = ? AND item_id = ?",
+                 (user_id, item_id))
+    conn.commit()
+
+# ✅ Bot Ready Event
+@bot.event
+async def on_ready():
+    print(f'✅ Logged in as {bot.user}')
+    
+    # Set bot start time for uptime tracking
+    bot.start_time = datetime.datetime.now()
+    
+    # Load custom moderation reactions from database
+    load_moderation_reactions()
+    
+    # Start background ledger jobs (on_ready can fire again after reconnects)
+    if not flush_ledger_task.is_running():
+        flush_ledger_task.start()
+    if not compact_ledger_task.is_running():
+        compact_ledger_task.start()
+    if not flush_activity_task.is_running():
+        flush_activity_task.start()
+    if not flush_moderation_events_task.is_running():
+        flush_moderation_events_task.start()
+    if not prune_moderation_events_task.is_running():
+        prune_moderation_events_task.start()
+    if not prune_rollups_task.is_running():
+        prune_rollups_task.start()
+    if not prune_cooldowns_task.is_running():
+        warm_cooldown_cache()
+        prune_cooldowns_task.start()
+    if BACKUP_INTERVAL_HOURS > 0 and not backup_task.is_running():
+        backup_task.start()
+    if BACKUP_INCREMENTAL_MINUTES > 0 and not incremental_backup_task.is_running():
+        incremental_backup_task.start()
+    if not tally_flush_task.is_running():
+        tally_flush_task.start()
+    if MEMORY_SNAPSHOT_MINUTES > 0 and not memory_snapshot_task.is_running():
+        memory_snapshot_task.start()
+    CACHES_WARM["ready"] = True
+
+    try:
+        await bot.tree.sync()
+        print(f"✅ Successfully synced slash commands.")
+    except Exception as e:
+        print(f"Error syncing commands: {e}")
+
+# Load custom moderation reactions from database
+def load_moderation_reactions():
+    global MILD_REACTION, MODERATE_REACTION, SEVERE_REACTION, MUTED_REACTION
+    
+    c.execute("SELECT key, value FROM moderation_settings WHERE key = 'mild_reaction'")
+    result = c.fetchone()
+    if result:
+        MILD_REACTION = result[1]
+        
+    c.execute("SELECT key, value FROM moderation_settings WHERE key = 'moderate_reaction'")
+    result = c.fetchone()
+    if result:
+        MODERATE_REACTION = result[1]
+        
+    c.execute("SELECT key, value FROM moderation_settings WHERE key = 'severe_reaction'")
+    result = c.fetchone()
+    if result:
+        SEVERE_REACTION = result[1]
+        
+    c.execute("SELECT key, value FROM moderation_settings WHERE key = 'muted_reaction'")
+    result = c.fetchone()
+    if result:
+        MUTED_REACTION = result[1]
+
+subscribe("reactions_changed", load_moderation_reactions, remote=True)
+
+# Reload everything cached in memory after the database changed underneath us (e.g. an import)
+def reload_state():
+    reload_cached_state()
+    publish("state_reloaded")
+
+def reload_cached_state():
+    reload_term_sets()
+    invalidate_shop_catalog()
+    load_moderation_reactions()
+    rebuild_matcher()
+    USER_STATES.clear(notify=False)
+    COOLDOWN_CACHE.clear()
+    POLICY_CACHE.clear()
+    reload_channel_modes()
+
+subscribe("state_reloaded", reload_cached_state, remote=True)
+
+# ✅ Load Swear Words & Settings
+def load_swear_words():
+    c.execute("SELECT word FROM swear_words")
+    return {row[0] for row in c.fetchall()} | {"sorry", "fuck", "damn"}
+
+# ✅ Load Positive Words
+def load_positive_words():
+    c.execute("SELECT word, reward FROM positive_words")
+    return {row[0]: row[1] for row in c.fetchall()} or {"thanks": 5, "awesome": 5, "great": 5}
+
+# ✅ Moderation Level Emojis
+# These are Unicode emojis that work across all Discord clients
+# Level 1: Mild warning (first offense)
+MILD_REACTION = "😠"  # Angry face
+# Level 2: Moderate warning (second offense or low coins)
+MODERATE_REACTION = "😡"  # Very angry face
+# Level 3: Severe warning (near mute threshold)
+SEVERE_REACTION = "🤬"  # Face with symbols on mouth
+# Level 4: Muted (3+ warnings)
+MUTED_REACTION = "🔇"  # Muted speaker
+# Positive reaction (for good behavior)
+POSITIVE_REACTION = "😊"  # Smiling face with smiling eyes
+# Very positive reaction (for consistent good behavior)
+VERY_POSITIVE_REACTION = "🌟"  # Glowing star
+
+SWEAR_WORDS = load_swear_words()
+POSITIVE_WORDS = load_positive_words()
+
+# ✅ Term Matcher
+class TermMatcher:
+    """Every term list compiled once, so a message is matched without touching the database.
+
+    Swear and NSFW words match whole (whitespace-separated) tokens, positive words and
+    GIF filters match anywhere in the text, and GIF filters only apply to GIF-like messages.
+    """
+    __slots__ = ("swear_words", "nsfw_words", "gif_pattern", "positive_words")
+
+    def __init__(self, swear_words, nsfw_words, gif_filters, positive_words):
+        self.swear_words = frozenset(word.lower() for word in swear_words)
+        self.nsfw_words = frozenset(word.lower() for word in nsfw_words)
+        gif_filters = sorted({term.lower() for term in gif_filters}, key=len, reverse=True)
+        self.gif_pattern = re.compile("|".join(map(re.escape, gif_filters))) if gif_filters else None
+        self.positive_words = tuple(positive_words.items())
+
+    def match(self, text):
+        content = text.lower()
+        tokens = set(content.split())
+        gif = None
+        if self.gif_pattern and (content.startswith("gif:") or "tenor.com" in content or "giphy.com" in content):
+            found = self.gif_pattern.search(content)
+            gif = found.group(0) if found else None
+        return TermMatch(
+            swears=tokens & self.swear_words,
+            nsfw=tokens & self.nsfw_words,
+            gif=gif,
+            positive=[(word, reward) for word, reward in self.positive_words if word in content]
+        )
+
+def load_term_lists():
+    c.execute("SELECT word FROM nsfw_words")
+    nsfw_words = [row[0] for row in c.fetchall()]
+    c.execute("SELECT filter FROM gif_filters")
+    gif_filters = [row[0] for row in c.fetchall()]
+    return nsfw_words, gif_filters
+
+def load_term_matcher():
+    return TermMatcher(SWEAR_WORDS, *load_term_lists(), POSITIVE_WORDS)
+
+def reload_term_sets(kind=None):
+    # Commands edit this process's sets directly; other processes re-read them when terms_changed arrives
+    if kind in (None, "swear"):
+        SWEAR_WORDS.clear()
+        SWEAR_WORDS.update(load_swear_words())
+    if kind in (None, "positive"):
+        POSITIVE_WORDS.clear()
+        POSITIVE_WORDS.update(load_positive_words())
+
+subscribe("terms_changed", reload_term_sets, remote=True)
+
+# ✅ Shared Term Snapshot
+# With TERM_SNAPSHOT_PATH set, processes on one host share a memory-mapped snapshot of the
+# compiled term lists instead of each compiling its own. Leave it empty for a single process.
+TERM_SNAPSHOT_PATH = os.getenv("TERM_SNAPSHOT_PATH", "")
+
+def write_term_snapshot():
+    # Built from the database rather than this process's sets, which can miss another process's edits
+    nsfw_words, gif_filters = load_term_lists()
+    return termindex.write_snapshot(TERM_SNAPSHOT_PATH, load_swear_words(), nsfw_words, gif_filters, load_positive_words())
+
+def open_term_snapshot():
+    """Map the shared snapshot, writing it from the database first if there isn't a readable one."""
+    try:
+        return termindex.MappedTermMatcher(TERM_SNAPSHOT_PATH)
+    except (FileNotFoundError, ValueError):
+        write_term_snapshot()
+        return termindex.MappedTermMatcher(TERM_SNAPSHOT_PATH)
+
+# Rebuilt whenever a term list changes
+MATCHER = open_term_snapshot() if TERM_SNAPSHOT_PATH else load_term_matcher()
+
+def rebuild_matcher(kind=None):
+    global MATCHER
+    if TERM_SNAPSHOT_PATH:
+        write_term_snapshot()
+        MATCHER = termindex.MappedTermMatcher(TERM_SNAPSHOT_PATH)
+    else:
+        MATCHER = load_term_matcher()
+
+def current_matcher():
+    """The matcher for the next message, remapped first if another process swapped in a new snapshot."""
+    global MATCHER
+    if TERM_SNAPSHOT_PATH and not MATCHER.is_current():
+        try:
+            MATCHER = termindex.MappedTermMatcher(TERM_SNAPSHOT_PATH)
+        except (OSError, ValueError) as e:
+            print(f"Error loading term snapshot: {e}")
+    return MATCHER
+
+subscribe("terms_changed", rebuild_matcher)
+
+# ✅ Moderation Policies
+# Defaults reproduce the original hard-coded behavior; guilds override keys with /set_policy
+DEFAULT_POLICY = {
+    "fine": 10,  # Coins deducted per swear
+    "warn_at_coins": 0,  # A swear leaving the user at or below this balance adds a warning
+    "ladder": [[3, 600]],  # [warnings, mute seconds] steps
+    "reset_warnings_on_mute": True,
+    "warning_decay_hours": 0,  # Hours for one warning to wear off (0 = never)
+    "level2_swears": 5,  # Swear count that makes someone a frequent offender
+    "level2_warnings": 1,
+    "level3_warnings": 2,
+    "toxicity_threshold": 0.0,  # Classifier score that earns a warning (0 = classifier off)
+    "positive_rewards_per_hour": 0  # Rewarded messages per user per hour (0 = unlimited)
+}
+
+c.execute("""
+    CREATE TABLE IF NOT EXISTS moderation_policies (
+        guild_id INTEGER PRIMARY KEY,
+        config TEXT NOT NULL
+    )
+""")
+
+# Warning decay is measured from the most recent warning
+c.execute("PRAGMA table_info(swear_counts)")
+if "last_warning_at" not in {row[1] for row in c.fetchall()}:
+    c.execute("ALTER TABLE swear_counts ADD COLUMN last_warning_at INTEGER")
+conn.commit()
+
+class ModerationPolicy:
+    """A guild's policy compiled into lookup tables, so each offense is a table index."""
+    __slots__ = ("config", "fine", "warn_at_coins", "decay_seconds", "reset_on_mute",
+                 "level2_swears", "toxicity_threshold", "positive_rewards_per_hour", "mute_at", "mute_table", "level_table")
+
+    def __init__(self, config):
+        self.config = config
+        self.fine = config["fine"]
+        self.warn_at_coins = config["warn_at_coins"]
+        self.decay_seconds = int(config["warning_decay_hours"] * 3600)
+        self.reset_on_mute = config["reset_warnings_on_mute"]
+        self.level2_swears = config["level2_swears"]
+        self.toxicity_threshold = config["toxicity_threshold"]
+        self.positive_rewards_per_hour = config["positive_rewards_per_hour"]
+
+        ladder = sorted(tuple(step) for step in config["ladder"])
+        self.mute_at = ladder[0][0] if ladder else 0
+        top = max([warnings for warnings, _ in ladder] + [config["level3_warnings"], 1])
+
+        # mute_table[warnings] -> mute seconds (0 = no mute); the last entry covers everything above
+        self.mute_table = [0] * (top + 1)
+        for warnings, seconds in ladder:
+            for index in range(warnings, top + 1):
+                self.mute_table[index] = seconds
+
+        # level_table[warnings][is_frequent_offender] -> reaction level 1-3
+        self.level_table = []
+        for warnings in range(top + 1):
+            if warnings >= config["level3_warnings"]:
+                level = 3
+            elif warnings >= config["level2_warnings"]:
+                level = 2
+            else:
+                level = 1
+            self.level_table.append((level, max(level, 2)))
+
+    def warning_progress(self, warnings):
+        """"3/5" towards the first mute, or just "3" when the ladder has no mutes."""
+        return f"{warnings}/{self.mute_at}" if self.mute_at else str(warnings)
+
+    def mute_seconds(self, warnings):
+        return self.mute_table[min(warnings, len(self.mute_table) - 1)]
+
+    def level(self, warnings, swear_count):
+        return self.level_table[min(warnings, len(self.level_table) - 1)][swear_count >= self.level2_swears]
+
+    def decay(self, warnings, last_warning_at, now):
+        """Apply warning decay lazily. Returns (warnings, last_warning_at)."""
+        if not self.decay_seconds or not warnings or not last_warning_at:
+            return warnings, last_warning_at
+        decayed = (now - last_warning_at) // self.decay_seconds
+        if decayed <= 0:
+            return warnings, last_warning_at
+        return max(0, warnings - decayed), last_warning_at + decayed * self.decay_seconds
+
+POLICY_CACHE = {}
+
+def get_policy(guild_id):
+    if guild_id not in POLICY_CACHE:
+        config = dict(DEFAULT_POLICY)
+        if guild_id is not None:
+            c.execute("SELECT config FROM moderation_policies WHERE guild_id = ?", (guild_id,))
+            result = c.fetchone()
+            if result:
+                config.update(json.loads(result[0]))
+        POLICY_CACHE[guild_id] = ModerationPolicy(config)
+    return POLICY_CACHE[guild_id]
+
+def save_policy(guild_id, overrides):
+    """Store a guild's overrides and recompile its policy. Raises ValueError if invalid."""
+    policy = ModerationPolicy({**DEFAULT_POLICY, **overrides})
+    if overrides:
+        c.execute("REPLACE INTO moderation_policies (guild_id, config) VALUES (?, ?)", (guild_id, json.dumps(overrides)))
+    else:
+        c.execute("DELETE FROM moderation_policies WHERE guild_id = ?", (guild_id,))
+    conn.commit()
+    POLICY_CACHE[guild_id] = policy
+    publish("policy_changed", guild_id=guild_id)
+    return policy
+
+def forget_policy(guild_id):
+    POLICY_CACHE.pop(guild_id, None)
+
+subscribe("policy_changed", forget_policy, remote=True)
+
+def parse_policy_value(key, raw):
+    """Convert a /set_policy value to the type of the matching default."""
+    default = DEFAULT_POLICY[key]
+    raw = raw.strip().lower()
+    if isinstance(default, bool):
+        if raw in ("true", "yes", "on", "1"):
+            return True
+        if raw in ("false", "no", "off", "0"):
+            return False
+        raise ValueError("Use true or false.")
+    if key == "ladder":
+        # e.g. "3:600, 5:3600" -> mute 10 minutes at 3 warnings, 1 hour at 5
+        steps = []
+        for step in filter(None, (part.strip() for part in raw.split(","))):
+            warnings, _, seconds = step.partition(":")
+            steps.append([int(warnings), int(seconds)])
+        if any(warnings < 1 or seconds < 0 for warnings, seconds in steps):
+            raise ValueError("Ladder steps need at least 1 warning and a non-negative duration.")
+        return steps
+    value = float(raw) if isinstance(default, float) or key == "warning_decay_hours" else int(raw)
+    if value < 0:
+        raise ValueError("Value can't be negative.")
+    if key == "toxicity_threshold" and value >= 1:
+        raise ValueError("Use a score between 0 and 1 (0 turns the classifier off).")
+    return value
+
+# ✅ Toxicity Classifier
+# Optional hashed n-gram model trained with /train_classifier. Messages that arrive within
+# CLASSIFIER_BATCH_MS of each other are scored together on a worker thread.
+CLASSIFIER_PATH = os.getenv("CLASSIFIER_PATH", "classifier.npz")
+CLASSIFIER_BATCH_WINDOW = float(os.getenv("CLASSIFIER_BATCH_MS", "5")) / 1000
+CLASSIFIER_MAX_BATCH = 64  # Score immediately once this many messages are waiting
+CLASSIFIER_MAX_PENDING = 1000  # Messages past this backlog go unscored, so a flood can't grow memory
+CLASSIFIER_MIN_LABELS = 10  # Labeled messages of each kind needed before training
+CLASSIFIER_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="classifier")
+
+c.execute("""
+    CREATE TABLE IF NOT EXISTS labeled_messages (
+        message_id INTEGER PRIMARY KEY,
+        guild_id INTEGER,
+        content TEXT NOT NULL,
+        label INTEGER NOT NULL,
+        labeled_by INTEGER,
+        labeled_at INTEGER NOT NULL
+    )
+""")
+conn.commit()
+
+def load_classifier():
+    try:
+        return classifier.HashedNgramModel.load(CLASSIFIER_PATH)
+    except FileNotFoundError:
+        return None
+    except (RuntimeError, OSError, KeyError, ValueError) as e:
+        print(f"⚠️ Toxicity classifier not loaded: {e}")
+        return None
+
+# Replaced by /train_classifier
+CLASSIFIER_MODEL = load_classifier()
+
+class MicroBatcher:
+    """Collects texts scored within `window` seconds and scores them with one predict_proba call."""
+
+    def __init__(self, window, max_batch, max_pending):
+        self.window = window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.pending = []  # (text, future) not yet sent to the worker
+        self.in_flight = 0
+        self.flush_handle = None
+        self.stats = collections.Counter()
+
+    async def score(self, model, text):
+        """The model's score for `text`, or None if the backlog is full or scoring failed."""
+        if len(self.pending) + self.in_flight >= self.max_pending:
+            self.stats["dropped"] += 1
+            return None
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((text, future))
+        if len(self.pending) >= self.max_batch:
+            self.flush(model)
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.window, self.flush, model)
+        return await future
+
+    def flush(self, model):
+        if self.flush_handle:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        batch, self.pending = self.pending, []
+        if batch:
+            self.in_flight += len(batch)
+            asyncio.create_task(self.run(model, batch))
+
+    async def run(self, model, batch):
+        try:
+            scores = await asyncio.get_running_loop().run_in_executor(
+                CLASSIFIER_EXECUTOR, model.predict_proba, [text for text, _ in batch])
+        except Exception as e:
+            print(f"Error scoring messages: {e}")
+            scores = [None] * len(batch)
+        finally:
+            self.in_flight -= len(batch)
+        self.stats["batches"] += 1
+        self.stats["messages"] += len(batch)
+        for (_, future), score in zip(batch, scores):
+            if not future.done():
+                future.set_result(None if score is None else float(score))
+
+CLASSIFIER_BATCHER = MicroBatcher(CLASSIFIER_BATCH_WINDOW, CLASSIFIER_MAX_BATCH, CLASSIFIER_MAX_PENDING)
+
+async def classify_message(message, matches, policy):
+    """Add the classifier's score to `matches` when it reaches the guild's toxicity_threshold."""
+    if CLASSIFIER_MODEL is None or not policy.toxicity_threshold or not message.content:
+        return matches
+    score = await CLASSIFIER_BATCHER.score(CLASSIFIER_MODEL, message.content)
+    if score is not None and score >= policy.toxicity_threshold:
+        return matches._replace(toxicity=score)
+    return matches
+
+def fit_classifier(holdout=0.2):
+    """Train on every labeled message, keeping `holdout` of them back for evaluation. Runs on a worker thread."""
+    # The bot's connection belongs to the event loop thread, so training reads through its own
+    training_conn = sqlite3.connect(DB_PATH)
+    try:
+        rows = training_conn.execute("SELECT content, label FROM labeled_messages ORDER BY message_id").fetchall()
+    finally:
+        training_conn.close()
+    texts = [content for content, _ in rows]
+    labels = [label for _, label in rows]
+    # Every n-th message is held out, so both kinds of label end up in the evaluation set
+    held = set(range(0, len(rows), round(1 / holdout))) if holdout else set()
+    train = [i for i in range(len(rows)) if i not in held]
+    model = classifier.HashedNgramModel.new().fit([texts[i] for i in train], [labels[i] for i in train])
+    metrics = model.evaluate([texts[i] for i in held], [labels[i] for i in held]) if held else {}
+    model.save(CLASSIFIER_PATH)
+    return model, metrics, len(train)
+
+# ✅ Per-message User State
+USER_CACHE_MAX_MB = float(os.getenv("USER_CACHE_MAX_MB", "32"))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "900"))  # Seconds before a cached user is re-read
+
+class UserState:
+    """A user's swear_counts row plus their swear pass, shared by every branch of on_message."""
+    __slots__ = ("user_id", "count", "coins", "warnings", "last_warning_at", "swear_pass", "exists", "dirty", "expires_at", "saved")
+
+    def __init__(self, user_id, count=0, coins=STARTING_COINS, warnings=0, last_warning_at=None, exists=False):
+        self.user_id = user_id
+        self.count = count
+        self.coins = coins
+        self.warnings = warnings
+        self.last_warning_at = last_warning_at
+        self.swear_pass = False
+        self.exists = exists
+        self.dirty = False
+        self.expires_at = 0.0
+        self.saved = (count, coins, warnings)  # As last read from or written to the database
+
+    def add_warning(self, now):
+        self.warnings += 1
+        self.last_warning_at = now
+        self.dirty = True
+        return self.warnings
+
+class UserStateCache:
+    """LRU cache of hot users' state with a TTL and a memory cap.
+
+    save_user_state writes through it; anything else that writes swear_counts
+    or a swear pass must invalidate the user (or clear the cache for bulk changes).
+    Invalidating also tells the other processes to drop their copy.
+    """
+
+    def __init__(self, max_bytes, ttl):
+        self.entries = collections.OrderedDict()
+        self.ttl = ttl
+        # A slotted record, its int fields and the OrderedDict node holding it
+        self.entry_bytes = sys.getsizeof(UserState(2 ** 40)) + 4 * sys.getsizeof(2 ** 40) + 100
+        self.max_entries = max(1, int(max_bytes // self.entry_bytes))
+        self.stats = collections.Counter()
+
+    def get(self, user_id):
+        state = self.entries.get(user_id)
+        if state is None:
+            self.stats["misses"] += 1
+            return None
+        if state.expires_at <= time.monotonic():
+            del self.entries[user_id]
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return None
+        self.entries.move_to_end(user_id)
+        self.stats["hits"] += 1
+        return state
+
+    def put(self, state):
+        state.expires_at = time.monotonic() + self.ttl
+        self.entries[state.user_id] = state
+        self.entries.move_to_end(state.user_id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def invalidate(self, user_id, notify=True):
+        if self.entries.pop(user_id, None) is not None:
+            self.stats["invalidations"] += 1
+        if notify:
+            broadcast("user_changed", user_id=user_id)
+
+    def clear(self, notify=True):
+        self.stats["invalidations"] += len(self.entries)
+        self.entries.clear()
+        if notify:
+            broadcast("users_changed")
+
+USER_STATES = UserStateCache(USER_CACHE_MAX_MB * 1024 * 1024, USER_CACHE_TTL)
+
+def forget_user(user_id):
+    USER_STATES.invalidate(user_id, notify=False)
+
+def forget_users():
+    USER_STATES.clear(notify=False)
+
+subscribe("user_changed", forget_user, remote=True)
+subscribe("users_changed", forget_users, remote=True)
+
+async def load_user_state(user_id, policy):
+    """Return a user's state with warning decay applied, from the cache when possible."""
+    state = USER_STATES.get(user_id)
+    # A dirty state is still being changed by another handler, or was left unsaved by one that failed
+    if state is None or state.dirty:
+        c.execute("SELECT count, coins, warnings, last_warning_at FROM swear_counts WHERE user_id = ?", (user_id,))
+        result = c.fetchone()
+        state = UserState(user_id, *result, exists=True) if result else UserState(user_id)
+        state.swear_pass = await store.get_setting(f"swear_pass_{user_id}") == "true"
+        USER_STATES.put(state)
+
+    state.warnings, state.last_warning_at = policy.decay(state.warnings, state.last_warning_at, int(time.time()))
+    return state
+
+def save_user_state(state):
+    """Write a changed UserState back in one statement and keep it cached. The caller commits.
+
+    Only the changes since the state was loaded are applied, so a balance another command wrote in the
+    meantime isn't overwritten. The state is then refreshed with the stored values.
+    """
+    if not state.dirty:
+        return
+    saved_count, saved_coins, saved_warnings = state.saved
+    c.execute("""
+        INSERT INTO swear_counts (user_id, count, coins, warnings, last_warning_at) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            count = count + ?, coins = MAX(0, coins + ?),
+            warnings = MAX(0, warnings + ?), last_warning_at = excluded.last_warning_at
+        RETURNING count, coins, warnings
+    """, (state.user_id, state.count, state.coins, state.warnings, state.last_warning_at,
+          state.count - saved_count, state.coins - saved_coins, state.warnings - saved_warnings))
+    state.count, state.coins, state.warnings = state.saved = c.fetchone()
+    state.exists = True
+    state.dirty = False
+    USER_STATES.put(state)
+    broadcast("user_changed", user_id=state.user_id)
+
+# Get user's moderation level (1-4) based on warning count and behavior
+def get_user_moderation_level(state, policy):
+    if not state.exists:
+        return 1  # Default level for new users
+
+    return policy.level(state.warnings, state.count)
+
+# ✅ Channel Modes
+# full: normal enforcement. tally: swears and positive words are counted silently and settled
+# in bulk with one summary per flush. sample: only a fraction of messages are checked.
+# NSFW and GIF filters are always enforced in full, whatever the mode.
+CHANNEL_MODE_NAMES = ("full", "tally", "sample")
+TALLY_SUMMARY_MINUTES = float(os.getenv("TALLY_SUMMARY_MINUTES", "10"))
+
+c.execute("""
+    CREATE TABLE IF NOT EXISTS channel_modes (
+        channel_id INTEGER PRIMARY KEY,
+        guild_id INTEGER,
+        mode TEXT NOT NULL,
+        sample_rate REAL DEFAULT 1.0
+    )
+""")
+conn.commit()
+
+def load_channel_modes():
+    c.execute("SELECT channel_id, mode, sample_rate FROM channel_modes")
+    return {channel_id: (mode, sample_rate) for channel_id, mode, sample_rate in c.fetchall()}
+
+# channel_id -> (mode, sample_rate); channels without an entry are in full mode
+CHANNEL_MODES = load_channel_modes()
+
+def reload_channel_modes():
+    CHANNEL_MODES.clear()
+    CHANNEL_MODES.update(load_channel_modes())
+
+subscribe("channel_modes_changed", reload_channel_modes, remote=True)
+
+# channel_id -> {"guild_id": ..., "users": {user_id: [swears, reward]}}
+TALLY_BUFFER = {}
+
+def tally_message(message, matches):
+    """Count a tally-mode message's swears and positive words. Returns what still needs full handling."""
+    if matches.swears or matches.positive:
+        tally = TALLY_BUFFER.setdefault(message.channel.id, {
+            "guild_id": message.guild.id if message.guild else None,
+            "channel": message.channel,
+            "users": {}
+        })
+        counts = tally["users"].setdefault(message.author.id, [0, 0])
+        counts[0] += bool(matches.swears)
+        counts[1] += sum(reward for _, reward in matches.positive)
+    return TermMatch(swears=set(), nsfw=matches.nsfw, gif=matches.gif, positive=[], toxicity=matches.toxicity)
+
+def settle_tallies():
+    """Apply every buffered tally in bulk. Returns [(channel, users, swears, coins_fined, coins_rewarded)]."""
+    if not TALLY_BUFFER:
+        return []
+    tallies = list(TALLY_BUFFER.values())
+    TALLY_BUFFER.clear()
+
+    summaries = []
+    for tally in tallies:
+        policy = get_policy(tally["guild_id"])
+        users = tally["users"]
+        user_ids = list(users)
+        placeholders = ",".join("?" * len(user_ids))
+        c.execute(f"SELECT user_id, coins FROM swear_counts WHERE user_id IN ({placeholders})", user_ids)
+        balances = dict(c.fetchall())
+
+        rows = []
+        fined = rewarded = swears = 0
+        for user_id, (user_swears, reward) in users.items():
+            coins = balances.get(user_id, STARTING_COINS)
+            after_fines = max(0, coins - user_swears * policy.fine)
+            if after_fines != coins:
+                record_transaction(user_id, after_fines - coins, "swear_fine", f"tally:{tally['channel'].id}")
+            if user_swears:
+                log_moderation_event(tally["guild_id"], user_id, "fine", "tally",
+                                     f"-{coins - after_fines} coins for {user_swears} swears", tally["channel"].id)
+            if reward:
+                record_transaction(user_id, reward, "positive_word", f"tally:{tally['channel'].id}")
+            rows.append((user_id, user_swears, after_fines + reward))
+            fined += coins - after_fines
+            rewarded += reward
+            swears += user_swears
+            USER_STATES.invalidate(user_id)
+
+        c.executemany("""
+            INSERT INTO swear_counts (user_id, count, coins) VALUES (?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET count = count + excluded.count, coins = excluded.coins
+        """, rows)
+        summaries.append((tally["channel"], len(users), swears, fined, rewarded))
+    conn.commit()
+    return summaries
+
+@tasks.loop(minutes=TALLY_SUMMARY_MINUTES)
+async def tally_flush_task():
+    for channel, users, swears, fined, rewarded in settle_tallies():
+        if not swears and not rewarded:
+            continue
+        try:
+            await channel.send(f"🧾 Swear jar summary for the last {TALLY_SUMMARY_MINUTES:g} minutes: "
+                               f"{swears} swears from {users} users (-{fined} coins), {rewarded} coins earned from positive words.")
+        except discord.HTTPException as e:
+            print(f"Error posting tally summary: {e}")
+
+# ✅ History Scanner
+SCAN_CONCURRENCY = 3  # Channels scanned at the same time
+SCAN_PAGE_SIZE = 100  # Messages per history request (Discord's maximum)
+SCAN_PAGE_DELAY = 1.0  # Seconds between pages in a channel, to stay well inside rate limits
+SCAN_JOB = {}  # "task" -> the running scan
+
+# Where each channel's scan stopped, kept separately for report-only and penalizing scans
+c.execute("""
+    CREATE TABLE IF NOT EXISTS scan_checkpoints (
+        channel_id INTEGER NOT NULL,
+        mode TEXT NOT NULL,
+        last_message_id INTEGER NOT NULL,
+        scanned INTEGER DEFAULT 0,
+        flagged INTEGER DEFAULT 0,
+        updated_at INTEGER,
+        PRIMARY KEY (channel_id, mode)
+    )
+""")
+conn.commit()
+
+async def apply_history_penalties(message, matches, policy, now):
+    """Fine and warn for an old message. Nothing is deleted and nobody is muted after the fact."""
+    state = await load_user_state(message.author.id, policy)
+    if matches.swears:
+        old_coins = state.coins
+        state.count += 1
+        state.coins = max(0, state.coins - policy.fine)
+        state.dirty = True
+        record_transaction(state.user_id, state.coins - old_coins, "swear_fine", f"scan:{message.id}")
+        log_message_event(message, "fine", "history_scan", f"-{old_coins - state.coins} coins for {', '.join(sorted(matches.swears))}")
+    if matches.nsfw or matches.gif:
+        warnings = state.add_warning(now)
+        log_message_event(message, "warning", "history_scan", f"warning {policy.warning_progress(warnings)} for {'NSFW content' if matches.nsfw else 'a filtered GIF'}")
+    save_user_state(state)
+
+async def scan_channel(channel, mode, max_messages, report, semaphore):
+    async with semaphore:
+        c.execute("SELECT last_message_id FROM scan_checkpoints WHERE channel_id = ? AND mode = ?", (channel.id, mode))
+        result = c.fetchone()
+        after = discord.Object(id=result[0]) if result else None
+        policy = get_policy(channel.guild.id)
+        remaining = max_messages
+
+        while remaining > 0:
+            try:
+                page = [message async for message in channel.history(limit=min(SCAN_PAGE_SIZE, remaining), after=after, oldest_first=True)]
+            except discord.HTTPException as e:
+                # No access, a deleted channel or a Discord error: note it and let the other channels finish
+                if not isinstance(e, discord.Forbidden):
+                    print(f"Error scanning {channel}: {e}")
+                report["skipped"].append(channel.mention)
+                return
+            if not page:
+                break
+
+            now = int(time.time())
+            flagged = 0
+            # Messages that were already fined or warned (live, or by an earlier scan) aren't penalized again
+            moderated = moderated_message_ids([message.id for message in page]) if mode == "penalize" else set()
+            for message in page:
+                if message.author.bot:
+                    continue
+                matches = current_matcher().match(message.content)
+                if not (matches.swears or matches.nsfw or matches.gif):
+                    continue
+                flagged += 1
+                report["users"][message.author.id] += 1
+                report["terms"].update(matches.swears | matches.nsfw | ({matches.gif} if matches.gif else set()))
+                if mode == "penalize" and message.id not in moderated:
+                    await apply_history_penalties(message, matches, policy, now)
+                    report["penalized"] += 1
+
+            # Checkpoint after every page so an interrupted scan resumes where it stopped
+            after = page[-1]
+            c.execute("""
+                INSERT INTO scan_checkpoints (channel_id, mode, last_message_id, scanned, flagged, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(channel_id, mode) DO UPDATE SET
+                    last_message_id = excluded.last_message_id,
+                    scanned = scanned + excluded.scanned,
+                    flagged = flagged + excluded.flagged,
+                    updated_at = excluded.updated_at
+            """, (channel.id, mode, after.id, len(page), flagged, now))
+            conn.commit()
+
+            report["scanned"] += len(page)
+            report["flagged"] += flagged
+            report["channels"][channel.mention] += flagged
+            remaining -= len(page)
+            await asyncio.sleep(SCAN_PAGE_DELAY)
+
+async def run_history_scan(interaction, channels, mode, max_messages):
+    report = {
+        "scanned": 0,
+        "flagged": 0,
+        "penalized": 0,
+        "users": collections.Counter(),
+        "terms": collections.Counter(),
+        "channels": collections.Counter(),
+        "skipped": []
+    }
+    started = time.monotonic()
+    semaphore = asyncio.Semaphore(SCAN_CONCURRENCY)
+    try:
+        await asyncio.gather(*(scan_channel(channel, mode, max_messages, report, semaphore) for channel in channels))
+    finally:
+        flush_ledger()
+
+    embed = discord.Embed(
+        title="🔎 History Scan Complete",
+        description=f"Scanned {report['scanned']:,} messages in {len(channels)} channels in {format_duration(time.monotonic() - started)}. "
+                    f"{report['flagged']:,} contained filtered terms" +
+                    (f"; {report['penalized']:,} not already moderated were penalized." if mode == "penalize" else "."),
+        color=0xFF9900 if report["flagged"] else 0x00FF00
+    )
+    if report["users"]:
+        embed.add_field(name="Top Users", value="\n".join(f"<@{user_id}>: {count}" for user_id, count in report["users"].most_common(10)), inline=True)
+        embed.add_field(name="Top Terms", value="\n".join(f"`{term}`: {count}" for term, count in report["terms"].most_common(10)), inline=True)
+        embed.add_field(name="Channels", value="\n".join(f"{channel}: {count}" for channel, count in report["channels"].most_common(10) if count), inline=True)
+    if report["skipped"]:
+        embed.add_field(name="Skipped (no access or errors)", value=", ".join(report["skipped"][:20]), inline=False)
+    await interaction.channel.send(embed=embed)
+
+# ✅ Cogs
+# Loaded by bot.py at startup and reloadable one at a time with /reload
+COGS = ("economy", "shop", "moderation", "filters", "admin")
+
+def command_payloads():
+    return {command.name: command.to_dict() for command in bot.tree.get_commands()}
+
+async def sync_changed_commands(before):
+    """Push only the commands that changed since `before` was taken, instead of a full tree.sync()."""
+    after = command_payloads()
+    changed = [name for name, payload in after.items() if before.get(name) != payload]
+    removed = [name for name in before if name not in after]
+
+    for name in changed:
+        await bot.http.upsert_global_command(bot.application_id, after[name])
+    if removed:
+        registered = {command.name: command.id for command in await bot.tree.fetch_commands()}
+        for name in removed:
+            if name in registered:
+                await bot.http.delete_global_command(bot.application_id, registered[name])
+    return changed, removed
+
+# ✅ Memory Profiling
+# MEMORY_TRACE_FRAMES > 0 starts tracemalloc at launch; admins can also toggle it with /memory
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", "0"))
+MEMORY_SNAPSHOT_MINUTES = float(os.getenv("MEMORY_SNAPSHOT_MINUTES", "10"))
+MEMORY_TOP_SITES = 10
+MEMORY_STATS = {"top": [], "taken_at": None}  # Last snapshot's top allocation sites as (file:line, bytes, blocks)
+
+if MEMORY_TRACE_FRAMES > 0:
+    tracemalloc.start(MEMORY_TRACE_FRAMES)
+
+def container_bytes(obj):
+    """Shallow size of a container plus its items (keys and values for dicts)."""
+    size = sys.getsizeof(obj)
+    items = obj.items() if isinstance(obj, dict) else obj
+    for item in items:
+        if isinstance(item, tuple):
+            size += sum(sys.getsizeof(part) for part in item)
+        else:
+            size += sys.getsizeof(item)
+    return size
+
+def bot_cache_sizes():
+    """Return [(name, entries, approximate bytes or None)] for the bot's own and discord.py's caches."""
+    return [
+        ("Swear words", len(SWEAR_WORDS), container_bytes(SWEAR_WORDS)),
+        ("Positive words", len(POSITIVE_WORDS), container_bytes(POSITIVE_WORDS)),
+        ("User states", len(USER_STATES.entries), len(USER_STATES.entries) * USER_STATES.entry_bytes),
+        ("Cached replies", len(RESPONSE_CACHE), container_bytes(RESPONSE_CACHE)),
+        ("Recent deliveries", len(RECENT_DELIVERIES), container_bytes(RECENT_DELIVERIES.current) + container_bytes(RECENT_DELIVERIES.previous)),
+        ("Ledger buffer", len(LEDGER_BUFFER), container_bytes(LEDGER_BUFFER)),
+        ("Tally buffer", sum(len(tally["users"]) for tally in TALLY_BUFFER.values()), None),
+        ("Messages", len(bot.cached_messages), None),
+        ("Members", sum(len(guild.members) for guild in bot.guilds), None),
+        ("Users", len(bot.users), None),
+    ]
+
+def take_memory_snapshot():
+    """Record the top allocation sites from a tracemalloc snapshot. Returns False if tracing is off."""
+    if not tracemalloc.is_tracing():
+        return False
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+    MEMORY_STATS["top"] = [
+        (f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}", stat.size, stat.count)
+        for stat in snapshot.statistics("lineno")[:MEMORY_TOP_SITES]
+    ]
+    MEMORY_STATS["taken_at"] = int(time.time())
+    return True
+
+@tasks.loop(minutes=MEMORY_SNAPSHOT_MINUTES)
+async def memory_snapshot_task():
+    take_memory_snapshot()
+
+# ✅ Health Server
+# Runs on the bot's own event loop, so a stalled loop also stops answering health checks
+HEALTH_PORT = int(os.getenv("PORT", "5000"))
+LOOP_LAG_LIMIT = 5.0  # Seconds of event loop lag before /healthz reports unhealthy
+LOOP_STATS = {"lag": 0.0, "last_tick": time.monotonic()}
+CACHES_WARM = {"ready": False}
+
+@tasks.loop(seconds=1)
+async def loop_monitor_task():
+    # The tick should arrive every second; anything beyond that is time the loop was blocked
+    now = time.monotonic()
+    LOOP_STATS["lag"] = max(0.0, now - LOOP_STATS["last_tick"] - 1.0)
+    LOOP_STATS["last_tick"] = now
+
+async def healthz(request):
+    lag = max(LOOP_STATS["lag"], time.monotonic() - LOOP_STATS["last_tick"] - 1.0)
+    healthy = lag < LOOP_LAG_LIMIT
+    return web.json_response({"status": "ok" if healthy else "stalled", "loop_lag": round(lag, 3)}, status=200 if healthy else 503)
+
+async def readyz(request):
+    try:
+        conn.execute("SELECT 1").fetchone()
+        database = True
+    except sqlite3.Error:
+        database = False
+    checks = {
+        "gateway": bot.is_ready() and not bot.is_closed(),
+        "database": database,
+        "caches": CACHES_WARM["ready"]
+    }
+    ready = all(checks.values())
+    return web.json_response({"status": "ready" if ready else "not ready", "checks": checks}, status=200 if ready else 503)
+
+def render_metrics():
+    """Prometheus text exposition of the bot's gauges and counters."""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP swearjar_{name} {help_text}")
+        lines.append(f"# TYPE swearjar_{name} {kind}")
+        for labels, value in samples:
+            label_text = "{" + ",".join(f'{key}="{label}"' for key, label in labels.items()) + "}" if labels else ""
+            lines.append(f"swearjar_{name}{label_text} {value}")
+
+    latency = bot.latency if bot.latency == bot.latency and bot.latency != float("inf") else 0.0
+    metric("up", "gauge", "1 if the gateway is connected.", [({}, int(bot.is_ready() and not bot.is_closed()))])
+    metric("gateway_latency_seconds", "gauge", "Gateway heartbeat latency.", [({}, round(latency, 4))])
+    metric("loop_lag_seconds", "gauge", "Event loop lag measured by the loop monitor.", [({}, round(LOOP_STATS["lag"], 4))])
+    metric("guilds", "gauge", "Guilds the bot is in.", [({}, len(bot.guilds))])
+    metric("user_cache_entries", "gauge", "Users held in the user state cache.", [({}, len(USER_STATES.entries))])
+    metric("user_cache_events_total", "counter", "User state cache lookups and removals by outcome.",
+           [({"event": event}, USER_STATES.stats[event]) for event in ("hits", "misses", "evictions", "expirations", "invalidations")])
+    metric("response_cache_events_total", "counter", "Cached command replies by outcome.",
+           [({"command": command, "event": event}, stats[event])
+            for command, stats in sorted(RESPONSE_CACHE_STATS.items()) for event in ("hits", "misses", "invalidations")])
+    metric("command_latency_seconds", "gauge", "Moving average of each command's run time.",
+           [({"command": command}, round(seconds, 4)) for command, seconds in sorted(COMMAND_LATENCY.items())])
+    metric("ledger_buffer_entries", "gauge", "Ledger entries waiting to be flushed.", [({}, len(LEDGER_BUFFER))])
+    metric("moderation_event_buffer_entries", "gauge", "Moderation events waiting to be flushed.", [({}, len(MODERATION_EVENT_BUFFER))])
+    metric("activity_buffer_entries", "gauge", "Activity rollup keys waiting to be flushed.", [({}, len(ACTIVITY_BUFFER))])
+    if TERM_SNAPSHOT_PATH:
+        metric("term_snapshot_version", "gauge", "Version of the mapped term snapshot.", [({}, MATCHER.version)])
+    metric("tally_channels", "gauge", "Tally-mode channels with unsettled counts.", [({}, len(TALLY_BUFFER))])
+    metric("scheduled_unmutes", "gauge", "Mutes waiting to be lifted.", [({}, len(SCHEDULED_UNMUTES))])
+    metric("duplicate_deliveries_total", "counter", "Messages, edits and interactions dropped as redeliveries.",
+           [({}, RECENT_DELIVERIES.duplicates)])
+    metric("cache_entries", "gauge", "Entries held in each of the bot's caches.",
+           [({"cache": name}, entries) for name, entries, _ in bot_cache_sizes()])
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        metric("traced_memory_bytes", "gauge", "Memory allocated by Python as traced by tracemalloc.",
+               [({"kind": "current"}, current), ({"kind": "peak"}, peak)])
+    metric("allocation_site_bytes", "gauge", "Top allocation sites in the last tracemalloc snapshot.",
+           [({"site": site}, size) for site, size, _ in MEMORY_STATS["top"]])
+    return "\n".join(lines) + "\n"
+
+async def metrics(request):
+    return web.Response(text=render_metrics(), content_type="text/plain", charset="utf-8")
+
+async def start_health_server():
+    app = web.Application()
+    app.router.add_get("/", healthz)
+    app.router.add_get("/healthz", healthz)
+    app.router.add_get("/readyz", readyz)
+    app.router.add_get("/metrics", metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", HEALTH_PORT).start()
+    print(f"✅ Health server started on port {HEALTH_PORT}")
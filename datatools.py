@@ -0,0 +1,411 @@
+"""Streaming export/import of the swear jar database.
+
+Usable from the bot (see /export_data and /import_data) or from the command line:
+
+    python datatools.py export --format jsonl --out swearjar.jsonl
+    python datatools.py export --format csv --table swear_counts --out swear_counts.csv
+    python datatools.py import swearjar.jsonl
+    python datatools.py backup
+    python datatools.py restore backups/swearjar-20250101-120000.db.gz
+    python datatools.py report --format html --out report.html
+"""
+import argparse
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+
+import analytics
+
+DB_PATH = os.getenv("SWEARJAR_DB", "swearjar.db")
+
+# Tables that make up the bot's state, in an order that's safe to import
+EXPORT_TABLES = [
+    "settings",
+    "moderation_settings",
+    "swear_words",
+    "positive_words",
+    "nsfw_words",
+    "gif_filters",
+    "warning_messages",
+    "shop_items",
+    "swear_counts",
+    "user_inventory",
+    "shop_purchases",
+    "ledger",
+    "balance_snapshots",
+]
+
+CHUNK_SIZE = 500
+
+BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
+BACKUP_RETENTION = int(os.getenv("BACKUP_RETENTION", "10"))  # Full backups to keep
+BACKUP_PAGES = 256  # Pages copied per backup step
+BACKUP_STEP_SLEEP = 0.05  # Seconds to pause between steps so writers get the lock back
+
+# Append-only tables whose new rows are exported between full backups
+INCREMENTAL_TABLES = ["ledger", "shop_purchases"]
+INCREMENTAL_STATE = "incremental_state.json"
+
+
+def table_columns(conn, table):
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def iter_rows(conn, table, chunk_size=CHUNK_SIZE):
+    """Yield a table's rows in fixed-size chunks, never holding the whole table."""
+    table_columns(conn, table)
+    cursor = conn.execute(f"SELECT * FROM {table}")
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield rows
+
+
+def iter_jsonl(conn, tables=EXPORT_TABLES, chunk_size=CHUNK_SIZE):
+    """Yield one JSON line per row: {"table": ..., "row": {...}}."""
+    for table in tables:
+        columns = table_columns(conn, table)
+        for rows in iter_rows(conn, table, chunk_size):
+            for row in rows:
+                yield json.dumps({"table": table, "row": dict(zip(columns, row))}, ensure_ascii=False) + "\n"
+
+
+def iter_csv(conn, table, chunk_size=CHUNK_SIZE):
+    """Yield a single table as CSV text, header first, one chunk at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(table_columns(conn, table))
+    for rows in iter_rows(conn, table, chunk_size):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_to_file(conn, path, fmt="jsonl", table=None, chunk_size=CHUNK_SIZE):
+    if fmt == "csv":
+        if not table:
+            raise ValueError("CSV exports need a single table")
+        chunks = iter_csv(conn, table, chunk_size)
+    else:
+        chunks = iter_jsonl(conn, [table] if table else EXPORT_TABLES, chunk_size)
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def _insert_chunks(conn, table, columns, rows_iter, chunk_size):
+    known = set(table_columns(conn, table))
+    unknown = [column for column in columns if column not in known]
+    if unknown:
+        raise ValueError(f"Unknown columns for {table}: {', '.join(unknown)}")
+
+    sql = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+    count = 0
+    chunk = []
+    for row in rows_iter:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            conn.executemany(sql, chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        conn.executemany(sql, chunk)
+        count += len(chunk)
+    return count
+
+
+def import_jsonl(conn, lines, chunk_size=CHUNK_SIZE):
+    """Bulk insert JSONL rows inside one transaction. Returns row counts per table."""
+    counts = {}
+    chunk = []
+    chunk_key = None
+
+    def flush():
+        if chunk:
+            table, columns = chunk_key
+            counts[table] = counts.get(table, 0) + _insert_chunks(conn, table, list(columns), chunk, chunk_size)
+            chunk.clear()
+
+    try:
+        for line in lines:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            row = record["row"]
+            key = (record["table"], tuple(row))
+            if key != chunk_key or len(chunk) >= chunk_size:
+                flush()
+                chunk_key = key
+            chunk.append(tuple(row.values()))
+        flush()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return counts
+
+
+def import_csv(conn, lines, table, chunk_size=CHUNK_SIZE):
+    """Bulk insert a single-table CSV (header row first) inside one transaction."""
+    reader = csv.reader(lines)
+    columns = next(reader, None)
+    if not columns:
+        return {table: 0}
+
+    try:
+        rows = (tuple(value if value != "" else None for value in row) for row in reader)
+        count = _insert_chunks(conn, table, columns, rows, chunk_size)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return {table: count}
+
+
+def import_from_file(conn, path, fmt="jsonl", table=None, chunk_size=CHUNK_SIZE):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            if not table:
+                raise ValueError("CSV imports need a single table")
+            return import_csv(conn, f, table, chunk_size)
+        return import_jsonl(conn, f, chunk_size)
+
+
+# ✅ Backups
+def _timestamp():
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%d-%H%M%S")
+
+
+def _max_ids(conn):
+    return {table: conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0] for table in INCREMENTAL_TABLES}
+
+
+def _save_incremental_state(backup_dir, state):
+    with open(os.path.join(backup_dir, INCREMENTAL_STATE), "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+
+def create_backup(db_path=DB_PATH, backup_dir=BACKUP_DIR, pages=BACKUP_PAGES, step_sleep=BACKUP_STEP_SLEEP, compress=True):
+    """Copy a live database with SQLite's online backup API and return size/duration stats.
+
+    Opens its own connections, so it can run in a worker thread next to the bot.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    started = time.monotonic()
+    name = f"swearjar-{_timestamp()}.db"
+    raw_path = os.path.join(backup_dir, name + ".tmp")
+
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(raw_path)
+    try:
+        # backup()'s own sleep= only applies while the source is busy, so pause after each step here
+        def pause(status, remaining, total):
+            if remaining:
+                time.sleep(step_sleep)
+
+        source.backup(target, pages=pages, progress=pause)
+        # Incremental exports continue from what this snapshot already contains
+        state = _max_ids(target)
+    finally:
+        target.close()
+        source.close()
+
+    db_size = os.path.getsize(raw_path)
+    if compress:
+        path = os.path.join(backup_dir, name + ".gz")
+        with open(raw_path, "rb") as src, gzip.open(path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(raw_path)
+    else:
+        path = os.path.join(backup_dir, name)
+        os.replace(raw_path, path)
+
+    _save_incremental_state(backup_dir, state)
+
+    return {
+        "path": path,
+        "db_size": db_size,
+        "size": os.path.getsize(path),
+        "duration": time.monotonic() - started,
+    }
+
+
+def export_incremental(db_path=DB_PATH, backup_dir=BACKUP_DIR):
+    """Write rows added to append-only tables since the last full or incremental backup.
+
+    Returns stats like create_backup, or None when nothing changed or no full backup exists yet.
+    """
+    state_path = os.path.join(backup_dir, INCREMENTAL_STATE)
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+
+    started = time.monotonic()
+    conn = sqlite3.connect(db_path)
+    try:
+        new_state = _max_ids(conn)
+        if new_state == state:
+            return None
+
+        path = os.path.join(backup_dir, f"swearjar-{_timestamp()}.incremental.jsonl.gz")
+        rows = 0
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            for table in INCREMENTAL_TABLES:
+                columns = table_columns(conn, table)
+                cursor = conn.execute(f"SELECT * FROM {table} WHERE id > ? AND id <= ? ORDER BY id",
+                                      (state.get(table, 0), new_state[table]))
+                while True:
+                    chunk = cursor.fetchmany(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    for row in chunk:
+                        f.write(json.dumps({"table": table, "row": dict(zip(columns, row))}, ensure_ascii=False) + "\n")
+                    rows += len(chunk)
+    finally:
+        conn.close()
+
+    _save_incremental_state(backup_dir, new_state)
+    return {"path": path, "rows": rows, "size": os.path.getsize(path), "duration": time.monotonic() - started}
+
+
+def list_backups(backup_dir=BACKUP_DIR, include_incremental=False):
+    """Backup file names, newest first."""
+    if not os.path.isdir(backup_dir):
+        return []
+    names = [
+        name for name in os.listdir(backup_dir)
+        if name.startswith("swearjar-") and (include_incremental or ".incremental." not in name)
+        and not name.endswith(".tmp")
+    ]
+    return sorted(names, reverse=True)
+
+
+def prune_backups(backup_dir=BACKUP_DIR, keep=BACKUP_RETENTION):
+    """Keep the newest `keep` full backups and drop incrementals older than the oldest kept one."""
+    full = list_backups(backup_dir)
+    removed = full[keep:]
+    if full[:keep]:
+        oldest_kept = full[:keep][-1]
+        removed += [
+            name for name in list_backups(backup_dir, include_incremental=True)
+            if ".incremental." in name and name < oldest_kept
+        ]
+    for name in removed:
+        os.remove(os.path.join(backup_dir, name))
+    return removed
+
+
+def restore_backup(conn, backup_path, pages=BACKUP_PAGES):
+    """Copy a full backup (optionally gzipped) over the database behind `conn`."""
+    raw_path = backup_path
+    if backup_path.endswith(".gz"):
+        raw_path = backup_path[:-3] + ".restore.tmp"
+        with gzip.open(backup_path, "rb") as src, open(raw_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+
+    source = sqlite3.connect(raw_path)
+    try:
+        conn.commit()
+        source.backup(conn, pages=pages)
+    finally:
+        source.close()
+        if raw_path != backup_path:
+            os.remove(raw_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import swear jar bot data.")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the SQLite database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Stream tables to a JSONL or CSV file")
+    export_parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    export_parser.add_argument("--table", choices=EXPORT_TABLES, help="Only export this table (required for CSV)")
+    export_parser.add_argument("--out", required=True, help="Output file path")
+    export_parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    import_parser = subparsers.add_parser("import", help="Bulk load a JSONL or CSV export")
+    import_parser.add_argument("path", help="File to import")
+    import_parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    import_parser.add_argument("--table", choices=EXPORT_TABLES, help="Target table (required for CSV)")
+    import_parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    backup_parser = subparsers.add_parser("backup", help="Take a compressed online backup")
+    backup_parser.add_argument("--dir", default=BACKUP_DIR, help="Backup directory")
+    backup_parser.add_argument("--keep", type=int, default=BACKUP_RETENTION, help="Full backups to keep")
+    backup_parser.add_argument("--incremental", action="store_true", help="Only export rows added since the last backup")
+
+    restore_parser = subparsers.add_parser("restore", help="Restore a full backup over the database")
+    restore_parser.add_argument("path", help="Backup file (.db or .db.gz)")
+
+    report_parser = subparsers.add_parser("report", help="Write an analytics report (needs numpy)")
+    report_parser.add_argument("--format", choices=["markdown", "html"], default="markdown")
+    report_parser.add_argument("--out", required=True, help="Output file path")
+    report_parser.add_argument("--chunk-size", type=int, default=analytics.REPORT_CHUNK_SIZE)
+
+    benchmark_parser = subparsers.add_parser("benchmark", help="Time the analytics report on a synthetic database")
+    benchmark_parser.add_argument("--users", type=int, default=1_000_000)
+    benchmark_parser.add_argument("--format", choices=["markdown", "html"], default="markdown")
+    benchmark_parser.add_argument("--chunk-size", type=int, default=analytics.REPORT_CHUNK_SIZE)
+
+    args = parser.parse_args(argv)
+    conn = sqlite3.connect(args.db)
+
+    try:
+        if args.command == "export":
+            export_to_file(conn, args.out, args.format, args.table, args.chunk_size)
+            print(f"✅ Exported to {args.out}")
+        elif args.command == "import":
+            counts = import_from_file(conn, args.path, args.format, args.table, args.chunk_size)
+            for table, count in counts.items():
+                print(f"✅ Imported {count} rows into {table}")
+        elif args.command == "backup":
+            conn.close()
+            if args.incremental:
+                stats = export_incremental(args.db, args.dir)
+                if stats is None:
+                    print("📭 Nothing to back up since the last backup.")
+                    return 0
+            else:
+                stats = create_backup(args.db, args.dir)
+                prune_backups(args.dir, args.keep)
+            print(f"✅ Wrote {stats['path']} ({stats['size']} bytes in {stats['duration']:.2f}s)")
+        elif args.command == "restore":
+            restore_backup(conn, args.path)
+            print(f"✅ Restored {args.path} into {args.db}")
+        elif args.command == "report":
+            timings = analytics.write_report(conn, args.out, args.format, args.chunk_size)
+            print(f"✅ Wrote {args.out} in {sum(timings.values()):.2f}s")
+        elif args.command == "benchmark":
+            timings = analytics.run_benchmark(args.users, args.format, args.chunk_size)
+            print(f"📊 Report benchmark with {args.users:,} users:")
+            for phase, seconds in timings.items():
+                print(f"  {phase:<8} {seconds:8.2f}s")
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""Shared state for running the bot as several processes.
+
+`SharedState` holds what every process has to agree on: rate-limit counters,
+short-lived claims and a pub/sub channel used to invalidate each process's
+in-memory caches. `LocalState` keeps all of it in the process and is the
+default. `RedisState` speaks the Redis protocol (RESP) over plain asyncio
+streams, so it needs no client library. Pick one with `open_shared_state()`:
+
+    shared = open_shared_state(os.getenv("SHARED_STATE_URL"))
+    await shared.connect()
+"""
+import asyncio
+import time
+import urllib.parse
+
+
+class SharedState:
+    """Backend interface. All methods except publish_nowait are coroutines."""
+
+    async def connect(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def hit(self, key, window):
+        """Count one hit in a fixed window of `window` seconds and return the window's count so far."""
+        raise NotImplementedError
+
+    async def claim(self, key, ttl):
+        """Mark `key` as taken for `ttl` seconds. Returns False if it already was."""
+        raise NotImplementedError
+
+    async def publish(self, channel, message):
+        raise NotImplementedError
+
+    def listen(self, channel, callback):
+        """Call callback(message) for every message other processes publish on `channel`."""
+        pass
+
+    def publish_nowait(self, channel, message):
+        """Publish without waiting, for callers that can't await (e.g. the synchronous event bus)."""
+        pass
+
+
+class LocalState(SharedState):
+    """Everything in this process. Publishing is a no-op because there is nobody else to tell."""
+
+    SWEEP_INTERVAL = 60  # Seconds between sweeps of expired keys
+
+    def __init__(self):
+        self.values = {}  # key -> (value, expires_at)
+        self.next_sweep = time.monotonic() + self.SWEEP_INTERVAL
+
+    def _get(self, key, now):
+        if now >= self.next_sweep:
+            self.values = {k: entry for k, entry in self.values.items() if entry[1] > now}
+            self.next_sweep = now + self.SWEEP_INTERVAL
+        entry = self.values.get(key)
+        return entry if entry and entry[1] > now else None
+
+    async def hit(self, key, window):
+        now = time.monotonic()
+        entry = self._get(key, now)
+        count = entry[0] + 1 if entry else 1
+        self.values[key] = (count, entry[1] if entry else now + window)
+        return count
+
+    async def claim(self, key, ttl):
+        now = time.monotonic()
+        if self._get(key, now):
+            return False
+        self.values[key] = (1, now + ttl)
+        return True
+
+    async def publish(self, channel, message):
+        pass
+
+
+class RedisError(Exception):
+    pass
+
+
+def encode_command(*args):
+    """Encode a command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def read_reply(reader):
+    """Read one reply. Error replies are returned as RedisError, so a caller can finish reading a pipeline first."""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by the server")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        return RedisError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        length = int(body)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"Unexpected reply: {line!r}")
+
+
+class RedisState(SharedState):
+    """Redis (or any RESP-compatible server) through one command connection and one subscriber connection."""
+
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, url):
+        parsed = urllib.parse.urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = urllib.parse.unquote(parsed.password) if parsed.password else None
+        self.username = urllib.parse.unquote(parsed.username) if parsed.username else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.reader = self.writer = None
+        self.lock = asyncio.Lock()
+        self.subscriptions = {}  # channel -> callback
+        self.listener = None
+        self.pending = set()  # publish_nowait tasks, kept referenced until they finish
+
+    async def _open(self, select_db=True):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.username, self.password) if self.username else ("AUTH", self.password))
+        if select_db and self.db:
+            setup.append(("SELECT", self.db))
+        try:
+            for command in setup:
+                writer.write(encode_command(*command))
+                reply = await read_reply(reader)
+                if isinstance(reply, RedisError):
+                    raise reply
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def connect(self):
+        self.reader, self.writer = await self._open()
+
+    async def close(self):
+        if self.listener:
+            self.listener.cancel()
+        if self.writer:
+            self.writer.close()
+
+    async def execute(self, *commands):
+        """Send one or more commands in a single write and return their replies in order.
+
+        Raises the first error reply only after every reply has been read, so the connection stays in step.
+        """
+        async with self.lock:
+            if self.writer is None or self.writer.is_closing():
+                await self.connect()
+            try:
+                self.writer.write(b"".join(encode_command(*command) for command in commands))
+                await self.writer.drain()
+                replies = [await read_reply(self.reader) for _ in commands]
+            except BaseException:
+                # Replies left unread (a dropped connection, a cancelled caller) would go to the next caller
+                self.writer.close()
+                self.writer = None
+                raise
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+    async def hit(self, key, window):
+        # Creating the key with its expiry first means a counter can never be left without one
+        _, count = await self.execute(("SET", key, 0, "PX", int(window * 1000), "NX"), ("INCR", key))
+        return count
+
+    async def claim(self, key, ttl):
+        (reply,) = await self.execute(("SET", key, 1, "PX", max(1, int(ttl * 1000)), "NX"))
+        return reply == "OK"
+
+    async def publish(self, channel, message):
+        await self.execute(("PUBLISH", channel, message))
+
+    def publish_nowait(self, channel, message):
+        task = asyncio.get_running_loop().create_task(self.publish(channel, message))
+        self.pending.add(task)
+        task.add_done_callback(self._published)
+
+    def _published(self, task):
+        self.pending.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"Error publishing to shared state: {task.exception()}")
+
+    def listen(self, channel, callback):
+        self.subscriptions[channel] = callback
+        if self.listener is None:
+            self.listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self):
+        # Pub/sub needs a connection of its own; reconnect and resubscribe whenever it drops
+        while True:
+            writer = None
+            try:
+                reader, writer = await self._open(select_db=False)
+                writer.write(encode_command("SUBSCRIBE", *self.subscriptions))
+                await writer.drain()
+                while True:
+                    reply = await read_reply(reader)
+                    if isinstance(reply, RedisError):
+                        raise reply
+                    if isinstance(reply, list) and reply[0] == b"message":
+                        callback = self.subscriptions.get(reply[1].decode())
+                        if callback:
+                            try:
+                                callback(reply[2].decode())
+                            except Exception as e:
+                                print(f"Error handling shared state message: {e}")
+            except asyncio.CancelledError:
+                raise
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, RedisError) as e:
+                print(f"Shared state subscription lost ({e}), reconnecting...")
+            finally:
+                if writer:
+                    writer.close()
+            await asyncio.sleep(self.RECONNECT_DELAY)
+
+
+def open_shared_state(url=None):
+    """Return the backend for `url`: Redis for redis:// URLs, otherwise process-local state."""
+    if url and url.startswith("redis://"):
+        return RedisState(url)
+    return LocalState()
@@ -0,0 +1,441 @@
+"""Storage backends for the swear jar bot.
+
+`Storage` is the repository interface for users, inventory, term lists, settings,
+the shop and purchases. `SQLiteStorage` keeps the bot's existing single-file
+database; `PostgresStorage` targets PostgreSQL through asyncpg with a pooled
+connection set. Pick one with `open_storage()`:
+
+    storage = open_storage(os.getenv("DATABASE_URL"), conn=conn)
+    await storage.connect()
+"""
+import sqlite3
+import time
+
+import datatools
+
+# Term list kind -> (table, column)
+TERM_TABLES = {
+    "swear": ("swear_words", "word"),
+    "positive": ("positive_words", "word"),
+    "nsfw": ("nsfw_words", "word"),
+    "gif": ("gif_filters", "filter"),
+    "warning": ("warning_messages", "message"),
+}
+
+STARTING_COINS = 100
+
+# Purchases are folded into hourly and daily rollups as they are recorded (see /shop_stats)
+ROLLUP_PERIODS = {"hour": 3600, "day": 86400}
+ALL_ITEMS = 0  # item_id used for rollup rows that cover every item
+
+
+class Storage:
+    """Repository interface shared by every backend. All methods are coroutines."""
+
+    async def connect(self):
+        pass
+
+    async def close(self):
+        pass
+
+    # Users
+    async def get_user(self, user_id):
+        """Return (count, coins, warnings) or None."""
+        raise NotImplementedError
+
+    async def get_coins(self, user_id):
+        user = await self.get_user(user_id)
+        return user[1] if user else STARTING_COINS
+
+    async def add_coins(self, user_id, amount):
+        """Add (or with a negative amount, remove) coins, creating the user if needed. Returns the new balance."""
+        raise NotImplementedError
+
+    # Inventory
+    async def get_inventory(self, user_id):
+        """Return [(item_id, name, emoji, description, quantity)]."""
+        raise NotImplementedError
+
+    async def add_inventory_item(self, user_id, item_id, quantity=1):
+        raise NotImplementedError
+
+    # Term lists
+    async def list_terms(self, kind):
+        """Return the terms of a list; positive words come back as {word: reward}."""
+        raise NotImplementedError
+
+    async def add_term(self, kind, term, reward=None):
+        raise NotImplementedError
+
+    async def remove_term(self, kind, term):
+        raise NotImplementedError
+
+    # Settings
+    async def get_setting(self, key, default=None):
+        raise NotImplementedError
+
+    async def set_setting(self, key, value):
+        raise NotImplementedError
+
+    async def delete_setting(self, key):
+        raise NotImplementedError
+
+    # Shop
+    async def list_shop_items(self):
+        """Return [(id, name, emoji, price, description, role_id, effect)]."""
+        raise NotImplementedError
+
+    async def get_shop_item(self, item_id):
+        raise NotImplementedError
+
+    # Purchases
+    async def record_purchase(self, user_id, item_id, price):
+        raise NotImplementedError
+
+
+SQLITE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS swear_counts (
+        user_id INTEGER PRIMARY KEY,
+        count INTEGER DEFAULT 0,
+        coins INTEGER DEFAULT 100,
+        warnings INTEGER DEFAULT 0,
+        last_daily TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS shop_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        emoji TEXT NOT NULL,
+        price INTEGER NOT NULL,
+        description TEXT,
+        role_id TEXT,
+        effect TEXT
+    );
+    CREATE TABLE IF NOT EXISTS user_inventory (
+        user_id INTEGER,
+        item_id INTEGER,
+        quantity INTEGER DEFAULT 1,
+        PRIMARY KEY (user_id, item_id)
+    );
+    CREATE TABLE IF NOT EXISTS shop_purchases (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        item_id INTEGER NOT NULL,
+        price_paid INTEGER NOT NULL,
+        purchase_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS purchase_rollups (
+        period TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        item_id INTEGER NOT NULL,
+        purchases INTEGER NOT NULL DEFAULT 0,
+        revenue INTEGER NOT NULL DEFAULT 0,
+        unique_buyers INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (period, bucket, item_id)
+    );
+    CREATE TABLE IF NOT EXISTS purchase_rollup_buyers (
+        period TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        item_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        PRIMARY KEY (period, bucket, item_id, user_id)
+    );
+    CREATE TABLE IF NOT EXISTS positive_words (word TEXT PRIMARY KEY, reward INTEGER NOT NULL);
+    CREATE TABLE IF NOT EXISTS swear_words (word TEXT PRIMARY KEY);
+    CREATE TABLE IF NOT EXISTS nsfw_words (word TEXT PRIMARY KEY);
+    CREATE TABLE IF NOT EXISTS gif_filters (filter TEXT PRIMARY KEY);
+    CREATE TABLE IF NOT EXISTS warning_messages (message TEXT PRIMARY KEY);
+    CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def insert_purchase(conn, user_id, item_id, price, now=None):
+    """Log a purchase and fold it into the hourly/daily rollups. The caller commits."""
+    conn.execute("INSERT INTO shop_purchases (user_id, item_id, price_paid) VALUES (?, ?, ?)", (user_id, item_id, price))
+
+    now = int(now or time.time())
+    for period, size in ROLLUP_PERIODS.items():
+        bucket = now - now % size
+        for rollup_item in (item_id, ALL_ITEMS):
+            new_buyer = conn.execute(
+                "INSERT OR IGNORE INTO purchase_rollup_buyers (period, bucket, item_id, user_id) VALUES (?, ?, ?, ?)",
+                (period, bucket, rollup_item, user_id)
+            ).rowcount
+            conn.execute("""
+                INSERT INTO purchase_rollups (period, bucket, item_id, purchases, revenue, unique_buyers)
+                VALUES (?, ?, ?, 1, ?, ?)
+                ON CONFLICT(period, bucket, item_id) DO UPDATE SET
+                    purchases = purchases + 1,
+                    revenue = revenue + excluded.revenue,
+                    unique_buyers = unique_buyers + excluded.unique_buyers
+            """, (period, bucket, rollup_item, price, new_buyer))
+
+
+class SQLiteStorage(Storage):
+    """The bot's original SQLite database. Shares the bot's connection when one is given."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def connect(self):
+        # The bot creates (and migrates) these itself; this lets the repository stand on its own
+        self.conn.executescript(SQLITE_SCHEMA)
+
+    def _one(self, sql, params=()):
+        return self.conn.execute(sql, params).fetchone()
+
+    def _write(self, sql, params=()):
+        cursor = self.conn.execute(sql, params)
+        self.conn.commit()
+        return cursor
+
+    async def close(self):
+        self.conn.close()
+
+    async def get_user(self, user_id):
+        return self._one("SELECT count, coins, warnings FROM swear_counts WHERE user_id = ?", (user_id,))
+
+    async def add_coins(self, user_id, amount):
+        self.conn.execute("INSERT OR IGNORE INTO swear_counts (user_id, coins) VALUES (?, ?)", (user_id, STARTING_COINS))
+        self.conn.execute("UPDATE swear_counts SET coins = coins + ? WHERE user_id = ?", (amount, user_id))
+        self.conn.commit()
+        return self._one("SELECT coins FROM swear_counts WHERE user_id = ?", (user_id,))[0]
+
+    async def get_inventory(self, user_id):
+        return self.conn.execute("""
+            SELECT s.id, s.name, s.emoji, s.description, u.quantity
+            FROM user_inventory u
+            JOIN shop_items s ON u.item_id = s.id
+            WHERE u.user_id = ?
+        """, (user_id,)).fetchall()
+
+    async def add_inventory_item(self, user_id, item_id, quantity=1):
+        self._write("""
+            INSERT INTO user_inventory (user_id, item_id, quantity) VALUES (?, ?, ?)
+            ON CONFLICT(user_id, item_id) DO UPDATE SET quantity = quantity + excluded.quantity
+        """, (user_id, item_id, quantity))
+
+    async def list_terms(self, kind):
+        table, column = TERM_TABLES[kind]
+        if kind == "positive":
+            return dict(self.conn.execute("SELECT word, reward FROM positive_words").fetchall())
+        return [row[0] for row in self.conn.execute(f"SELECT {column} FROM {table}")]
+
+    async def add_term(self, kind, term, reward=None):
+        table, column = TERM_TABLES[kind]
+        if kind == "positive":
+            self._write("INSERT OR REPLACE INTO positive_words (word, reward) VALUES (?, ?)", (term, reward))
+        else:
+            self._write(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", (term,))
+
+    async def remove_term(self, kind, term):
+        table, column = TERM_TABLES[kind]
+        return self._write(f"DELETE FROM {table} WHERE {column} = ?", (term,)).rowcount
+
+    async def get_setting(self, key, default=None):
+        result = self._one("SELECT value FROM settings WHERE key = ?", (key,))
+        return result[0] if result else default
+
+    async def set_setting(self, key, value):
+        self._write("REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+
+    async def delete_setting(self, key):
+        return self._write("DELETE FROM settings WHERE key = ?", (key,)).rowcount
+
+    async def list_shop_items(self):
+        return self.conn.execute("SELECT id, name, emoji, price, description, role_id, effect FROM shop_items").fetchall()
+
+    async def get_shop_item(self, item_id):
+        return self._one("SELECT id, name, emoji, price, description, role_id, effect FROM shop_items WHERE id = ?", (item_id,))
+
+    async def record_purchase(self, user_id, item_id, price):
+        insert_purchase(self.conn, user_id, item_id, price)
+        self.conn.commit()
+
+
+POSTGRES_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS swear_counts (
+        user_id BIGINT PRIMARY KEY,
+        count INTEGER DEFAULT 0,
+        coins INTEGER DEFAULT 100,
+        warnings INTEGER DEFAULT 0,
+        last_daily TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS shop_items (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL,
+        emoji TEXT NOT NULL,
+        price INTEGER NOT NULL,
+        description TEXT,
+        role_id TEXT,
+        effect TEXT
+    );
+    CREATE TABLE IF NOT EXISTS user_inventory (
+        user_id BIGINT,
+        item_id INTEGER,
+        quantity INTEGER DEFAULT 1,
+        PRIMARY KEY (user_id, item_id)
+    );
+    CREATE TABLE IF NOT EXISTS shop_purchases (
+        id SERIAL PRIMARY KEY,
+        user_id BIGINT NOT NULL,
+        item_id INTEGER NOT NULL,
+        price_paid INTEGER NOT NULL,
+        purchase_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS purchase_rollups (
+        period TEXT NOT NULL,
+        bucket BIGINT NOT NULL,
+        item_id INTEGER NOT NULL,
+        purchases INTEGER NOT NULL DEFAULT 0,
+        revenue BIGINT NOT NULL DEFAULT 0,
+        unique_buyers INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (period, bucket, item_id)
+    );
+    CREATE TABLE IF NOT EXISTS purchase_rollup_buyers (
+        period TEXT NOT NULL,
+        bucket BIGINT NOT NULL,
+        item_id INTEGER NOT NULL,
+        user_id BIGINT NOT NULL,
+        PRIMARY KEY (period, bucket, item_id, user_id)
+    );
+    CREATE TABLE IF NOT EXISTS positive_words (word TEXT PRIMARY KEY, reward INTEGER NOT NULL);
+    CREATE TABLE IF NOT EXISTS swear_words (word TEXT PRIMARY KEY);
+    CREATE TABLE IF NOT EXISTS nsfw_words (word TEXT PRIMARY KEY);
+    CREATE TABLE IF NOT EXISTS gif_filters (filter TEXT PRIMARY KEY);
+    CREATE TABLE IF NOT EXISTS warning_messages (message TEXT PRIMARY KEY);
+    CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+class PostgresStorage(Storage):
+    """PostgreSQL through an asyncpg connection pool.
+
+    asyncpg prepares every query on first use and keeps it in a per-connection
+    statement cache, so repeated calls skip parsing and planning.
+    """
+
+    def __init__(self, dsn, min_size=1, max_size=10, statement_cache_size=256):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.pool = None
+
+    async def connect(self):
+        try:
+            import asyncpg
+        except ImportError:
+            raise RuntimeError("PostgreSQL storage needs the asyncpg package (pip install asyncpg)")
+
+        self.pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            statement_cache_size=self.statement_cache_size,
+        )
+        async with self.pool.acquire() as connection:
+            await connection.execute(POSTGRES_SCHEMA)
+
+    async def close(self):
+        if self.pool:
+            await self.pool.close()
+
+    async def get_user(self, user_id):
+        row = await self.pool.fetchrow("SELECT count, coins, warnings FROM swear_counts WHERE user_id = $1", user_id)
+        return tuple(row) if row else None
+
+    async def add_coins(self, user_id, amount):
+        return await self.pool.fetchval("""
+            INSERT INTO swear_counts (user_id, coins) VALUES ($1, $2 + $3)
+            ON CONFLICT (user_id) DO UPDATE SET coins = swear_counts.coins + $3
+            RETURNING coins
+        """, user_id, STARTING_COINS, amount)
+
+    async def get_inventory(self, user_id):
+        rows = await self.pool.fetch("""
+            SELECT s.id, s.name, s.emoji, s.description, u.quantity
+            FROM user_inventory u
+            JOIN shop_items s ON u.item_id = s.id
+            WHERE u.user_id = $1
+        """, user_id)
+        return [tuple(row) for row in rows]
+
+    async def add_inventory_item(self, user_id, item_id, quantity=1):
+        await self.pool.execute("""
+            INSERT INTO user_inventory (user_id, item_id, quantity) VALUES ($1, $2, $3)
+            ON CONFLICT (user_id, item_id) DO UPDATE SET quantity = user_inventory.quantity + EXCLUDED.quantity
+        """, user_id, item_id, quantity)
+
+    async def list_terms(self, kind):
+        table, column = TERM_TABLES[kind]
+        if kind == "positive":
+            return {row[0]: row[1] for row in await self.pool.fetch("SELECT word, reward FROM positive_words")}
+        return [row[0] for row in await self.pool.fetch(f"SELECT {column} FROM {table}")]
+
+    async def add_term(self, kind, term, reward=None):
+        table, column = TERM_TABLES[kind]
+        if kind == "positive":
+            await self.pool.execute("""
+                INSERT INTO positive_words (word, reward) VALUES ($1, $2)
+                ON CONFLICT (word) DO UPDATE SET reward = EXCLUDED.reward
+            """, term, reward)
+        else:
+            await self.pool.execute(f"INSERT INTO {table} ({column}) VALUES ($1) ON CONFLICT DO NOTHING", term)
+
+    async def remove_term(self, kind, term):
+        table, column = TERM_TABLES[kind]
+        status = await self.pool.execute(f"DELETE FROM {table} WHERE {column} = $1", term)
+        return int(status.split()[-1])
+
+    async def get_setting(self, key, default=None):
+        value = await self.pool.fetchval("SELECT value FROM settings WHERE key = $1", key)
+        return value if value is not None else default
+
+    async def set_setting(self, key, value):
+        await self.pool.execute("""
+            INSERT INTO settings (key, value) VALUES ($1, $2)
+            ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value
+        """, key, value)
+
+    async def delete_setting(self, key):
+        status = await self.pool.execute("DELETE FROM settings WHERE key = $1", key)
+        return int(status.split()[-1])
+
+    async def list_shop_items(self):
+        rows = await self.pool.fetch("SELECT id, name, emoji, price, description, role_id, effect FROM shop_items")
+        return [tuple(row) for row in rows]
+
+    async def get_shop_item(self, item_id):
+        row = await self.pool.fetchrow("SELECT id, name, emoji, price, description, role_id, effect FROM shop_items WHERE id = $1", item_id)
+        return tuple(row) if row else None
+
+    async def record_purchase(self, user_id, item_id, price):
+        now = int(time.time())
+        async with self.pool.acquire() as connection:
+            async with connection.transaction():
+                await connection.execute("INSERT INTO shop_purchases (user_id, item_id, price_paid) VALUES ($1, $2, $3)",
+                                         user_id, item_id, price)
+                for period, size in ROLLUP_PERIODS.items():
+                    bucket = now - now % size
+                    for rollup_item in (item_id, ALL_ITEMS):
+                        status = await connection.execute("""
+                            INSERT INTO purchase_rollup_buyers (period, bucket, item_id, user_id) VALUES ($1, $2, $3, $4)
+                            ON CONFLICT DO NOTHING
+                        """, period, bucket, rollup_item, user_id)
+                        await connection.execute("""
+                            INSERT INTO purchase_rollups (period, bucket, item_id, purchases, revenue, unique_buyers)
+                            VALUES ($1, $2, $3, 1, $4, $5)
+                            ON CONFLICT (period, bucket, item_id) DO UPDATE SET
+                                purchases = purchase_rollups.purchases + 1,
+                                revenue = purchase_rollups.revenue + EXCLUDED.revenue,
+                                unique_buyers = purchase_rollups.unique_buyers + EXCLUDED.unique_buyers
+                        """, period, bucket, rollup_item, price, int(status.split()[-1]))
+
+
+def open_storage(url=None, conn=None):
+    """Return the backend for `url`: PostgreSQL for postgres:// URLs, otherwise SQLite."""
+    if url and url.startswith(("postgres://", "postgresql://")):
+        return PostgresStorage(url)
+    if conn is None:
+        conn = sqlite3.connect(url or datatools.DB_PATH)
+    return SQLiteStorage(conn)
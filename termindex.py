@@ -0,0 +1,174 @@
+"""Memory-mapped snapshot of the compiled term lists.
+
+Several bot processes on one host can share one snapshot file instead of each
+loading and compiling the term lists from SQLite. Swear and NSFW words live in
+open-addressing hash tables that are probed straight from the mapped pages, so
+every process shares the same physical memory for them. The short positive-word
+and GIF-filter lists are decoded once per mapping.
+
+Layout (little-endian):
+
+    header    magic, format version, snapshot version, swear slots, nsfw slots,
+              positive count, gif count
+    swear     swear slots x u32    blob offset + 1 of the term in each slot, 0 = empty
+    nsfw      nsfw slots x u32
+    positive  positive count x (u32 blob offset, i32 reward)
+    gif       gif count x u32 blob offset
+    blob      u16 length + UTF-8 bytes per term
+
+Writers build the file next to the old one and os.replace() it, so readers
+only ever see a complete snapshot and notice the swap by its new inode.
+"""
+import collections
+import mmap
+import os
+import re
+import struct
+import time
+import zlib
+
+MAGIC = b"SJTI"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIQIIII")
+SLOT = struct.Struct("<I")
+POSITIVE_ENTRY = struct.Struct("<Ii")
+LENGTH = struct.Struct("<H")
+
+# toxicity is the classifier score when it flagged the message, otherwise None
+TermMatch = collections.namedtuple("TermMatch", "swears nsfw gif positive toxicity", defaults=(None,))
+
+
+def _slot_count(terms):
+    # Power of two with at most 50% load, so probes stay short
+    slots = 8
+    while slots < len(terms) * 2:
+        slots *= 2
+    return slots
+
+
+def _term_hash(data):
+    return zlib.crc32(data)
+
+
+def write_snapshot(path, swear_words, nsfw_words, gif_filters, positive_words, version=None):
+    """Compile the term lists into a snapshot and atomically replace `path`. Returns the snapshot version."""
+    version = version or time.time_ns()
+    swears = sorted({word.lower().encode() for word in swear_words})
+    nsfw = sorted({word.lower().encode() for word in nsfw_words})
+    gifs = sorted({term.lower().encode() for term in gif_filters}, key=len, reverse=True)
+    positives = [(word.lower().encode(), reward) for word, reward in positive_words.items()]
+
+    blob = bytearray()
+    offsets = {}
+
+    def add(term):
+        if term not in offsets:
+            if len(term) > 0xFFFF:
+                raise ValueError("Terms can be at most 65535 bytes long")
+            offsets[term] = len(blob)
+            blob.extend(LENGTH.pack(len(term)))
+            blob.extend(term)
+        return offsets[term]
+
+    def table(terms):
+        slots = [0] * _slot_count(terms)
+        mask = len(slots) - 1
+        for term in terms:
+            index = _term_hash(term) & mask
+            while slots[index]:
+                index = (index + 1) & mask
+            slots[index] = add(term) + 1
+        return slots
+
+    swear_slots = table(swears)
+    nsfw_slots = table(nsfw)
+    positive_entries = [(add(word), reward) for word, reward in positives]
+    gif_entries = [add(term) for term in gifs]
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, version, len(swear_slots), len(nsfw_slots),
+                            len(positive_entries), len(gif_entries)))
+        for slot in swear_slots + nsfw_slots:
+            f.write(SLOT.pack(slot))
+        for entry in positive_entries:
+            f.write(POSITIVE_ENTRY.pack(*entry))
+        for offset in gif_entries:
+            f.write(SLOT.pack(offset))
+        f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    return version
+
+
+class MappedTermMatcher:
+    """TermMatcher counterpart that reads a snapshot file through a read-only memory map."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if stat.st_size < HEADER.size:
+                raise ValueError(f"{path} is not a term snapshot")
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, format_version, self.version, swear_slots, nsfw_slots, positive_count, gif_count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} term snapshot")
+
+        self.swear_table = (HEADER.size, swear_slots)
+        self.nsfw_table = (HEADER.size + swear_slots * SLOT.size, nsfw_slots)
+        positive_start = HEADER.size + (swear_slots + nsfw_slots) * SLOT.size
+        gif_start = positive_start + positive_count * POSITIVE_ENTRY.size
+        self.blob_start = gif_start + gif_count * SLOT.size
+
+        self.positive_words = tuple(
+            (self._term(offset), reward)
+            for offset, reward in (POSITIVE_ENTRY.unpack_from(self.map, positive_start + i * POSITIVE_ENTRY.size) for i in range(positive_count))
+        )
+        gif_filters = [self._term(SLOT.unpack_from(self.map, gif_start + i * SLOT.size)[0]) for i in range(gif_count)]
+        self.gif_pattern = re.compile("|".join(map(re.escape, gif_filters))) if gif_filters else None
+
+    def _term_bytes(self, offset):
+        start = self.blob_start + offset
+        (length,) = LENGTH.unpack_from(self.map, start)
+        return self.map[start + LENGTH.size:start + LENGTH.size + length]
+
+    def _term(self, offset):
+        return self._term_bytes(offset).decode()
+
+    def _contains(self, table, term):
+        table_start, slots = table
+        mask = slots - 1
+        index = _term_hash(term) & mask
+        while True:
+            (slot,) = SLOT.unpack_from(self.map, table_start + index * SLOT.size)
+            if not slot:
+                return False
+            if self._term_bytes(slot - 1) == term:
+                return True
+            index = (index + 1) & mask
+
+    def is_current(self):
+        """False once the file at `path` has been replaced by a newer snapshot."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size) == self.signature
+
+    def match(self, text):
+        content = text.lower()
+        tokens = {token.encode() for token in content.split()}
+        gif = None
+        if self.gif_pattern and (content.startswith("gif:") or "tenor.com" in content or "giphy.com" in content):
+            found = self.gif_pattern.search(content)
+            gif = found.group(0) if found else None
+        return TermMatch(
+            swears={token.decode() for token in tokens if self._contains(self.swear_table, token)},
+            nsfw={token.decode() for token in tokens if self._contains(self.nsfw_table, token)},
+            gif=gif,
+            positive=[(word, reward) for word, reward in self.positive_words if word in content]
+        )
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# The bot's modules live at the repository root rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# core opens its database on import; keep the tests off the real one
+os.environ["SWEARJAR_DB"] = os.path.join(tempfile.mkdtemp(prefix="swearjar-tests-"), "swearjar.db")
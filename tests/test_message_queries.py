@@ -0,0 +1,80 @@
+"""Statements on_message runs per message type, counted with sqlite3's trace callback.
+
+A user's swear_counts row is read at most once, when the user isn't cached yet, and
+written back with one upsert. Messages that trigger nothing touch the database not at all.
+"""
+import asyncio
+import itertools
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import core
+from cogs import moderation
+
+MESSAGE_IDS = itertools.count(1)
+USER_IDS = itertools.count(1000)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def terms():
+    core.conn.execute("INSERT OR IGNORE INTO swear_words (word) VALUES ('darn')")
+    core.conn.execute("INSERT OR IGNORE INTO nsfw_words (word) VALUES ('lewd')")
+    core.conn.execute("INSERT OR REPLACE INTO positive_words (word, reward) VALUES ('thanks', 5)")
+    core.conn.commit()
+    core.reload_term_sets()
+    core.rebuild_matcher()
+
+
+def make_message(text, user_id):
+    message = MagicMock()
+    message.id = next(MESSAGE_IDS)
+    message.content = text
+    message.author.id = user_id
+    message.guild = None
+    message.channel.id = 1
+    message.add_reaction = AsyncMock()
+    message.delete = AsyncMock()
+    message.channel.send = AsyncMock()
+    return message
+
+
+def statements_for(text, user_id):
+    """Run one message through on_message and return the statements it executed."""
+    statements = []
+    core.conn.set_trace_callback(statements.append)
+    try:
+        asyncio.run(moderation.Moderation(core.bot).on_message(make_message(text, user_id)))
+    finally:
+        core.conn.set_trace_callback(None)
+    return statements
+
+
+def summarize(statements):
+    return [" ".join(statement.split()[:4]) for statement in statements]
+
+
+USER_READ = "SELECT count, coins, warnings,"
+SETTING_READ = "SELECT value FROM settings"
+USER_WRITE = ["BEGIN", "INSERT INTO swear_counts (user_id,", "COMMIT"]
+
+
+@pytest.mark.parametrize("text, cold, warm", [
+    # A cold user costs one read of their row and swear pass; every message ends with one upsert.
+    # A first swear's message doesn't show the currency emoji, later swears and rewards read it.
+    ("darn", [USER_READ, SETTING_READ], [SETTING_READ]),
+    ("thanks", [USER_READ, SETTING_READ, SETTING_READ], [SETTING_READ]),
+    # NSFW warnings don't show a balance
+    ("lewd", [USER_READ, SETTING_READ], []),
+])
+def test_statements_per_message(text, cold, warm):
+    user_id = next(USER_IDS)
+    assert summarize(statements_for(text, user_id)) == cold + USER_WRITE
+    assert summarize(statements_for(text, user_id)) == warm + USER_WRITE
+
+
+def test_clean_message_runs_no_statements():
+    user_id = next(USER_IDS)
+    assert statements_for("hello there", user_id) == []
+    statements_for("darn", user_id)
+    assert statements_for("hello again", user_id) == []
@@ -0,0 +1,17 @@
+"""ModerationPolicy's compiled tables and the text built from them."""
+import core
+
+
+def make_policy(**overrides):
+    return core.ModerationPolicy({**core.DEFAULT_POLICY, **overrides})
+
+
+def test_warning_progress_counts_towards_the_first_mute():
+    assert make_policy(ladder=[[5, 600], [3, 60]]).warning_progress(2) == "2/3"
+
+
+def test_warning_progress_without_mutes():
+    policy = make_policy(ladder=[])
+    assert policy.mute_at == 0
+    assert policy.warning_progress(3) == "3"
+    assert policy.mute_seconds(3) == 0
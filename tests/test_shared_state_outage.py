@@ -0,0 +1,56 @@
+"""Messages are still moderated while the shared state server is unreachable."""
+import asyncio
+import itertools
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import core
+import sharedstate
+from cogs import moderation
+
+MESSAGE_IDS = itertools.count(1_000_000)
+DEAD_URL = "redis://127.0.0.1:1"  # Nothing listens on port 1, so every connection is refused
+
+
+@pytest.fixture
+def dead_shared_state(monkeypatch):
+    monkeypatch.setattr(core, "SHARED_STATE_URL", DEAD_URL)
+    monkeypatch.setattr(core, "SHARED_STATE", sharedstate.RedisState(DEAD_URL))
+    monkeypatch.setattr(core, "LOCAL_RATE_LIMITS", sharedstate.LocalState())
+    monkeypatch.setitem(core.RATE_LIMIT_STATUS, "shared_state_failing", False)
+    monkeypatch.setitem(core.DEDUPE_STATUS, "shared_state_failing", False)
+    monkeypatch.setitem(core.POLICY_CACHE, None, core.ModerationPolicy({**core.DEFAULT_POLICY, "positive_rewards_per_hour": 1}))
+    core.conn.execute("INSERT OR IGNORE INTO swear_words (word) VALUES ('darn')")
+    core.conn.execute("INSERT OR REPLACE INTO positive_words (word, reward) VALUES ('thanks', 5)")
+    core.conn.commit()
+    core.reload_term_sets()
+    core.rebuild_matcher()
+
+
+def send_message(text, user_id):
+    message = MagicMock()
+    message.id = next(MESSAGE_IDS)
+    message.content = text
+    message.author.id = user_id
+    message.guild = None
+    message.channel.id = 1
+    message.add_reaction = AsyncMock()
+    message.delete = AsyncMock()
+    message.channel.send = AsyncMock()
+    asyncio.run(moderation.Moderation(core.bot).on_message(message))
+    return [call.args[0] for call in message.channel.send.call_args_list]
+
+
+def test_swear_fine_applies_while_shared_state_is_down(dead_shared_state):
+    user_id = 31337
+    replies = send_message("darn thanks", user_id)
+    assert any("lost 10 coins" in reply for reply in replies)
+    assert any("earned 5 coins" in reply for reply in replies)
+    assert core.conn.execute("SELECT count, coins FROM swear_counts WHERE user_id = ?", (user_id,)).fetchone() == (1, 95)
+
+    # The positive_rewards_per_hour limit is still counted, by this process alone
+    replies = send_message("darn thanks", user_id)
+    assert any("lost 10 coins" in reply for reply in replies)
+    assert not any("earned" in reply for reply in replies)
+    assert core.RATE_LIMIT_STATUS["shared_state_failing"]
@@ -0,0 +1,230 @@
+"""RedisState against an in-process RESP stand-in server, and LocalState."""
+import asyncio
+import time
+
+import pytest
+
+import sharedstate
+from sharedstate import LocalState, RedisError, RedisState, encode_command
+
+
+class StandInServer:
+    """Just enough of Redis for RedisState: SET with PX/NX, INCR, PUBLISH, SUBSCRIBE, AUTH and SELECT."""
+
+    def __init__(self):
+        self.values = {}  # key -> [value, expires_at or None]
+        self.subscribers = {}  # channel -> [writer]
+        self.connections = []
+        self.delay = 0  # Seconds to wait before answering, to test cancellation
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.url = f"redis://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+        return self.url
+
+    async def stop(self):
+        self.drop_connections()
+        self.server.close()
+        await self.server.wait_closed()
+
+    def drop_connections(self, subscribers_only=False):
+        dropped = {writer for writers in self.subscribers.values() for writer in writers} if subscribers_only else self.connections
+        for writer in dropped:
+            writer.close()
+        self.connections = [writer for writer in self.connections if writer not in dropped]
+        self.subscribers.clear()
+
+    def live(self, key):
+        entry = self.values.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.values[key]
+            return None
+        return entry
+
+    def reply(self, value):
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, Exception):
+            return b"-%s\r\n" % str(value).encode()
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, str):
+            return b"+%s\r\n" % value.encode()
+        if isinstance(value, list):
+            return b"*%d\r\n" % len(value) + b"".join(self.reply(item) for item in value)
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def run(self, args, writer):
+        command = args[0].upper()
+        if command in (b"AUTH", b"SELECT"):
+            return "OK"
+        if command == b"SET":
+            key, value, options = args[1], args[2], [arg.upper() for arg in args[3:]]
+            if b"NX" in options and self.live(key):
+                return None
+            expires_at = None
+            if b"PX" in options:
+                expires_at = time.monotonic() + int(args[3 + options.index(b"PX") + 1]) / 1000
+            self.values[key] = [value, expires_at]
+            return "OK"
+        if command == b"INCR":
+            entry = self.live(args[1])
+            if entry is None:
+                entry = self.values[args[1]] = [b"0", None]
+            if not entry[0].isdigit():
+                return RedisError("WRONGTYPE Operation against a key holding the wrong kind of value")
+            entry[0] = b"%d" % (int(entry[0]) + 1)
+            return int(entry[0])
+        if command == b"PUBLISH":
+            receivers = self.subscribers.get(args[1], [])
+            for receiver in receivers:
+                receiver.write(self.reply([b"message", args[1], args[2]]))
+            return len(receivers)
+        if command == b"SUBSCRIBE":
+            for count, channel in enumerate(args[1:], 1):
+                self.subscribers.setdefault(channel, []).append(writer)
+                writer.write(self.reply([b"subscribe", channel, count]))
+            return ...
+        return RedisError(f"ERR unknown command '{command.decode()}'")
+
+    async def handle(self, reader, writer):
+        self.connections.append(writer)
+        try:
+            while line := await reader.readline():
+                args = []
+                for _ in range(int(line[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                result = self.run(args, writer)
+                if result is not ...:
+                    writer.write(self.reply(result))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def with_server(test):
+    """Run an async test body with a started stand-in server and a connected RedisState."""
+    def wrapper():
+        async def main():
+            server = StandInServer()
+            state = RedisState(await server.start())
+            await state.connect()
+            try:
+                await test(server, state)
+            finally:
+                await state.close()
+                await server.stop()
+        asyncio.run(main())
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+
+async def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for the condition")
+        await asyncio.sleep(0.01)
+
+
+def test_encode_command():
+    assert encode_command("SET", "k", 1) == b"*3\r\n$3\r\nSET\r\n$1\r\nk\r\n$1\r\n1\r\n"
+
+
+def test_open_shared_state_picks_backend():
+    assert isinstance(sharedstate.open_shared_state(""), LocalState)
+    assert isinstance(sharedstate.open_shared_state(None), LocalState)
+    state = sharedstate.open_shared_state("redis://:secret@example.com:6380/2")
+    assert isinstance(state, RedisState)
+    assert (state.host, state.port, state.password, state.db) == ("example.com", 6380, "secret", 2)
+
+
+@with_server
+async def test_hit_counts_within_window(server, state):
+    assert [await state.hit("hits", 0.2) for _ in range(3)] == [1, 2, 3]
+    await asyncio.sleep(0.25)
+    assert await state.hit("hits", 0.2) == 1
+
+
+@with_server
+async def test_claim(server, state):
+    assert await state.claim("seen", 0.2)
+    assert not await state.claim("seen", 0.2)
+    await asyncio.sleep(0.25)
+    assert await state.claim("seen", 0.2)
+
+
+@with_server
+async def test_publish_and_listen(server, state):
+    other = RedisState(server.url)
+    received = []
+    other.listen("events", received.append)
+    await wait_for(lambda: server.subscribers.get(b"events"))
+    state.publish_nowait("events", "first")
+    await state.publish("events", "second")
+    await wait_for(lambda: len(received) == 2)
+    assert sorted(received) == ["first", "second"]
+    await other.close()
+
+
+@with_server
+async def test_listener_resubscribes_after_disconnect(server, state):
+    state.RECONNECT_DELAY = 0.05
+    received = []
+    state.listen("events", received.append)
+    await wait_for(lambda: server.subscribers.get(b"events"))
+    server.drop_connections(subscribers_only=True)
+    await wait_for(lambda: server.subscribers.get(b"events"))
+    await state.publish("events", "after reconnect")
+    await wait_for(lambda: received)
+    assert received == ["after reconnect"]
+
+
+@with_server
+async def test_commands_reconnect_after_disconnect(server, state):
+    assert await state.claim("before", 10)
+    server.drop_connections()
+    with pytest.raises((ConnectionError, asyncio.IncompleteReadError)):
+        await state.claim("lost", 10)
+    assert await state.claim("after", 10)
+
+
+@with_server
+async def test_error_reply_leaves_connection_in_step(server, state):
+    server.values[b"text"] = [b"not a number", None]
+    with pytest.raises(RedisError, match="WRONGTYPE"):
+        await state.hit("text", 10)
+    # The next command must get its own reply, not one left over from the failed pipeline
+    assert await state.claim("fresh", 10)
+    assert await state.hit("counter", 10) == 1
+
+
+@with_server
+async def test_cancelled_command_resets_connection(server, state):
+    server.delay = 0.2
+    task = asyncio.create_task(state.hit("slow", 10))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    server.delay = 0
+    await asyncio.sleep(0.3)
+    assert await state.claim("fresh", 10)
+
+
+def test_local_state():
+    async def main():
+        state = LocalState()
+        assert [await state.hit("hits", 0.1) for _ in range(2)] == [1, 2]
+        assert await state.claim("seen", 0.1)
+        assert not await state.claim("seen", 0.1)
+        await asyncio.sleep(0.15)
+        assert await state.hit("hits", 0.1) == 1
+        assert await state.claim("seen", 0.1)
+    asyncio.run(main())
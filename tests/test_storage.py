@@ -0,0 +1,132 @@
+"""The same checks against every storage backend.
+
+SQLite always runs, on a fresh file per test. PostgreSQL runs when TEST_DATABASE_URL
+points at a database the tests may empty, e.g. postgresql://localhost/swearjar_test.
+"""
+import asyncio
+import os
+import re
+
+import pytest
+
+import datatools
+import storage
+from storage import ALL_ITEMS, PostgresStorage, SQLiteStorage, open_storage
+
+POSTGRES_URL = os.getenv("TEST_DATABASE_URL")
+TABLES = ["swear_counts", "shop_items", "user_inventory", "shop_purchases", "purchase_rollups",
+          "purchase_rollup_buyers", "positive_words", "swear_words", "nsfw_words", "gif_filters",
+          "warning_messages", "settings"]
+
+
+async def run_sql(backend, sql, *params):
+    """Run a statement directly against the backend's database and return its rows."""
+    if isinstance(backend, SQLiteStorage):
+        rows = backend.conn.execute(re.sub(r"\$\d+", "?", sql), params).fetchall()
+        backend.conn.commit()
+        return [tuple(row) for row in rows]
+    return [tuple(row) for row in await backend.pool.fetch(sql, *params)]
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return open_storage(str(tmp_path / "test.db"))
+    if not POSTGRES_URL:
+        pytest.skip("Set TEST_DATABASE_URL to run against PostgreSQL")
+    return open_storage(POSTGRES_URL)
+
+
+def run(test):
+    """Run an async test body against a connected, empty backend.
+
+    Each test gets its own event loop, so PostgreSQL pools are created inside it.
+    """
+    def wrapper(backend):
+        async def main():
+            await backend.connect()
+            try:
+                if isinstance(backend, PostgresStorage):
+                    await backend.pool.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY")
+                await test(backend)
+            finally:
+                await backend.close()
+        asyncio.run(main())
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+
+@run
+async def test_users_and_coins(backend):
+    assert await backend.get_user(1) is None
+    assert await backend.get_coins(1) == storage.STARTING_COINS
+    assert await backend.add_coins(1, 25) == storage.STARTING_COINS + 25
+    assert await backend.add_coins(1, -5) == storage.STARTING_COINS + 20
+    assert await backend.get_user(1) == (0, storage.STARTING_COINS + 20, 0)
+
+
+@run
+async def test_terms(backend):
+    await backend.add_term("swear", "heck")
+    await backend.add_term("swear", "heck")
+    await backend.add_term("positive", "thanks", reward=3)
+    await backend.add_term("positive", "thanks", reward=5)
+    assert await backend.list_terms("swear") == ["heck"]
+    assert await backend.list_terms("positive") == {"thanks": 5}
+    assert await backend.remove_term("swear", "heck") == 1
+    assert await backend.remove_term("swear", "heck") == 0
+    assert await backend.list_terms("gif") == []
+
+
+@run
+async def test_settings(backend):
+    assert await backend.get_setting("currency", "coins") == "coins"
+    await backend.set_setting("currency", "gold")
+    await backend.set_setting("currency", "gems")
+    assert await backend.get_setting("currency") == "gems"
+    assert await backend.delete_setting("currency") == 1
+    assert await backend.get_setting("currency") is None
+
+
+@run
+async def test_shop_and_inventory(backend):
+    await run_sql(backend, "INSERT INTO shop_items (name, emoji, price, description) VALUES ($1, $2, $3, 'A hat')",
+                  "Hat", "🎩", 50)
+    ((item_id, *_),) = await backend.list_shop_items()
+    assert await backend.get_shop_item(item_id) == (item_id, "Hat", "🎩", 50, "A hat", None, None)
+    assert await backend.get_shop_item(item_id + 1) is None
+
+    await backend.add_inventory_item(7, item_id)
+    await backend.add_inventory_item(7, item_id, quantity=2)
+    assert await backend.get_inventory(7) == [(item_id, "Hat", "🎩", "A hat", 3)]
+
+
+@run
+async def test_record_purchase_updates_rollups(backend):
+    await backend.record_purchase(1, 5, 10)
+    await backend.record_purchase(1, 5, 10)
+    await backend.record_purchase(2, 6, 30)
+
+    assert len(await run_sql(backend, "SELECT * FROM shop_purchases")) == 3
+    rollups = await run_sql(backend, """
+        SELECT period, item_id, purchases, revenue, unique_buyers FROM purchase_rollups ORDER BY period, item_id
+    """)
+    # Three purchases can straddle an hour boundary; sum the buckets to keep the check exact
+    totals = {}
+    for period, item_id, purchases, revenue, unique_buyers in rollups:
+        previous = totals.get((period, item_id), (0, 0, 0))
+        totals[(period, item_id)] = (previous[0] + purchases, previous[1] + revenue, max(previous[2], unique_buyers))
+    for period in storage.ROLLUP_PERIODS:
+        assert totals[(period, 5)] == (2, 20, 1)
+        assert totals[(period, 6)] == (1, 30, 1)
+        assert totals[(period, ALL_ITEMS)][:2] == (3, 50)
+
+
+def test_open_storage_uses_configured_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(datatools, "DB_PATH", str(tmp_path / "configured.db"))
+    store = open_storage()
+    assert isinstance(store, SQLiteStorage)
+    asyncio.run(store.connect())
+    asyncio.run(store.close())
+    assert (tmp_path / "configured.db").exists()
+    assert isinstance(open_storage("postgresql://localhost/swearjar"), PostgresStorage)